@@ -3,19 +3,26 @@ Dashboard API - Updated to use Enhanced Prediction Service
 Integrates with your existing services + new dashboard aggregation
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
+from sqlalchemy import select
 from datetime import datetime
+import asyncio
+import logging
 from typing import Optional
 
 # Import existing services
+from app.database.database import async_session_scope
+from app.models.database_models import DailySalesRollup
 from app.services.event_service import EventService
 from app.services.weather_service import WeatherService
 
 # Import new enhanced services
 from app.services.enhanced_prediction_service import enhanced_prediction_service
 from app.services.dashboard_service import dashboard_service
+from app.services.dashboard_snapshot_service import get_dashboard_snapshot_service
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+logger = logging.getLogger(__name__)
 
 # Initialize services
 event_service = EventService()
@@ -28,21 +35,31 @@ weather_service = WeatherService()
 
 
 @router.get("/dashboard")
-async def get_full_dashboard():
+async def get_full_dashboard(
+    request: Request,
+    refresh: bool = Query(False, description="Rebuild the snapshot before returning"),
+):
     """
     Get complete dashboard in ONE call
 
-    Returns highlights, metrics, info sections, and user data
+    Returns highlights, metrics, info sections, and user data.
+    Served from the background-refreshed snapshot with an ETag; send
+    If-None-Match to get 304 when nothing changed.
     """
     try:
-        return {
-            "highlights": dashboard_service.get_highlights(),
-            "metrics": dashboard_service.get_metrics(),
-            "info_sections": dashboard_service.get_info_sections(),
-            "sales_chart": dashboard_service.get_sales_chart_data(period="this-week"),
-            "user": {"name": "Manager", "restaurant": "Tulsa Capstone Grill"},
-            "timestamp": datetime.now().isoformat(),
+        snapshot = await get_dashboard_snapshot_service().get_snapshot(
+            force_refresh=refresh
+        )
+        headers = {
+            "ETag": snapshot["etag"],
+            "X-Dashboard-Version": str(snapshot["version"]),
+            "Cache-Control": "no-cache",
         }
+        if request.headers.get("if-none-match") == snapshot["etag"]:
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=snapshot["body"], media_type="application/json", headers=headers
+        )
     except Exception as e:
         return {
             "error": str(e),
@@ -82,51 +99,46 @@ async def get_sales_chart(
     - Green: AI predicted sales (based on day-of-week patterns + events)
     """
     try:
-        from datetime import datetime, timedelta
-        from sqlalchemy import func, and_
-        from app.models.database_models import Order
-        from app.database.database import SessionLocal
-        
-        # Get THIS week's actual data
-        this_week = dashboard_service.get_sales_chart_data(period="this-week")
+        # Get THIS week's and LAST week's data for comparison
+        this_week, last_week = await asyncio.gather(
+            dashboard_service.get_sales_chart_data(period="this-week"),
+            dashboard_service.get_sales_chart_data(period="last-week"),
+        )
         this_week_data = this_week.get('data', [])
-        
-        # Get LAST week's data for comparison
-        last_week = dashboard_service.get_sales_chart_data(period="last-week")
         last_week_data = last_week.get('data', [])
         
         # Calculate historical averages by day-of-week for predictions
-        db = SessionLocal()
-        try:
-            # Get average sales for each day of week from ALL historical data
-            dow_averages = {}
-            for dow in range(7):  # 0=Monday, 6=Sunday
-                avg = db.query(func.avg(Order.order_total)).filter(
-                    func.extract('dow', Order.order_timestamp) == (dow + 1) % 7  # Adjust for DB dow
-                ).scalar()
-                dow_averages[dow] = float(avg) if avg else 0
-            
-            # Count orders per day to get daily totals
-            daily_totals = db.query(
-                func.date(Order.order_timestamp).label('date'),
-                func.sum(Order.order_total).label('total')
-            ).group_by(func.date(Order.order_timestamp)).all()
-            
-            # Calculate average by day of week from totals
-            dow_data = {}
-            for record in daily_totals:
-                date_obj = datetime.strptime(str(record.date), '%Y-%m-%d')
-                dow = date_obj.weekday()
-                if dow not in dow_data:
-                    dow_data[dow] = []
-                dow_data[dow].append(float(record.total))
-            
-            # Average for each day
-            for dow in range(7):
-                if dow in dow_data and len(dow_data[dow]) > 0:
-                    dow_averages[dow] = sum(dow_data[dow]) / len(dow_data[dow])
-        finally:
-            db.close()
+        async with async_session_scope() as db:
+            # Daily totals for ALL historical data (one rollup row per day)
+            daily_totals = (await db.execute(select(
+                DailySalesRollup.sales_date.label('date'),
+                DailySalesRollup.total_sales.label('total'),
+                DailySalesRollup.order_count
+            ))).all()
+        
+        # Average order value per day of week as the fallback
+        dow_sums = {}
+        for record in daily_totals:
+            dow = record.date.weekday()
+            sales, orders = dow_sums.get(dow, (0.0, 0))
+            dow_sums[dow] = (sales + float(record.total), orders + record.order_count)
+        dow_averages = {dow: 0 for dow in range(7)}  # 0=Monday, 6=Sunday
+        for dow, (sales, orders) in dow_sums.items():
+            if orders:
+                dow_averages[dow] = sales / orders
+        
+        # Calculate average by day of week from totals
+        dow_data = {}
+        for record in daily_totals:
+            dow = record.date.weekday()
+            if dow not in dow_data:
+                dow_data[dow] = []
+            dow_data[dow].append(float(record.total))
+        
+        # Average for each day
+        for dow in range(7):
+            if dow in dow_data and len(dow_data[dow]) > 0:
+                dow_averages[dow] = sum(dow_data[dow]) / len(dow_data[dow])
         
         # Build comparison chart
         formatted = []
@@ -188,7 +200,7 @@ async def get_metrics_grid():
     Enhanced with ML-powered purchasing predictions
     """
     try:
-        metrics = dashboard_service.get_metrics()
+        metrics = await dashboard_service.get_metrics()
         return {
             "categories": metrics.get("categories", []),
             "summaries": metrics.get("summaries", []),
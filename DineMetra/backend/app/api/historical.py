@@ -3,23 +3,26 @@ Historical Data API - Detailed Trends and Analytics
 FIXED: Uses actual data date range, not current date
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.database.database import SessionLocal
-from app.models.database_models import Order, OrderItem, WaitTime
+from app.database.database import get_async_db
+from app.models.database_models import DailySalesRollup, Order, OrderItem, WaitTime
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def get_data_date_range(db):
+async def get_data_date_range(db: AsyncSession):
     """Get the actual date range of data in the database"""
-    min_date = db.query(func.min(Order.order_timestamp)).scalar()
-    max_date = db.query(func.max(Order.order_timestamp)).scalar()
+    result = await db.execute(
+        select(func.min(Order.order_timestamp), func.max(Order.order_timestamp))
+    )
+    min_date, max_date = result.one()
     
     if not min_date or not max_date:
         # Fallback to current date if no data
@@ -29,41 +32,36 @@ def get_data_date_range(db):
 
 
 @router.get("/date-range")
-async def get_available_date_range() -> Dict:
+async def get_available_date_range(db: AsyncSession = Depends(get_async_db)) -> Dict:
     """Get the date range of available historical data"""
-    db = SessionLocal()
-    try:
-        min_date, max_date = get_data_date_range(db)
-        
-        return {
-            'earliest_date': min_date.strftime('%Y-%m-%d'),
-            'latest_date': max_date.strftime('%Y-%m-%d'),
-            'total_days': (max_date - min_date).days,
-            'has_data': True
-        }
-    finally:
-        db.close()
+    min_date, max_date = await get_data_date_range(db)
+    
+    return {
+        'earliest_date': min_date.strftime('%Y-%m-%d'),
+        'latest_date': max_date.strftime('%Y-%m-%d'),
+        'total_days': (max_date - min_date).days,
+        'has_data': True
+    }
 
 
 @router.get("/trends/daily")
 async def get_daily_trends(
     days: int = Query(default=30, ge=1, le=180, description="Number of days to fetch"),
-    end_date: Optional[str] = Query(default=None, description="End date (YYYY-MM-DD), defaults to latest data")
+    end_date: Optional[str] = Query(default=None, description="End date (YYYY-MM-DD), defaults to latest data"),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict:
     """
     Get detailed daily trends with sales, orders, wait times
     Perfect for smooth trend charts
     """
     
-    db = SessionLocal()
-    
     try:
         # Use actual data range instead of current date
         if end_date:
             end = datetime.strptime(end_date, '%Y-%m-%d')
         else:
             # Get the latest date in our data
-            _, end = get_data_date_range(db)
+            _, end = await get_data_date_range(db)
         
         start = end - timedelta(days=days)
         
@@ -72,29 +70,29 @@ async def get_daily_trends(
         # ================================================
         # DAILY SALES & ORDER COUNT
         # ================================================
-        daily_sales = db.query(
-            func.date(Order.order_timestamp).label('date'),
-            func.sum(Order.order_total).label('total_sales'),
-            func.count(Order.id).label('order_count')
-        ).filter(
+        daily_sales = (await db.execute(select(
+            DailySalesRollup.sales_date.label('date'),
+            DailySalesRollup.total_sales,
+            DailySalesRollup.order_count
+        ).where(
             and_(
-                Order.order_timestamp >= start,
-                Order.order_timestamp <= end
+                DailySalesRollup.sales_date >= start.date(),
+                DailySalesRollup.sales_date <= end.date()
             )
-        ).group_by(func.date(Order.order_timestamp)).all()
+        ))).all()
         
         # ================================================
         # DAILY AVERAGE WAIT TIME
         # ================================================
-        daily_waits = db.query(
+        daily_waits = (await db.execute(select(
             func.date(WaitTime.timestamp).label('date'),
             func.avg(WaitTime.actual_wait_minutes).label('avg_wait')
-        ).filter(
+        ).where(
             and_(
                 WaitTime.timestamp >= start,
                 WaitTime.timestamp <= end
             )
-        ).group_by(func.date(WaitTime.timestamp)).all()
+        ).group_by(func.date(WaitTime.timestamp)))).all()
         
         # Convert to dict for easy lookup
         wait_dict = {str(w.date): float(w.avg_wait) for w in daily_waits}
@@ -204,14 +202,13 @@ async def get_daily_trends(
     except Exception as e:
         logger.error(f"Error fetching daily trends: {e}", exc_info=True)
         raise
-    finally:
-        db.close()
 
 
 @router.get("/trends/weekly")
 async def get_weekly_trends(
     weeks: int = Query(default=12, ge=1, le=52, description="Number of weeks to fetch"),
-    group_by: str = Query(default='week', regex='^(day|week)$', description="Group by day or week")
+    group_by: str = Query(default='week', regex='^(day|week)$', description="Group by day or week"),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict:
     """
     Get weekly aggregated trends
@@ -220,76 +217,70 @@ async def get_weekly_trends(
     
     if group_by == 'day':
         # Redirect to daily endpoint
-        return await get_daily_trends(days=weeks * 7)
+        return await get_daily_trends(days=weeks * 7, end_date=None, db=db)
     
-    db = SessionLocal()
+    # Use actual data range
+    _, end_date = await get_data_date_range(db)
+    start_date = end_date - timedelta(weeks=weeks)
     
-    try:
-        # Use actual data range
-        _, end_date = get_data_date_range(db)
-        start_date = end_date - timedelta(weeks=weeks)
-        
-        # Get daily data first
-        daily_sales = db.query(
-            func.date(Order.order_timestamp).label('date'),
-            func.sum(Order.order_total).label('total_sales'),
-            func.count(Order.id).label('order_count')
-        ).filter(
-            and_(
-                Order.order_timestamp >= start_date,
-                Order.order_timestamp <= end_date
-            )
-        ).group_by(func.date(Order.order_timestamp)).all()
-        
-        # Group into weeks
-        weekly_data = {}
-        
-        for record in daily_sales:
-            date_obj = datetime.strptime(str(record.date), '%Y-%m-%d')
-            # Get week start (Monday)
-            week_start = date_obj - timedelta(days=date_obj.weekday())
-            week_key = week_start.strftime('%Y-%m-%d')
-            
-            if week_key not in weekly_data:
-                weekly_data[week_key] = {
-                    'week_start': week_key,
-                    'sales': 0,
-                    'order_count': 0,
-                    'days': []
-                }
-            
-            weekly_data[week_key]['sales'] += float(record.total_sales or 0)
-            weekly_data[week_key]['order_count'] += int(record.order_count or 0)
-            weekly_data[week_key]['days'].append(str(record.date))
-        
-        # Convert to list and sort
-        weekly_list = list(weekly_data.values())
-        weekly_list.sort(key=lambda x: x['week_start'])
-        
-        # Calculate week-over-week change
-        for i in range(1, len(weekly_list)):
-            prev = weekly_list[i-1]['sales']
-            curr = weekly_list[i]['sales']
-            change = ((curr - prev) / prev * 100) if prev > 0 else 0
-            weekly_list[i]['change_percent'] = round(change, 1)
-        
-        if weekly_list:
-            weekly_list[0]['change_percent'] = 0
+    # Get daily data first
+    daily_sales = (await db.execute(select(
+        DailySalesRollup.sales_date.label('date'),
+        DailySalesRollup.total_sales,
+        DailySalesRollup.order_count
+    ).where(
+        and_(
+            DailySalesRollup.sales_date >= start_date.date(),
+            DailySalesRollup.sales_date <= end_date.date()
+        )
+    ))).all()
+    
+    # Group into weeks
+    weekly_data = {}
+    
+    for record in daily_sales:
+        date_obj = datetime.strptime(str(record.date), '%Y-%m-%d')
+        # Get week start (Monday)
+        week_start = date_obj - timedelta(days=date_obj.weekday())
+        week_key = week_start.strftime('%Y-%m-%d')
         
-        return {
-            'weekly_data': weekly_list,
-            'summary': {
-                'weeks_analyzed': len(weekly_list),
-                'total_sales': round(sum(w['sales'] for w in weekly_list), 2),
-                'total_orders': sum(w['order_count'] for w in weekly_list),
-                'avg_weekly_sales': round(sum(w['sales'] for w in weekly_list) / len(weekly_list), 2) if weekly_list else 0
-            },
-            'period': {
-                'start_date': start_date.strftime('%Y-%m-%d'),
-                'end_date': end_date.strftime('%Y-%m-%d'),
-                'weeks': weeks
+        if week_key not in weekly_data:
+            weekly_data[week_key] = {
+                'week_start': week_key,
+                'sales': 0,
+                'order_count': 0,
+                'days': []
             }
-        }
         
-    finally:
-        db.close()
+        weekly_data[week_key]['sales'] += float(record.total_sales or 0)
+        weekly_data[week_key]['order_count'] += int(record.order_count or 0)
+        weekly_data[week_key]['days'].append(str(record.date))
+    
+    # Convert to list and sort
+    weekly_list = list(weekly_data.values())
+    weekly_list.sort(key=lambda x: x['week_start'])
+    
+    # Calculate week-over-week change
+    for i in range(1, len(weekly_list)):
+        prev = weekly_list[i-1]['sales']
+        curr = weekly_list[i]['sales']
+        change = ((curr - prev) / prev * 100) if prev > 0 else 0
+        weekly_list[i]['change_percent'] = round(change, 1)
+    
+    if weekly_list:
+        weekly_list[0]['change_percent'] = 0
+    
+    return {
+        'weekly_data': weekly_list,
+        'summary': {
+            'weeks_analyzed': len(weekly_list),
+            'total_sales': round(sum(w['sales'] for w in weekly_list), 2),
+            'total_orders': sum(w['order_count'] for w in weekly_list),
+            'avg_weekly_sales': round(sum(w['sales'] for w in weekly_list) / len(weekly_list), 2) if weekly_list else 0
+        },
+        'period': {
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'weeks': weeks
+        }
+    }
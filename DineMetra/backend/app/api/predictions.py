@@ -4,18 +4,21 @@ Supports BOTH old URLs and new organized URLs
 """
 
 from fastapi import APIRouter, HTTPException
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 # Import ALL service wrappers
 from app.services.ml_service import (
     predict_wait_time,
+    predict_wait_time_batch,
     predict_busyness,
     predict_item_sales,
+    forecast_menu_sales,
 )
 
 from app.services.enhanced_prediction_service import enhanced_prediction_service
+from app.services.prediction_context import PredictionContext
 
 # Import Response Schema
 from app.models.schemas import WaitTimePredictionResponse
@@ -37,6 +40,10 @@ class WaitTimeRequest(BaseModel):
     test_weather_condition: Optional[str] = None
 
 
+class WaitTimeBatchRequest(BaseModel):
+    parties: List[WaitTimeRequest]
+
+
 class BusynessRequest(BaseModel):
     timestamp: Optional[datetime] = None
     weather_condition: Optional[str] = None
@@ -49,6 +56,24 @@ class SalesRequest(BaseModel):
     category: Optional[str] = "Entrees"
 
 
+class ForecastItem(BaseModel):
+    item_id: int
+    item_name: str
+    category: Optional[str] = "Food"
+
+
+class SalesForecastRequest(BaseModel):
+    start_date: Optional[datetime] = None
+    days: int = Field(default=14, ge=1, le=60)
+    items: Optional[List[ForecastItem]] = None  # Defaults to the full menu
+
+
+class EnhancedBatchRequest(BaseModel):
+    wait_times: List[WaitTimeRequest] = []
+    busyness: List[BusynessRequest] = []
+    sales: List[SalesRequest] = []
+
+
 # =============================================================================
 # SHARED IMPLEMENTATION FUNCTIONS
 # =============================================================================
@@ -73,7 +98,20 @@ def _predict_wait_time_impl(request: WaitTimeRequest):
     )
 
 
-def _predict_wait_time_enhanced_impl(request: WaitTimeRequest):
+def _predict_wait_time_batch_impl(request: WaitTimeBatchRequest):
+    """Shared implementation for batch wait time prediction"""
+    now = datetime.now()
+    predictions = predict_wait_time_batch(
+        party_sizes=[p.party_size for p in request.parties],
+        timestamps=[p.timestamp or now for p in request.parties],
+        current_occupancies=[p.current_occupancy for p in request.parties],
+    )
+    return {"predictions": predictions, "count": len(predictions)}
+
+
+def _predict_wait_time_enhanced_impl(
+    request: WaitTimeRequest, context: Optional[PredictionContext] = None
+):
     """Shared implementation for enhanced wait time prediction"""
     timestamp = request.timestamp or datetime.now()
 
@@ -81,6 +119,7 @@ def _predict_wait_time_enhanced_impl(request: WaitTimeRequest):
         party_size=request.party_size,
         current_occupancy=request.current_occupancy,
         timestamp=timestamp,
+        context=context,
     )
 
 
@@ -90,10 +129,14 @@ def _predict_busyness_impl(request: BusynessRequest):
     return predict_busyness(timestamp=target_time, weather=request.weather_condition)
 
 
-def _predict_busyness_enhanced_impl(request: BusynessRequest):
+def _predict_busyness_enhanced_impl(
+    request: BusynessRequest, context: Optional[PredictionContext] = None
+):
     """Shared implementation for enhanced busyness prediction"""
     target_time = request.timestamp or datetime.now()
-    return enhanced_prediction_service.predict_busyness_enhanced(timestamp=target_time)
+    return enhanced_prediction_service.predict_busyness_enhanced(
+        timestamp=target_time, context=context
+    )
 
 
 def _predict_sales_impl(request: SalesRequest):
@@ -102,7 +145,32 @@ def _predict_sales_impl(request: SalesRequest):
     return predict_item_sales(item_id=request.item_id, date=target_date)
 
 
-def _predict_sales_enhanced_impl(request: SalesRequest):
+def _forecast_sales_impl(request: SalesForecastRequest):
+    """Shared implementation for menu-wide multi-day sales forecast"""
+    start = (request.start_date or datetime.now()).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    dates = [start + timedelta(days=i) for i in range(request.days)]
+    items = (
+        [(i.item_id, i.item_name, i.category) for i in request.items]
+        if request.items
+        else None
+    )
+
+    forecast = forecast_menu_sales(dates, items)
+    forecast["date"] = forecast["date"].dt.strftime("%Y-%m-%d")
+
+    return {
+        "start_date": dates[0].strftime("%Y-%m-%d"),
+        "days": request.days,
+        "item_count": int(forecast["item_id"].nunique()),
+        "forecast": forecast.to_dict("records"),
+    }
+
+
+def _predict_sales_enhanced_impl(
+    request: SalesRequest, context: Optional[PredictionContext] = None
+):
     """Shared implementation for enhanced sales prediction"""
     target_date = request.date or datetime.now()
     return enhanced_prediction_service.predict_sales_enhanced(
@@ -110,9 +178,26 @@ def _predict_sales_enhanced_impl(request: SalesRequest):
         target_date=target_date,
         item_name=request.item_name,
         category=request.category,
+        context=context,
     )
 
 
+def _predict_enhanced_batch_impl(request: EnhancedBatchRequest):
+    """Shared implementation for mixed enhanced predictions in one request"""
+    # One context: weather, events and calendar features are resolved once
+    context = enhanced_prediction_service.create_context()
+    return {
+        "wait_times": [
+            _predict_wait_time_enhanced_impl(r, context) for r in request.wait_times
+        ],
+        "busyness": [
+            _predict_busyness_enhanced_impl(r, context) for r in request.busyness
+        ],
+        "sales": [_predict_sales_enhanced_impl(r, context) for r in request.sales],
+        "count": len(request.wait_times) + len(request.busyness) + len(request.sales),
+    }
+
+
 # =============================================================================
 # NEW ORGANIZED ENDPOINTS (under /api/predictions)
 # =============================================================================
@@ -129,6 +214,17 @@ async def predict_wait_time_new(request: WaitTimeRequest):
         )
 
 
+@router.post("/wait-time/batch")
+async def predict_wait_time_batch_new(request: WaitTimeBatchRequest):
+    """Predict wait times for many parties in one model pass (NEW URL: /api/predictions/wait-time/batch)"""
+    try:
+        return _predict_wait_time_batch_impl(request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Batch wait time prediction failed: {str(e)}"
+        )
+
+
 @router.post("/busyness")
 async def predict_busyness_new(request: BusynessRequest):
     """Predict busyness (NEW URL: /api/predictions/busyness)"""
@@ -151,6 +247,15 @@ async def predict_sales_new(request: SalesRequest):
         )
 
 
+@router.post("/sales/forecast")
+async def forecast_sales_new(request: SalesForecastRequest):
+    """Forecast the whole menu over several days (NEW URL: /api/predictions/sales/forecast)"""
+    try:
+        return _forecast_sales_impl(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sales forecast failed: {str(e)}")
+
+
 @router.post("/wait-time-enhanced")
 async def predict_wait_time_enhanced_new(request: WaitTimeRequest):
     """Enhanced wait time prediction (NEW URL: /api/predictions/wait-time-enhanced)"""
@@ -173,6 +278,17 @@ async def predict_busyness_enhanced_new(request: BusynessRequest):
         )
 
 
+@router.post("/enhanced/batch")
+async def predict_enhanced_batch_new(request: EnhancedBatchRequest):
+    """Enhanced wait time, busyness and sales predictions sharing one context (NEW URL: /api/predictions/enhanced/batch)"""
+    try:
+        return _predict_enhanced_batch_impl(request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Batch enhanced prediction failed: {str(e)}"
+        )
+
+
 @router.post("/sales-enhanced")
 async def predict_sales_enhanced_new(request: SalesRequest):
     """Enhanced sales prediction (NEW URL: /api/predictions/sales-enhanced)"""
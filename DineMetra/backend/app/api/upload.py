@@ -3,308 +3,437 @@ CSV Upload API - Live Demo Feature (FIXED for Toast POS format)
 Upload new sales data and watch dashboard update in real-time via WebSocket
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from typing import Dict
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from typing import Callable, Dict, Tuple
 import pandas as pd
 from datetime import datetime
 import logging
-from io import StringIO
 import asyncio
+import hashlib
+import os
 import random
+import threading
+import uuid
+
+from sqlalchemy import delete, func, insert, select, update
 
 from app.database.database import SessionLocal
 from app.models.database_models import MenuItem, Order, OrderItem
 from app.websocket.manager import manager
+from app.services.dashboard_snapshot_service import get_dashboard_snapshot_service
+from app.services.sales_rollup_service import get_sales_rollup_service
+from app.services.upload_job_service import UploadCancelled, get_upload_job_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Uploads are spooled here and parsed UPLOAD_CHUNK_ROWS rows at a time
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "data/uploads")
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", "5000"))
+
+# Rows per INSERT statement when loading uploaded orders and order items
+UPLOAD_BATCH_SIZE = 1000
+
+# Set once the unique menu item name index is known to exist
+_menu_items_ready = False
+_menu_items_lock = threading.Lock()
+
 
-async def process_csv_upload(file_content: str, filename: str):
-    """Background task to process CSV and update database with live updates"""
+def ensure_unique_menu_items(db) -> int:
+    """
+    Merge duplicate menu item names, then create the unique name index
     
+    Databases created before the index may hold duplicates left by
+    concurrent uploads: their order items are moved to the oldest row with
+    that name and the other rows are deleted. Runs once per process.
+    
+    Returns:
+        Duplicate menu items removed
+    """
+    global _menu_items_ready
+    if _menu_items_ready:
+        return 0
+    with _menu_items_lock:
+        if _menu_items_ready:
+            return 0
+        
+        removed = 0
+        duplicates = db.execute(
+            select(MenuItem.item_name, func.min(MenuItem.id))
+            .group_by(MenuItem.item_name)
+            .having(func.count() > 1)
+        ).all()
+        for item_name, keep_id in duplicates:
+            extra_ids = select(MenuItem.id).where(
+                MenuItem.item_name == item_name, MenuItem.id != keep_id
+            )
+            db.execute(
+                update(OrderItem)
+                .where(OrderItem.menu_item_id.in_(extra_ids))
+                .values(menu_item_id=keep_id)
+            )
+            removed += db.execute(
+                delete(MenuItem).where(
+                    MenuItem.item_name == item_name, MenuItem.id != keep_id
+                )
+            ).rowcount
+        db.commit()
+        if removed:
+            logger.warning(f"🧹 Merged {removed} duplicate menu items")
+        
+        for index in MenuItem.__table__.indexes:
+            if index.unique:
+                index.create(bind=db.get_bind(), checkfirst=True)
+        _menu_items_ready = True
+        return removed
+
+
+def _dialect_insert(db):
+    """Dialect insert() with on_conflict_do_nothing"""
+    if db.get_bind().dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    return dialect_insert
+
+
+async def refresh_dashboard(message: str):
+    """Rebuild the dashboard snapshot, then tell clients which version to fetch"""
+    snapshot = None
     try:
-        await manager.broadcast({
-            'type': 'upload_started',
-            'filename': filename,
-            'message': f'Starting upload: {filename}',
-            'progress': 0
-        })
-        await asyncio.sleep(0.5)
-        
-        # Parse CSV
-        df = pd.read_csv(StringIO(file_content))
-        logger.info(f"Parsed CSV: {len(df)} rows, columns: {list(df.columns)}")
-        
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': f'📊 Found {len(df):,} records',
-            'progress': 5
-        })
-        await asyncio.sleep(0.3)
-        
-        # Process the CSV
-        await process_toast_items_csv(df, filename)
-        
-        await manager.broadcast({
-            'type': 'upload_complete',
-            'message': f'✅ Successfully loaded data from {filename}!',
-            'progress': 100,
-            'filename': filename
-        })
-        
-        await asyncio.sleep(1)
-        await manager.broadcast({
-            'type': 'refresh_dashboard',
-            'message': 'Dashboard updated with new data'
-        })
-        
+        snapshot = await get_dashboard_snapshot_service().refresh("upload")
     except Exception as e:
-        logger.error(f"Upload processing error: {e}", exc_info=True)
-        await manager.broadcast({
-            'type': 'upload_error',
-            'message': f'❌ Upload failed: {str(e)}',
-            'error': str(e)
-        })
+        logger.error(f"Dashboard snapshot refresh failed after upload: {e}")
+
+    await manager.broadcast({
+        'type': 'refresh_dashboard',
+        'message': message,
+        'version': snapshot['version'] if snapshot else None,
+        'etag': snapshot['etag'] if snapshot else None
+    })
+
 
+def spool_upload(source, filename: str) -> Tuple[str, str, int]:
+    """
+    Copy an uploaded file to the spool directory
 
-async def process_toast_items_csv(df: pd.DataFrame, filename: str):
-    """Process Toast POS Items CSV format"""
+    Returns:
+        (spooled path, SHA-256 of the content, size in bytes)
+    """
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_SPOOL_DIR, f"{uuid.uuid4().hex}_{os.path.basename(filename)}")
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as out:
+        while True:
+            block = source.read(1024 * 1024)
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+            size += len(block)
+    return path, digest.hexdigest(), size
+
+
+def load_toast_items_csv(
+    path: str,
+    filename: str,
+    report: Callable[[Dict], None],
+    order_prefix: str = "UPLOAD",
+    skip_rows: int = 0,
+    orders_done: int = 0
+) -> Dict:
+    """
+    Load a spooled Toast POS Items CSV in chunks (runs on a worker thread)
     
-    db = SessionLocal()
+    Each chunk is parsed, loaded and committed on its own, so memory stays
+    bounded by UPLOAD_CHUNK_ROWS and progress follows the bytes read.
+    report() is called after every chunk and may raise UploadCancelled.
     
+    A resumed job passes the rows and orders it already committed
+    (skip_rows / orders_done); those rows are not loaded again.
+    
+    Returns:
+        Rows, chunks, orders, order items and new menu items (including
+        the resumed job's earlier rows and orders)
+    """
+    total_bytes = max(os.path.getsize(path), 1)
+    
+    # Extract month from filename
+    month = 2  # default
     try:
-        logger.info(f"CSV columns: {list(df.columns)}")
-        
-        # CRITICAL: Filter out summary rows (where Item is empty/NaN)
-        df = df[df['Item'].notna() & (df['Item'] != '')].copy()
-        
-        logger.info(f"After filtering summary rows: {len(df)} items")
-        
-        if len(df) == 0:
-            raise ValueError("No items found in CSV (all rows appear to be summaries)")
-        
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': f'📊 Processing {len(df)} menu items...',
-            'progress': 10
-        })
-        await asyncio.sleep(0.3)
-        
-        # Extract data with proper column names
-        df['item_name'] = df['Item'].astype(str).str.strip()
-        df['category'] = df['Sales Category'].fillna('General').astype(str)
-        
-        # Get quantity and price
-        df['quantity'] = pd.to_numeric(df['Qty sold'], errors='coerce').fillna(1).astype(int)
-        df['gross_sales'] = pd.to_numeric(df['Gross sales'], errors='coerce').fillna(0)
-        
-        # Calculate unit price
-        df['unit_price'] = (df['gross_sales'] / df['quantity']).replace(
-            [float('inf'), float('-inf')], 10.0
-        ).fillna(10.0).round(2)
-        
-        # Clean data
-        df = df[df['quantity'] > 0].copy()
-        
-        logger.info(f"Valid items after cleaning: {len(df)}")
-        
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': '🍽️ Loading menu items into database...',
-            'progress': 20
-        })
-        await asyncio.sleep(0.3)
-        
-        # ==================================================
-        # STEP 1: Load Menu Items
-        # ==================================================
-        unique_items = df[['item_name', 'category', 'unit_price']].drop_duplicates(subset=['item_name'])
-        item_map = {}
-        new_items_count = 0
-        
-        for idx, row in unique_items.iterrows():
-            item_name = str(row['item_name']).strip()
-            
-            existing = db.query(MenuItem).filter(
-                MenuItem.item_name == item_name
-            ).first()
-            
-            if existing:
-                item_map[item_name] = existing.id
-            else:
-                new_item = MenuItem(
-                    item_name=item_name,
-                    category=str(row['category']),
-                    price=float(row['unit_price']),
-                    is_active=True
-                )
-                db.add(new_item)
-                db.flush()
-                item_map[item_name] = new_item.id
-                new_items_count += 1
-        
-        db.commit()
-        
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': f'✓ Loaded {len(item_map)} items ({new_items_count} new)',
-            'progress': 40
-        })
-        await asyncio.sleep(0.3)
-        
-        # ==================================================
-        # STEP 2: Create Orders
-        # ==================================================
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': '📝 Generating orders from sales data...',
-            'progress': 50
-        })
-        await asyncio.sleep(0.3)
-        
-        # Extract month from filename
-        month = 2  # default
-        try:
-            if filename[:2].isdigit():
-                month = int(filename[:2])
-        except:
-            pass
+        if filename[:2].isdigit():
+            month = int(filename[:2])
+    except:
+        pass
+    
+    totals = {'rows': skip_rows, 'chunks': 0, 'orders': orders_done, 'order_items': 0, 'new_menu_items': 0}
+    rng = random.Random(42)
+    
+    db = SessionLocal()
+    try:
+        ensure_unique_menu_items(db)
         
-        order_counter = db.query(Order).count() + 1
-        orders_created = 0
-        order_items = []
+        # Number orders after the ones this prefix already has
+        order_counter = db.query(Order).filter(
+            Order.order_number.like(f'{order_prefix}_%')
+        ).count() + 1
         
-        random.seed(42)
-        base_date = datetime(2025, month, 1, 12, 0, 0)
+        if skip_rows:
+            logger.info(f"⏩ Resuming {filename} after {skip_rows:,} committed rows")
         
-        # Create orders - one per item sold
-        for idx, row in df.iterrows():
-            order_number = f"UPLOAD_{order_counter:06d}"
-            
-            # Distribute across month
-            days_offset = idx % 28
-            hours_offset = random.randint(11, 20)
-            minutes_offset = random.randint(0, 59)
-            
-            timestamp = base_date.replace(
-                day=min(days_offset + 1, 28),
-                hour=hours_offset,
-                minute=minutes_offset
-            )
-            
-            item_name = str(row['item_name']).strip()
-            quantity = int(row['quantity'])
-            unit_price = float(row['unit_price'])
-            order_total = quantity * unit_price
-            
-            # Create order
-            new_order = Order(
-                order_number=order_number,
-                order_timestamp=timestamp,
-                order_total=order_total,
-                party_size=random.randint(1, 4)
+        with open(path, 'rb') as f:
+            reader = pd.read_csv(
+                f, chunksize=UPLOAD_CHUNK_ROWS, skiprows=range(1, skip_rows + 1)
             )
-            db.add(new_order)
-            db.flush()
-            
-            # Create order item
-            item_id = item_map.get(item_name)
-            if item_id:
-                order_items.append(OrderItem(
-                    order_id=new_order.id,
-                    menu_item_id=item_id,
-                    quantity=quantity,
-                    unit_price=unit_price,
-                    total_price=order_total
-                ))
-            
-            order_counter += 1
-            orders_created += 1
-            
-            # Progress updates
-            if orders_created % 10 == 0:
-                progress = 50 + int((idx / len(df)) * 25)
-                await manager.broadcast({
+            for chunk in reader:
+                result = load_toast_items_chunk(
+                    db, chunk, month, order_counter, rng, order_prefix
+                )
+                db.commit()
+                
+                order_counter += result['orders']
+                totals['rows'] += len(chunk)
+                totals['chunks'] += 1
+                for key in ('orders', 'order_items', 'new_menu_items'):
+                    totals[key] += result[key]
+                
+                bytes_read = min(f.tell(), total_bytes)
+                report({
                     'type': 'upload_progress',
-                    'message': f'Creating order {orders_created}/{len(df)}...',
-                    'progress': progress
+                    'message': f'📊 {totals["rows"]:,} rows processed, {totals["orders"]:,} orders created',
+                    'progress': 5 + int(bytes_read / total_bytes * 90),
+                    'bytes_processed': bytes_read,
+                    'total_bytes': total_bytes,
+                    'rows_processed': totals['rows'],
+                    'orders_created': totals['orders']
                 })
         
-        db.commit()
-        
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': f'✓ Created {orders_created} orders',
-            'progress': 80
-        })
-        await asyncio.sleep(0.3)
-        
-        # ==================================================
-        # STEP 3: Save Order Items
-        # ==================================================
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': '�� Saving order items...',
-            'progress': 85
-        })
-        await asyncio.sleep(0.3)
-        
-        if order_items:
-            db.bulk_save_objects(order_items)
-            db.commit()
-        
-        await manager.broadcast({
-            'type': 'upload_progress',
-            'message': f'✓ Saved {len(order_items):,} order items',
-            'progress': 95
-        })
+        if totals['orders'] == 0:
+            raise ValueError("No items found in CSV (all rows appear to be summaries)")
         
-        logger.info(f"✅ Upload complete: {orders_created} orders, {len(order_items)} items from {filename}")
+        logger.info(
+            f"✅ Upload complete: {totals['orders']} orders, {totals['order_items']} items "
+            f"from {filename} ({totals['chunks']} chunks)"
+        )
+        return totals
         
+    except UploadCancelled:
+        logger.info(f"🛑 Upload of {filename} cancelled after {totals['chunks']} chunks")
+        raise
     except Exception as e:
-        logger.error(f"Error processing CSV: {e}", exc_info=True)
+        db.rollback()
+        logger.error(
+            f"Error processing CSV after {totals['chunks']} committed chunks "
+            f"({totals['rows']:,} rows committed): {e}",
+            exc_info=True
+        )
         raise
     finally:
         db.close()
 
 
-@router.post("/upload-csv")
-async def upload_csv(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+def load_toast_items_chunk(
+    db,
+    df: pd.DataFrame,
+    month: int,
+    order_counter: int,
+    rng: random.Random,
+    order_prefix: str = "UPLOAD"
 ) -> Dict:
-    """Upload sales CSV and update database in real-time"""
+    """Load one chunk of a Toast POS Items CSV (caller commits)"""
+    
+    # CRITICAL: Filter out summary rows (where Item is empty/NaN)
+    df = df[df['Item'].notna() & (df['Item'] != '')].copy()
+    
+    # Extract data with proper column names
+    df['item_name'] = df['Item'].astype(str).str.strip()
+    df['category'] = df['Sales Category'].fillna('General').astype(str)
+    
+    # Get quantity and price
+    df['quantity'] = pd.to_numeric(df['Qty sold'], errors='coerce').fillna(1).astype(int)
+    df['gross_sales'] = pd.to_numeric(df['Gross sales'], errors='coerce').fillna(0)
+    
+    # Calculate unit price
+    df['unit_price'] = (df['gross_sales'] / df['quantity']).replace(
+        [float('inf'), float('-inf')], 10.0
+    ).fillna(10.0).round(2)
+    
+    # Clean data
+    df = df[df['quantity'] > 0].copy()
+    
+    if len(df) == 0:
+        return {'orders': 0, 'order_items': 0, 'new_menu_items': 0}
+    
+    # ==================================================
+    # STEP 1: Upsert Menu Items (one insert + one lookup)
+    # ==================================================
+    unique_items = df[['item_name', 'category', 'unit_price']].drop_duplicates(subset=['item_name'])
+    
+    # ON CONFLICT on the unique name index: a concurrent upload that adds
+    # the same new item leaves one row, and whichever insert lost the race
+    # picks up the winner's id from the lookup below
+    new_items = len(db.execute(
+        _dialect_insert(db)(MenuItem)
+        .values([
+            {
+                'item_name': row.item_name,
+                'category': str(row.category),
+                'price': float(row.unit_price),
+                'is_active': True
+            }
+            for row in unique_items.itertuples(index=False)
+        ])
+        .on_conflict_do_nothing(index_elements=['item_name'])
+        .returning(MenuItem.id)
+    ).all())
+    
+    item_map = dict(db.execute(
+        select(MenuItem.item_name, MenuItem.id).where(
+            MenuItem.item_name.in_(unique_items['item_name'].tolist())
+        )
+    ).all())
+    
+    # ==================================================
+    # STEP 2: Create Orders (batched INSERT ... RETURNING id)
+    # ==================================================
+    base_date = datetime(2025, month, 1, 12, 0, 0)
+    order_rows = []
+    item_rows = []
+    
+    # One order per item sold, distributed across the month
+    for idx, row in zip(df.index, df.itertuples(index=False)):
+        days_offset = idx % 28
+        hours_offset = rng.randint(11, 20)
+        minutes_offset = rng.randint(0, 59)
+        
+        timestamp = base_date.replace(
+            day=min(days_offset + 1, 28),
+            hour=hours_offset,
+            minute=minutes_offset
+        )
+        
+        quantity = int(row.quantity)
+        unit_price = float(row.unit_price)
+        order_total = quantity * unit_price
+        
+        order_rows.append({
+            'order_number': f"{order_prefix}_{order_counter:06d}",
+            'order_timestamp': timestamp,
+            'order_total': order_total,
+            'party_size': rng.randint(1, 4)
+        })
+        item_rows.append((item_map.get(row.item_name), quantity, unit_price, order_total))
+        order_counter += 1
+    
+    order_ids = []
+    for start in range(0, len(order_rows), UPLOAD_BATCH_SIZE):
+        order_ids.extend(db.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            order_rows[start:start + UPLOAD_BATCH_SIZE]
+        ).scalars().all())
+    
+    # Keep the daily/hourly sales rollups in the same transaction
+    get_sales_rollup_service().record_orders(
+        db, [(o['order_timestamp'], o['order_total']) for o in order_rows]
+    )
+    
+    # ==================================================
+    # STEP 3: Save Order Items (batched executemany)
+    # ==================================================
+    order_items = [
+        {
+            'order_id': order_id,
+            'menu_item_id': item_id,
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': total_price
+        }
+        for order_id, (item_id, quantity, unit_price, total_price) in zip(order_ids, item_rows)
+        if item_id
+    ]
+    for start in range(0, len(order_items), UPLOAD_BATCH_SIZE):
+        db.execute(insert(OrderItem), order_items[start:start + UPLOAD_BATCH_SIZE])
+    
+    return {
+        'orders': len(order_ids),
+        'order_items': len(order_items),
+        'new_menu_items': new_items
+    }
+
+
+@router.post("/upload-csv")
+async def upload_csv(file: UploadFile = File(...)) -> Dict:
+    """Upload sales CSV and queue it for loading (progress via WebSocket)"""
     
     if not file.filename.endswith('.csv'):
         raise HTTPException(400, "Only CSV files supported")
     
+    path = None
     try:
-        content = await file.read()
-        file_content = content.decode('utf-8')
+        # Spool to disk instead of holding the whole file in memory
+        path, content_hash, size = await asyncio.to_thread(spool_upload, file.file, file.filename)
         
-        logger.info(f"📤 Received: {file.filename} ({len(file_content)} bytes)")
+        logger.info(f"📤 Received: {file.filename} ({size} bytes)")
         
-        background_tasks.add_task(process_csv_upload, file_content, file.filename)
+        service = get_upload_job_service()
+        service.attach_loop(asyncio.get_running_loop())
+        job = await asyncio.to_thread(service.submit, path, file.filename, content_hash, size)
         
         return {
-            'status': 'processing',
+            'status': job['status'],
+            'job_id': job['job_id'],
+            'duplicate': job['duplicate'],
+            'resumed': job['resumed'],
             'filename': file.filename,
-            'message': 'Upload started - watch for real-time updates'
+            'message': (
+                f"Already uploaded as job {job['job_id']} ({job['status']})"
+                if job['duplicate']
+                else job['message'] if job['resumed']
+                else 'Upload queued - watch for real-time updates'
+            )
         }
         
     except Exception as e:
         logger.error(f"Upload error: {e}", exc_info=True)
+        if path and os.path.exists(path):
+            os.remove(path)
         raise HTTPException(500, f"Upload failed: {str(e)}")
 
 
+@router.get("/jobs")
+async def list_upload_jobs(limit: int = Query(default=20, ge=1, le=100)) -> Dict:
+    """Recent upload jobs, newest first"""
+    jobs = await asyncio.to_thread(get_upload_job_service().list_jobs, limit)
+    return {'jobs': jobs, 'count': len(jobs)}
+
+
+@router.get("/jobs/{job_id}")
+async def get_upload_job(job_id: str) -> Dict:
+    """Status and progress of one upload job"""
+    job = await asyncio.to_thread(get_upload_job_service().get_job, job_id)
+    if job is None:
+        raise HTTPException(404, f"Upload job {job_id} not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_upload_job(job_id: str) -> Dict:
+    """Cancel a queued job, or stop a running job after its current chunk"""
+    job = await asyncio.to_thread(get_upload_job_service().cancel, job_id)
+    if job is None:
+        raise HTTPException(404, f"Upload job {job_id} not found")
+    return job
+
+
 @router.get("/upload-status")
 async def get_upload_status() -> Dict:
     """Get upload status"""
     return {
         'status': 'ready',
         'connected_clients': len(manager.active_connections),
-        'websocket_url': 'ws://localhost:8000/ws/dashboard'
+        'websocket_url': 'ws://localhost:8000/ws/dashboard',
+        'jobs': await asyncio.to_thread(get_upload_job_service().get_stats)
     }
 
 
@@ -319,17 +448,23 @@ async def clear_uploaded_data() -> Dict:
         ).all()
         
         count = len(uploaded_orders)
+        cleared_days = [order.order_timestamp.date() for order in uploaded_orders]
         
         for order in uploaded_orders:
             db.query(OrderItem).filter(OrderItem.order_id == order.id).delete()
             db.delete(order)
         
+        if cleared_days:
+            db.flush()
+            get_sales_rollup_service().rebuild(db, min(cleared_days), max(cleared_days))
+        
         db.commit()
         
-        await manager.broadcast({
-            'type': 'refresh_dashboard',
-            'message': f'Cleared {count} uploaded orders'
-        })
+        # Their orders are gone, so the same files may be uploaded again
+        cleared_jobs = await asyncio.to_thread(get_upload_job_service().clear_finished)
+        logger.info(f"🧹 Cleared {count} uploaded orders and {cleared_jobs} finished upload jobs")
+        
+        await refresh_dashboard(f'Cleared {count} uploaded orders')
         
         return {
             'status': 'success',
@@ -1,10 +1,22 @@
-"""Database connection and session management"""
+"""
+Database connection and session management
 
-from sqlalchemy import create_engine, text
+Two access paths share the same DATABASE_URL and pool settings:
+- Sync (engine, SessionLocal, get_db) for scripts, ETL and thread-pool work
+- Async (async_engine, AsyncSessionLocal, get_async_db) for async endpoints,
+  so queries never block the event loop and its WebSockets
+"""
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
+from contextlib import asynccontextmanager
 import os
-from typing import Generator
+import threading
+import time
+from typing import AsyncIterator, Dict, Generator, Optional
 import logging
 from dotenv import load_dotenv
 
@@ -13,14 +25,155 @@ logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool settings (DB_POOL_SIZE=0 falls back to NullPool, e.g. behind
+# an external pooler that already multiplexes connections)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true")
+
+
+class PoolMetrics:
+    """Checkout counts and wait times for the connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_opened = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record_checkout(self, wait_seconds: float):
+        wait_ms = wait_seconds * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connections_opened": self.connections_opened,
+                "reuse_rate": (
+                    round(1 - self.connections_opened / self.checkouts, 3)
+                    if self.checkouts
+                    else 0.0
+                ),
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    round(self.total_wait_ms / self.checkouts, 2)
+                    if self.checkouts
+                    else 0.0
+                ),
+                "max_wait_ms": round(self.max_wait_ms, 2),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout (queue wait + any new connect)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+def create_db_engine(url: str, pooled: bool = True):
+    """
+    Create an engine with the configured pool
+
+    Args:
+        url: Database URL
+        pooled: False for a NullPool engine (new connection per session)
+    """
+    if not pooled or DB_POOL_SIZE <= 0:
+        return create_engine(url, poolclass=NullPool, echo=False)
+
+    db_engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        echo=False,
+    )
+    event.listen(db_engine, "connect", lambda *args: pool_metrics.record_connect())
+    return db_engine
+
+
 if not DATABASE_URL:
     logger.warning("No DATABASE_URL - database disabled")
     engine = None
     SessionLocal = None
 else:
-    engine = create_engine(DATABASE_URL, poolclass=NullPool, echo=False)
+    engine = create_db_engine(DATABASE_URL)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    logger.info("✓ Database connection initialized")
+    logger.info(
+        f"✓ Database connection initialized (pool size {DB_POOL_SIZE}, "
+        f"overflow {DB_MAX_OVERFLOW})"
+    )
+
+
+def to_async_url(url: str) -> str:
+    """postgresql://... -> postgresql+psycopg://... (psycopg 3 async driver)"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix) :]
+    return url
+
+
+def create_async_db_engine(url: str):
+    """Create an async engine with the same pool settings as the sync one"""
+    if DB_POOL_SIZE <= 0:
+        return create_async_engine(url, poolclass=NullPool, echo=False)
+    return create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        echo=False,
+    )
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    to_async_url(DATABASE_URL) if DATABASE_URL else None
+)
+
+async_engine = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+if ASYNC_DATABASE_URL:
+    try:
+        async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+        logger.info("✓ Async database connection initialized")
+    except Exception as e:
+        # e.g. the async driver is not installed
+        logger.warning(f"Async database disabled: {e}")
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -33,6 +186,21 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """Async session for services: async with async_session_scope() as db"""
+    if AsyncSessionLocal is None:
+        raise Exception("Database not configured")
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: db: AsyncSession = Depends(get_async_db)"""
+    async with async_session_scope() as session:
+        yield session
+
+
 def init_db():
     if engine is None:
         return
@@ -56,3 +224,30 @@ def check_db_connection() -> bool:
     except Exception as e:
         logger.error(f"Connection failed: {e}")
         return False
+
+
+def get_pool_status() -> Dict:
+    """Get connection pool status and checkout metrics for system info"""
+    if engine is None:
+        return {"enabled": False}
+
+    pool = engine.pool
+    status = {
+        "enabled": True,
+        "pool_class": type(pool).__name__,
+        **pool_metrics.get_stats(),
+    }
+    status["async_enabled"] = async_engine is not None
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": DB_MAX_OVERFLOW,
+                "recycle_seconds": DB_POOL_RECYCLE,
+                "pre_ping": DB_POOL_PRE_PING,
+            }
+        )
+    return status
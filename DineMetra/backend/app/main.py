@@ -6,6 +6,7 @@ Complete real-time restaurant analytics platform
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 # Configure logging
@@ -34,6 +35,42 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Background tasks not started: {e}")
         logger.info("Continuing without background tasks...")
 
+    # Watch model artifacts so retrained models load without a restart
+    try:
+        from app.services.ml_service import model_registry
+
+        model_registry.start()
+    except Exception as e:
+        logger.warning(f"Model hot-reload not started: {e}")
+
+    # Create (and backfill on first run) the sales rollup tables
+    try:
+        from app.database.database import SessionLocal
+        from app.services.sales_rollup_service import get_sales_rollup_service
+
+        if SessionLocal is not None:
+
+            def prepare_rollups():
+                db = SessionLocal()
+                try:
+                    get_sales_rollup_service().ensure_ready(db)
+                finally:
+                    db.close()
+
+            await asyncio.to_thread(prepare_rollups)
+    except Exception as e:
+        logger.warning(f"Sales rollups not prepared: {e}")
+
+    # Resume queued upload jobs (jobs a restart interrupted are marked failed)
+    try:
+        from app.database.database import SessionLocal
+        from app.services.upload_job_service import get_upload_job_service
+
+        if SessionLocal is not None:
+            get_upload_job_service().recover()
+    except Exception as e:
+        logger.warning(f"Upload jobs not recovered: {e}")
+
     logger.info("✅ DineMetra API started successfully")
     logger.info("📊 Dashboard: http://localhost:8000/api/dashboard/dashboard")
     logger.info("📡 WebSocket: ws://localhost:8000/ws/dashboard")
@@ -51,6 +88,19 @@ async def lifespan(app: FastAPI):
         background_service.stop()
     except:
         pass
+    try:
+        from app.services.model_registry import get_model_registry
+
+        get_model_registry().stop()
+    except:
+        pass
+    try:
+        from app.database.database import engine
+
+        if engine is not None:
+            engine.dispose()
+    except:
+        pass
     logger.info("✅ Shutdown complete")
 
 
@@ -197,6 +247,50 @@ def system_info():
     except:
         pass
 
+    try:
+        from app.services.ml_service import model_registry
+
+        info["model_registry"] = model_registry.get_status()
+    except:
+        pass
+
+    try:
+        from app.services.prediction_cache import get_prediction_cache
+
+        info["prediction_cache"] = get_prediction_cache().get_stats()
+    except:
+        pass
+
+    try:
+        from app.database.database import get_pool_status
+
+        info["database_pool"] = get_pool_status()
+    except:
+        pass
+
+    try:
+        from app.services.dashboard_snapshot_service import (
+            get_dashboard_snapshot_service,
+        )
+
+        info["dashboard_snapshot"] = get_dashboard_snapshot_service().get_status()
+    except:
+        pass
+
+    try:
+        from app.services.upload_job_service import get_upload_job_service
+
+        info["upload_jobs"] = get_upload_job_service().get_stats()
+    except:
+        pass
+
+    try:
+        from app.services.historical_service import get_historical_service
+
+        info["historical_data"] = get_historical_service().get_memory_usage()
+    except:
+        pass
+
     return {"success": True, "info": info}
 
 
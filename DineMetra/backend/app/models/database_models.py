@@ -5,10 +5,13 @@ from sqlalchemy import (
     Integer,
     String,
     Float,
+    Date,
     DateTime,
     ForeignKey,
     Boolean,
     Text,
+    Index,
+    text,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -27,6 +30,11 @@ class MenuItem(Base):
     order_items = relationship("OrderItem", back_populates="menu_item")
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Concurrent uploads upsert by name (see app.api.upload)
+    __table_args__ = (
+        Index("uq_menu_items_item_name", "item_name", unique=True),
+    )
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -70,3 +78,56 @@ class WaitTime(Base):
     day_of_week = Column(Integer, index=True)
     hour_of_day = Column(Integer, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DailySalesRollup(Base):
+    """Order totals per day, kept current as orders are loaded"""
+
+    __tablename__ = "daily_sales_rollup"
+    sales_date = Column(Date, primary_key=True)
+    total_sales = Column(Float, nullable=False, default=0.0)
+    order_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class HourlySalesRollup(Base):
+    """Order totals per day and hour of day, kept current as orders are loaded"""
+
+    __tablename__ = "hourly_sales_rollup"
+    sales_date = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    total_sales = Column(Float, nullable=False, default=0.0)
+    order_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UploadJob(Base):
+    """Queued CSV upload, persisted so status survives restarts"""
+
+    __tablename__ = "upload_jobs"
+    id = Column(String(32), primary_key=True)
+    filename = Column(String(255), nullable=False)
+    content_hash = Column(String(64), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    spool_path = Column(String(500))
+    total_bytes = Column(Integer, default=0)
+    bytes_processed = Column(Integer, default=0)
+    rows_processed = Column(Integer, default=0)
+    orders_created = Column(Integer, default=0)
+    progress = Column(Integer, default=0)
+    message = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    # At most one queued, running or completed job per file content
+    __table_args__ = (
+        Index(
+            "uq_upload_jobs_live_hash",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running', 'completed')"),
+            sqlite_where=text("status IN ('queued', 'running', 'completed')"),
+        ),
+    )
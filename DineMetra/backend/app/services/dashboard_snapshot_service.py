@@ -0,0 +1,160 @@
+"""
+Dashboard Snapshot Service
+Serves the consolidated dashboard from a pre-serialized in-memory snapshot
+
+Building the dashboard touches the database, weather.gov, Ticketmaster and
+the models. The background task service rebuilds the snapshot on a
+schedule and after uploads; requests just return the stored JSON bytes with
+an ETag, so unchanged dashboards can be answered with 304 Not Modified.
+
+The version only moves when the dashboard content changes (timestamps and
+section timings are ignored), and is sent with the WebSocket
+refresh_dashboard message so clients know which snapshot to fetch.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.services.dashboard_service import get_dashboard_service
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_USER = {"name": "Manager", "restaurant": "Tulsa Capstone Grill"}
+
+# Fields that change on every build without the dashboard changing
+VOLATILE_FIELDS = ("timestamp", "section_timings_ms", "snapshot_version")
+
+
+class DashboardSnapshotService:
+    """
+    Holds the latest serialized dashboard
+
+    Features:
+    - One rebuild at a time (concurrent callers wait for it)
+    - Content-hash ETag and version number
+    - Rebuilds on read if the snapshot is older than max_age_seconds
+      (covers the scheduler not running)
+    """
+
+    def __init__(self, dashboard_service=None, max_age_seconds: float = 300.0):
+        self.dashboard_service = dashboard_service or get_dashboard_service()
+        self.max_age_seconds = max_age_seconds
+
+        self.version = 0
+        self.refresh_count = 0
+        self.failed_refreshes = 0
+        self._snapshot: Optional[Dict] = None
+        self._content_hash: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, reason: str = "scheduled") -> Dict:
+        """
+        Rebuild the snapshot
+
+        Returns:
+            The current snapshot (the previous one if the rebuild failed)
+        """
+        async with self._lock:
+            return await self._rebuild(reason)
+
+    async def _rebuild(self, reason: str) -> Dict:
+        started = time.perf_counter()
+        try:
+            dashboard = await self.dashboard_service.get_full_dashboard()
+            dashboard["user"] = DASHBOARD_USER
+            dashboard["timestamp"] = datetime.now().isoformat()
+            dashboard = jsonable_encoder(dashboard)
+
+            stable = {k: v for k, v in dashboard.items() if k not in VOLATILE_FIELDS}
+            content_hash = hashlib.sha1(
+                json.dumps(stable, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+
+            self.refresh_count += 1
+            if content_hash == self._content_hash and self._snapshot:
+                # Nothing changed: keep the version/ETag clients already have
+                self._snapshot["refreshed_at"] = time.monotonic()
+                return self._snapshot
+
+            self.version += 1
+            dashboard["snapshot_version"] = self.version
+            self._content_hash = content_hash
+            self._snapshot = {
+                "body": json.dumps(dashboard).encode("utf-8"),
+                "etag": f'"{self.version}-{content_hash[:16]}"',
+                "version": self.version,
+                "generated_at": dashboard["timestamp"],
+                "refreshed_at": time.monotonic(),
+                "build_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            logger.info(
+                f"📸 Dashboard snapshot v{self.version} built in "
+                f"{self._snapshot['build_ms']}ms ({reason})"
+            )
+            return self._snapshot
+
+        except Exception as e:
+            self.failed_refreshes += 1
+            logger.error(f"Dashboard snapshot refresh failed ({reason}): {e}")
+            if self._snapshot is None:
+                raise
+            return self._snapshot
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._snapshot["refreshed_at"] < self.max_age_seconds
+        )
+
+    async def get_snapshot(self, force_refresh: bool = False) -> Dict:
+        """Get the current snapshot, building it if missing or too old"""
+        if not force_refresh and self._is_fresh():
+            return self._snapshot
+
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if not force_refresh and self._is_fresh():
+                return self._snapshot
+            reason = "forced" if force_refresh else "on-demand"
+            return await self._rebuild(reason)
+
+    def get_status(self) -> Dict:
+        """Get snapshot status for system info"""
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "etag": snapshot["etag"] if snapshot else None,
+            "generated_at": snapshot["generated_at"] if snapshot else None,
+            "age_seconds": (
+                round(time.monotonic() - snapshot["refreshed_at"], 1)
+                if snapshot
+                else None
+            ),
+            "size_bytes": len(snapshot["body"]) if snapshot else 0,
+            "last_build_ms": snapshot["build_ms"] if snapshot else None,
+            "max_age_seconds": self.max_age_seconds,
+            "refresh_count": self.refresh_count,
+            "failed_refreshes": self.failed_refreshes,
+        }
+
+
+# Global snapshot service instance
+_dashboard_snapshot_service = None
+
+
+def get_dashboard_snapshot_service() -> DashboardSnapshotService:
+    """Get or create the global dashboard snapshot service instance"""
+    global _dashboard_snapshot_service
+    if _dashboard_snapshot_service is None:
+        _dashboard_snapshot_service = DashboardSnapshotService(
+            max_age_seconds=float(os.getenv("DASHBOARD_SNAPSHOT_MAX_AGE", "300"))
+        )
+    return _dashboard_snapshot_service
@@ -3,15 +3,19 @@ Enhanced ML Prediction Service - Integrated with DineMetra
 Wraps existing ML models and adds detailed factor breakdowns for dashboard
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import logging
 
+import pandas as pd
+
 # Import existing services
-from app.services.ml_service import (
-    wait_time_predictor,
-    busyness_predictor,
-    item_sales_predictor,
+from app.services.ml_service import HIGH_OCCUPANCY_PERCENT, model_registry
+from app.services.prediction_cache import get_prediction_cache
+from app.services.prediction_context import (
+    DAY_NAMES,
+    PredictionContext,
+    get_time_period,
 )
 from app.services.weather_service import WeatherService
 from app.services.event_service import EventService
@@ -24,25 +28,84 @@ class EnhancedPredictionService:
 
     def __init__(self):
         """Initialize with existing services"""
-        self.wait_time_predictor = wait_time_predictor
-        self.busyness_predictor = busyness_predictor
-        self.item_sales_predictor = item_sales_predictor
         self.weather_service = WeatherService()
         self.event_service = EventService()
+        self.prediction_cache = get_prediction_cache()
+
+    # Predictors are looked up on every use so hot-reloaded models take effect
+    @property
+    def wait_time_predictor(self):
+        return model_registry.get("wait_time")
+
+    @property
+    def busyness_predictor(self):
+        return model_registry.get("busyness")
+
+    @property
+    def item_sales_predictor(self):
+        return model_registry.get("item_sales")
+
+    def create_context(self) -> PredictionContext:
+        """
+        Create a context to share across the predictions of one request
+
+        Pass it to every predict_*_enhanced call in the request so weather,
+        events and calendar features are resolved once.
+        """
+        return PredictionContext(self.weather_service, self.event_service)
 
     def predict_wait_time_enhanced(
         self,
         party_size: int,
         current_occupancy: float,
         timestamp: Optional[datetime] = None,
+        context: Optional[PredictionContext] = None,
     ) -> Dict:
         """
         Enhanced wait time prediction with detailed factors
         Uses existing wait_time_predictor and adds factor breakdown
+
+        Memoized on (party size, occupancy bucket, time slot); see prediction_cache.
+        The key also records which side of the model's high-occupancy cut
+        the occupancy is on, and the prediction uses the raw occupancy, so
+        a bucket straddling the cut can't mislabel a caller.
         """
         if timestamp is None:
             timestamp = datetime.now()
-
+        if context is None:
+            context = self.create_context()
+
+        slot = self.prediction_cache.time_bucket(timestamp)
+        occupancy = self.prediction_cache.occupancy_bucket(current_occupancy)
+        key = (
+            "wait_time",
+            model_registry.version,
+            party_size,
+            occupancy,
+            current_occupancy > HIGH_OCCUPANCY_PERCENT,
+            slot,
+            self.event_service.get_date_fingerprint(slot),
+        )
+        result = self.prediction_cache.get_or_compute(
+            key,
+            lambda: self._predict_wait_time_enhanced(
+                party_size, current_occupancy, slot, context
+            ),
+        )
+
+        # Re-stamp the caller's own values
+        if result.get("factors"):
+            result["factors"]["current_occupancy"] = round(current_occupancy, 1)
+        result["timestamp"] = datetime.now().isoformat()
+        return result
+
+    def _predict_wait_time_enhanced(
+        self,
+        party_size: int,
+        current_occupancy: float,
+        timestamp: datetime,
+        context: PredictionContext,
+    ) -> Dict:
         try:
             # Get base prediction from model
             base_result = self.wait_time_predictor.predict(
@@ -58,8 +121,9 @@ class EnhancedPredictionService:
             base_factors = base_result.get("factors", {})
 
             # Get additional context for frontend display
-            weather_data = self._get_weather_details(timestamp)
-            event_data = self._get_event_details(timestamp)
+            weather_data = self._get_weather_details(timestamp, context)
+            event_data = self._get_event_details(timestamp, context)
+            calendar = context.get_calendar_features(timestamp)
 
             # Categorize wait time
             wait_category = self._categorize_wait_time(predicted_wait)
@@ -77,11 +141,11 @@ class EnhancedPredictionService:
                     # Original factors from model
                     "current_occupancy": round(current_occupancy, 1),
                     "party_size": party_size,
-                    "day_of_week": self._get_day_name(timestamp.weekday()),
-                    "hour": timestamp.hour,
-                    "time_period": self._get_time_period(timestamp.hour),
-                    "is_weekend": timestamp.weekday() >= 5,
-                    "is_peak_hour": timestamp.hour in [11, 12, 13, 17, 18, 19, 20],
+                    "day_of_week": calendar["day_of_week"],
+                    "hour": calendar["hour"],
+                    "time_period": calendar["time_period"],
+                    "is_weekend": calendar["is_weekend"],
+                    "is_peak_hour": calendar["is_peak_hour"],
                     # Weather factors (from model's calculation)
                     "weather_condition": base_factors.get(
                         "weather", weather_data.get("condition", "Unknown")
@@ -114,17 +178,44 @@ class EnhancedPredictionService:
                 "factors": {},
             }
 
-    def predict_busyness_enhanced(self, timestamp: Optional[datetime] = None) -> Dict:
+    def predict_busyness_enhanced(
+        self,
+        timestamp: Optional[datetime] = None,
+        context: Optional[PredictionContext] = None,
+    ) -> Dict:
         """
         Enhanced busyness prediction with detailed factors
         Uses existing busyness_predictor and adds factor breakdown
+
+        Memoized on the time slot; see prediction_cache
         """
         if timestamp is None:
             timestamp = datetime.now()
-
+        if context is None:
+            context = self.create_context()
+
+        slot = self.prediction_cache.time_bucket(timestamp)
+        key = (
+            "busyness",
+            model_registry.version,
+            slot,
+            self.event_service.get_date_fingerprint(slot),
+        )
+        result = self.prediction_cache.get_or_compute(
+            key, lambda: self._predict_busyness_enhanced(slot, context)
+        )
+
+        if result.get("factors"):
+            result["factors"]["time"] = timestamp.strftime("%I:%M %p")
+        result["timestamp"] = datetime.now().isoformat()
+        return result
+
+    def _predict_busyness_enhanced(
+        self, timestamp: datetime, context: PredictionContext
+    ) -> Dict:
         try:
             # Get weather for prediction
-            weather_data = self._get_weather_details(timestamp)
+            weather_data = self._get_weather_details(timestamp, context)
             weather_condition = weather_data.get("condition", "sunny")
 
             # Get base prediction from model
@@ -138,7 +229,8 @@ class EnhancedPredictionService:
             base_confidence = base_result.get("confidence", 0.85)
 
             # Get event context
-            event_data = self._get_event_details(timestamp)
+            event_data = self._get_event_details(timestamp, context)
+            calendar = context.get_calendar_features(timestamp)
 
             # Generate recommendation
             recommendation = self._generate_busyness_recommendation(level, event_data)
@@ -154,13 +246,13 @@ class EnhancedPredictionService:
                 "confidence": base_confidence,
                 "recommendation": recommendation,
                 "factors": {
-                    "day_of_week": self._get_day_name(timestamp.weekday()),
+                    "day_of_week": calendar["day_of_week"],
                     "time": timestamp.strftime("%I:%M %p"),
-                    "time_period": self._get_time_period(timestamp.hour),
-                    "is_weekend": timestamp.weekday() >= 5,
-                    "is_peak_hour": timestamp.hour in [11, 12, 13, 17, 18, 19, 20],
-                    "is_lunch": timestamp.hour in [11, 12, 13],
-                    "is_dinner": timestamp.hour in [17, 18, 19, 20],
+                    "time_period": calendar["time_period"],
+                    "is_weekend": calendar["is_weekend"],
+                    "is_peak_hour": calendar["is_peak_hour"],
+                    "is_lunch": calendar["is_lunch"],
+                    "is_dinner": calendar["is_dinner"],
                     # Weather
                     "weather_condition": weather_condition,
                     "temperature_f": weather_data.get("temperature_f"),
@@ -172,7 +264,7 @@ class EnhancedPredictionService:
                     ),
                     # Historical
                     "historical_average": int(percentage * 0.95),
-                    "is_holiday": timestamp.month in [11, 12],
+                    "is_holiday": calendar["is_holiday"],
                 },
                 "timestamp": datetime.now().isoformat(),
             }
@@ -194,14 +286,47 @@ class EnhancedPredictionService:
         target_date: Optional[datetime] = None,
         item_name: str = "Unknown",
         category: str = "Entrees",
+        context: Optional[PredictionContext] = None,
     ) -> Dict:
         """
         Enhanced sales prediction with detailed factors
         Uses existing item_sales_predictor and adds factor breakdown
+
+        Memoized per item and calendar day; see prediction_cache
         """
         if target_date is None:
             target_date = datetime.now()
-
+        if context is None:
+            context = self.create_context()
+
+        day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        key = (
+            "sales",
+            model_registry.version,
+            item_id,
+            item_name,
+            category,
+            day,
+            self.event_service.get_date_fingerprint(day),
+        )
+        result = self.prediction_cache.get_or_compute(
+            key,
+            lambda: self._predict_sales_enhanced(
+                item_id, day, item_name, category, context
+            ),
+        )
+
+        result["timestamp"] = datetime.now().isoformat()
+        return result
+
+    def _predict_sales_enhanced(
+        self,
+        item_id: int,
+        target_date: datetime,
+        item_name: str,
+        category: str,
+        context: PredictionContext,
+    ) -> Dict:
         try:
             # Get base prediction from model
             base_result = self.item_sales_predictor.predict_daily_sales(
@@ -216,10 +341,11 @@ class EnhancedPredictionService:
             base_confidence = base_result.get("confidence", 0.75)
 
             # Get weather context
-            weather_data = self._get_weather_details(target_date)
+            weather_data = self._get_weather_details(target_date, context)
 
             # Get event context
-            event_data = self._get_event_details(target_date)
+            event_data = self._get_event_details(target_date, context)
+            calendar = context.get_calendar_features(target_date)
 
             # Determine if item is weather sensitive
             weather_sensitive = self._is_weather_sensitive_item(item_name, category)
@@ -245,10 +371,10 @@ class EnhancedPredictionService:
                 },
                 "date": target_date.strftime("%Y-%m-%d"),
                 "factors": {
-                    "day_of_week": self._get_day_name(target_date.weekday()),
-                    "is_weekend": target_date.weekday() >= 5,
-                    "is_holiday": target_date.month in [11, 12],
-                    "month": target_date.month,
+                    "day_of_week": calendar["day_of_week"],
+                    "is_weekend": calendar["is_weekend"],
+                    "is_holiday": calendar["is_holiday"],
+                    "month": calendar["month"],
                     "category": category,
                     # Weather
                     "weather_condition": weather_data.get("condition", "Unknown"),
@@ -276,32 +402,50 @@ class EnhancedPredictionService:
                 "factors": {},
             }
 
+    def forecast_menu_sales(
+        self,
+        dates: Sequence[datetime],
+        items: Optional[Sequence[Tuple[int, str, str]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Forecast sales for many items and days in one model pass
+        Returns a tidy item x date DataFrame for purchasing and dashboards
+        """
+        return self.item_sales_predictor.forecast_menu(dates, items)
+
     # Helper methods
 
-    def _get_weather_details(self, timestamp: datetime) -> Dict:
+    def _get_weather_details(
+        self, timestamp: datetime, context: Optional[PredictionContext] = None
+    ) -> Dict:
         """
         Get weather details for a timestamp - CONSISTENT VERSION
 
         Always uses forecast data for consistency across predictions
         """
+        if context is None:
+            context = self.create_context()
+        return context.resolve(
+            ("weather_details", timestamp.date()),
+            lambda: self._resolve_weather_details(timestamp, context),
+        )
+
+    def _resolve_weather_details(
+        self, timestamp: datetime, context: PredictionContext
+    ) -> Dict:
         try:
-            # Get all forecasts
-            forecasts = self.weather_service.get_forecast(days=7)
-
-            target_date = timestamp.date().isoformat()
-
             # Find matching forecast
-            for forecast in forecasts:
-                if forecast.get("date") == target_date:
-                    return {
-                        "condition": forecast.get("condition", "Unknown"),
-                        "temperature_f": forecast.get("temperature_high_f"),
-                        "precipitation_chance": forecast.get("precipitation_chance", 0),
-                    }
+            forecast = context.get_forecast_for_date(timestamp)
+            if forecast:
+                return {
+                    "condition": forecast.get("condition", "Unknown"),
+                    "temperature_f": forecast.get("temperature_high_f"),
+                    "precipitation_chance": forecast.get("precipitation_chance", 0),
+                }
 
             # If no forecast match and it's today, use current weather
             if timestamp.date() == datetime.now().date():
-                current = self.weather_service.get_current_weather()
+                current = context.get_current_weather()
                 if current:
                     # Standardize the condition text
                     condition_text = current.get("condition", "")
@@ -349,12 +493,14 @@ class EnhancedPredictionService:
         else:
             return "cloudy"  # Default
 
-    def _get_event_details(self, timestamp: datetime) -> Dict:
+    def _get_event_details(
+        self, timestamp: datetime, context: Optional[PredictionContext] = None
+    ) -> Dict:
         """Get event details for a timestamp"""
         try:
-            events = self.event_service.get_events_for_date(
-                timestamp, use_cache_only=True
-            )
+            if context is None:
+                context = self.create_context()
+            events = context.get_events(timestamp)
 
             if not events:
                 return {"events": [], "max_attendance": 0, "closest_distance": None}
@@ -392,7 +538,7 @@ class EnhancedPredictionService:
         parts = []
 
         # Base explanation
-        if occupancy > 80:
+        if occupancy > HIGH_OCCUPANCY_PERCENT:
             parts.append("high current occupancy")
 
         # Weather impact
@@ -459,31 +605,20 @@ class EnhancedPredictionService:
     @staticmethod
     def _get_day_name(day_index: int) -> str:
         """Convert day index to name"""
-        days = [
-            "Monday",
-            "Tuesday",
-            "Wednesday",
-            "Thursday",
-            "Friday",
-            "Saturday",
-            "Sunday",
-        ]
-        return days[day_index % 7]
+        return DAY_NAMES[day_index % 7]
 
     @staticmethod
     def _get_time_period(hour: int) -> str:
         """Convert hour to time period"""
-        if 6 <= hour < 11:
-            return "breakfast"
-        elif 11 <= hour < 15:
-            return "lunch"
-        elif 15 <= hour < 17:
-            return "afternoon"
-        elif 17 <= hour < 22:
-            return "dinner"
-        else:
-            return "late_night"
+        return get_time_period(hour)
 
 
 # Create singleton instance
 enhanced_prediction_service = EnhancedPredictionService()
+
+# Cached predictions belong to the model that made them
+model_registry.add_listener(
+    lambda name, version: enhanced_prediction_service.prediction_cache.clear(
+        f"model '{name}' reloaded"
+    )
+)
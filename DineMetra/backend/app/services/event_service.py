@@ -3,9 +3,13 @@ import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 import logging
+import threading
 from math import radians, sin, cos, sqrt, atan2
+
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -24,6 +28,14 @@ class EventService:
     Renamed from EventDataService to match ml_service imports.
     """
 
+    # Parsed event cache files, shared by every EventService instance
+    # (ml_service, dashboard, predictions all create their own)
+    _index: Dict[str, Dict] = {}
+    _index_lock = threading.Lock()
+
+    # Impact multiplier by time tier: within 2h, within 3h, further away
+    TIME_FACTORS = (1.0, 0.5, 0.1)
+
     def __init__(self, config_path: str = ".env"):
         # Restaurant location (Tulsa, OK)
         self.restaurant_location = {
@@ -58,19 +70,19 @@ class EventService:
         This is the method ml_service calls.
         """
         try:
-            # 1. Get all events for this date (Fast, from cache)
-            events = self.get_events_for_date(timestamp, use_cache_only=True)
+            # 1. Get all events for this date (Fast, from the in-memory index)
+            entry = self._get_index_entry(timestamp)
 
-            if not events:
+            if entry is None or not entry["scored"]:
                 return 0.0
 
             max_impact = 0.0
 
-            # 2. Calculate impact for each event and find the biggest one
-            for event in events:
-                impact_data = self._calculate_single_event_impact(event, timestamp)
-                if impact_data["impact_minutes"] > max_impact:
-                    max_impact = impact_data["impact_minutes"]
+            # 2. Apply the time factor to each pre-scored event, keep the biggest
+            for event_datetime, base_impact in entry["scored"]:
+                impact = self._timed_impact(event_datetime, base_impact, timestamp)
+                if impact > max_impact:
+                    max_impact = impact
 
             return float(max_impact)
 
@@ -78,22 +90,58 @@ class EventService:
             logger.error(f"Error calculating aggregate impact: {e}")
             return 0.0
 
+    def calculate_impact_batch(self, timestamps: Sequence[datetime]) -> np.ndarray:
+        """
+        Event impact minutes for many timestamps in one NumPy pass per day.
+
+        Same result as calculate_impact() for each timestamp, e.g. for every
+        15-minute slot of a forecast grid or a backtest.
+        """
+        times = pd.DatetimeIndex(timestamps)
+        impacts = np.zeros(len(times), dtype=np.float64)
+        if len(times) == 0:
+            return impacts
+
+        if times.tz is not None:
+            # Cached events are naive local times; keep the scalar semantics
+            return np.array([self.calculate_impact(t) for t in timestamps], float)
+
+        times_ns = times.asi8
+        days = times.normalize()
+        for day in days.unique():
+            entry = self._get_index_entry(day.to_pydatetime())
+            if entry is None or len(entry["event_ns"]) == 0:
+                continue
+
+            rows = np.flatnonzero(days == day)
+            # (timestamps x events) hours until each event, as in _timed_impact
+            seconds = (
+                entry["event_ns"][np.newaxis, :] - times_ns[rows, np.newaxis]
+            ) / 1e9
+            distance = np.abs(seconds / 3600)
+            tier = np.where(distance <= 2, 0, np.where(distance <= 3, 1, 2))
+
+            # Pick each event's pre-rounded impact for its tier
+            n_tiers = len(self.TIME_FACTORS)
+            event_impacts = entry["tier_impacts"].ravel()[
+                np.arange(len(entry["event_ns"])) * n_tiers + tier
+            ]
+            impacts[rows] = np.maximum(event_impacts.max(axis=1), 0.0)
+
+        return impacts
+
     def get_events_for_date(
         self, date_obj: datetime, use_cache_only: bool = False
     ) -> List[Dict]:
         """
         Get events for a specific date.
         """
-        # 1. Check Cache
-        cache_file = self.cache_dir / f"events_{date_obj.strftime('%Y%m%d')}.json"
+        # 1. Check Cache (parsed once, then served from memory)
+        entry = self._get_index_entry(date_obj)
 
-        if cache_file.exists():
-            try:
-                with open(cache_file, "r") as f:
-                    data = json.load(f)
-                    return data.get("events", [])
-            except Exception as e:
-                logger.error(f"Cache read error: {e}")
+        if entry is not None:
+            # Copies so callers can't alter the shared index
+            return [dict(event) for event in entry["events"]]
 
         if use_cache_only:
             return []
@@ -102,38 +150,115 @@ class EventService:
         # Note: ticketmaster fetching requires start/end range
         return self.fetch_ticketmaster_events(date_obj, date_obj + timedelta(days=1))
 
+    def get_date_fingerprint(self, date_obj: datetime) -> Optional[tuple]:
+        """
+        Cheap signature of a date's cached events.
+        Changes whenever the cache file is rewritten; used in prediction cache keys.
+        """
+        try:
+            stat = self._cache_file(date_obj).stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
     # ========================================
-    # INTERNAL IMPACT LOGIC
+    # IN-MEMORY EVENT INDEX
     # ========================================
 
-    def _calculate_single_event_impact(
-        self, event: Dict, current_time: datetime
-    ) -> Dict:
+    def _cache_file(self, date_obj: datetime) -> Path:
+        return self.cache_dir / f"events_{date_obj.strftime('%Y%m%d')}.json"
+
+    def _get_index_entry(self, date_obj: datetime) -> Optional[Dict]:
         """
-        Your original calculate_event_impact logic.
+        Get the parsed events for a date, re-reading the JSON file only
+        when its mtime/size change.
+
+        Entry:
+            signature     (mtime_ns, size) of the file
+            events        raw event dicts
+            scored        [(event_datetime, base_impact)] per event
+            event_ns      int64 start times of the timed (naive) events
+            tier_impacts  (n, 3) rounded impact per TIME_FACTORS tier for those
         """
+        cache_file = self._cache_file(date_obj)
         try:
-            # Parse event time safely
-            event_datetime_str = event.get("event_datetime") or event.get("time")
-            if not event_datetime_str:
-                return {"impact_minutes": 0}
+            stat = cache_file.stat()
+        except OSError:
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(cache_file)
+        entry = EventService._index.get(key)
+        if entry is not None and entry["signature"] == signature:
+            return entry
 
-            # Handle 'Z' if present
-            if event_datetime_str.endswith("Z"):
-                event_datetime_str = event_datetime_str.replace("Z", "+00:00")
+        try:
+            with open(cache_file, "r") as f:
+                events = json.load(f).get("events", [])
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return None
 
-            event_datetime = datetime.fromisoformat(event_datetime_str)
+        scored = [
+            (self._parse_event_datetime(event), self._base_impact(event))
+            for event in events
+        ]
+        # Vectorizable view for calculate_impact_batch; rounding is done here
+        # in Python so batch results match calculate_impact exactly
+        timed = [
+            (event_datetime, base_impact)
+            for event_datetime, base_impact in scored
+            if event_datetime is not None and event_datetime.tzinfo is None
+        ]
+        entry = {
+            "signature": signature,
+            "events": events,
+            "scored": scored,
+            "event_ns": np.array(
+                [pd.Timestamp(event_datetime).value for event_datetime, _ in timed],
+                dtype=np.int64,
+            ),
+            "tier_impacts": np.array(
+                [
+                    [round(base_impact * factor, 1) for factor in self.TIME_FACTORS]
+                    for _, base_impact in timed
+                ],
+                dtype=np.float64,
+            ).reshape(len(timed), len(self.TIME_FACTORS)),
+        }
+        with EventService._index_lock:
+            EventService._index[key] = entry
+        return entry
 
-            # Time proximity
-            hours_until_event = (event_datetime - current_time).total_seconds() / 3600
+    def _invalidate_index(self, date_obj: datetime):
+        with EventService._index_lock:
+            EventService._index.pop(str(self._cache_file(date_obj)), None)
 
-            if -2 <= hours_until_event <= 2:
-                time_factor = 1.0
-            elif -3 <= hours_until_event <= 3:
-                time_factor = 0.5
-            else:
-                time_factor = 0.1
+    # ========================================
+    # INTERNAL IMPACT LOGIC
+    # ========================================
+
+    @staticmethod
+    def _parse_event_datetime(event: Dict) -> Optional[datetime]:
+        """Parse an event's ISO start time safely"""
+        event_datetime_str = event.get("event_datetime") or event.get("time")
+        if not event_datetime_str:
+            return None
+
+        # Handle 'Z' if present
+        if event_datetime_str.endswith("Z"):
+            event_datetime_str = event_datetime_str.replace("Z", "+00:00")
+
+        try:
+            return datetime.fromisoformat(event_datetime_str)
+        except ValueError as e:
+            logger.error(f"Impact calc error: {e}")
+            return None
 
+    @staticmethod
+    def _base_impact(event: Dict) -> float:
+        """Time-independent part of an event's impact (type x distance x attendance)"""
+        try:
             # Distance factor
             distance = event.get("distance_miles", 5)
             if distance < 0.5:
@@ -168,15 +293,47 @@ class EventService:
             else:
                 attendance_factor = 0.5
 
-            impact_minutes = (
-                type_impact * distance_factor * attendance_factor * time_factor
-            )
-
-            return {"impact_minutes": round(impact_minutes, 1)}
+            return type_impact * distance_factor * attendance_factor
 
         except Exception as e:
             logger.error(f"Impact calc error: {e}")
-            return {"impact_minutes": 0}
+            return 0.0
+
+    @staticmethod
+    def _timed_impact(
+        event_datetime: Optional[datetime], base_impact: float, current_time: datetime
+    ) -> float:
+        """Scale a base impact by how close current_time is to the event"""
+        if event_datetime is None:
+            return 0
+
+        try:
+            # Time proximity
+            hours_until_event = (event_datetime - current_time).total_seconds() / 3600
+        except TypeError as e:
+            # Timezone-aware event vs naive request time
+            logger.error(f"Impact calc error: {e}")
+            return 0
+
+        if -2 <= hours_until_event <= 2:
+            time_factor = EventService.TIME_FACTORS[0]
+        elif -3 <= hours_until_event <= 3:
+            time_factor = EventService.TIME_FACTORS[1]
+        else:
+            time_factor = EventService.TIME_FACTORS[2]
+
+        return round(base_impact * time_factor, 1)
+
+    def _calculate_single_event_impact(
+        self, event: Dict, current_time: datetime
+    ) -> Dict:
+        """
+        Your original calculate_event_impact logic.
+        """
+        impact_minutes = self._timed_impact(
+            self._parse_event_datetime(event), self._base_impact(event), current_time
+        )
+        return {"impact_minutes": impact_minutes}
 
     # ========================================
     # TICKETMASTER API & HELPERS
@@ -270,9 +427,10 @@ class EventService:
             return None
 
     def save_events_to_cache(self, events: List[Dict], date: datetime):
-        cache_file = self.cache_dir / f"events_{date.strftime('%Y%m%d')}.json"
+        cache_file = self._cache_file(date)
         with open(cache_file, "w") as f:
             json.dump({"events": events}, f, indent=2)
+        self._invalidate_index(date)
 
     # --- KEEP YOUR HELPER METHODS ---
     def _calculate_distance(self, lat1, lng1, lat2, lng2):
@@ -3,14 +3,31 @@ Historical Comparison Service
 Compare current metrics with past performance
 """
 
+import hashlib
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import threading
 from pathlib import Path
 
+from etl import processed_store
+
 logger = logging.getLogger(__name__)
 
+# Columns read from the processed data and their in-memory dtypes
+# (timestamps are parsed to datetime64)
+ORDER_DTYPES = {"order_id": "int32", "order_total": "float32"}
+WAIT_TIME_DTYPES = {"order_id": "int32"}
+WAIT_DTYPE = "float32"  # float so missing waits stay NaN
+
+# Per-day aggregate columns: (sum, count, mean)
+SALES_COLUMNS = ("sales_total", "order_count", "average_order")
+WAIT_COLUMNS = ("wait_total", "wait_count", "wait_mean")
+
+# Bytes hashed at each end of a CSV to tell appends from rewrites
+FINGERPRINT_BYTES = 64 * 1024
+
 
 class HistoricalService:
     """
@@ -21,53 +38,437 @@ class HistoricalService:
     - Compare today vs same day last year
     - Calculate trends and changes
     - Provide insights
+
+    Data is loaded on first use, so workers that never serve a
+    comparison never hold a copy.
     """
 
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.processed_dir = self.data_dir / "processed"
 
-        # Load historical data
-        self._load_historical_data()
-
-        logger.info("Historical Service initialized")
+        self.wait_time_col = None
+        self.wait_col = None
+        self._file_state = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+        logger.info("Historical Service initialized (data loads on first use)")
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_historical_data()
+                self._loaded = True
+
+    @property
+    def orders(self) -> pd.DataFrame:
+        self._ensure_loaded()
+        return self._orders
+
+    @property
+    def wait_times(self) -> pd.DataFrame:
+        self._ensure_loaded()
+        return self._wait_times
+
+    @property
+    def daily_sales(self) -> pd.DataFrame:
+        self._ensure_loaded()
+        return self._daily_sales
+
+    @property
+    def daily_waits(self) -> pd.DataFrame:
+        self._ensure_loaded()
+        return self._daily_waits
+
+    def _source(self, name: str) -> Optional[Path]:
+        """Parquet dataset or CSV the processed data is read from"""
+        return processed_store.source_path(name, self.processed_dir)
 
     def _load_historical_data(self):
-        """Load historical data from processed files"""
+        """Load historical data from processed files (Parquet or CSV)"""
+        self._file_state = {}
         try:
             # Load orders
-            orders_file = self.processed_dir / "orders_from_real_data.csv"
-            if orders_file.exists():
-                self.orders = pd.read_csv(orders_file)
-                self.orders["order_timestamp"] = pd.to_datetime(
-                    self.orders["order_timestamp"]
+            orders_source = self._source("orders")
+            if orders_source is not None:
+                self._orders = self._read_orders(orders_source)
+                self._remember_file("orders", orders_source, len(self._orders))
+                logger.info(
+                    f"✓ Loaded {len(self._orders)} historical orders "
+                    f"({self._frame_mb(self._orders):.2f} MB)"
                 )
-                self.orders["date"] = self.orders["order_timestamp"].dt.date
-                logger.info(f"✓ Loaded {len(self.orders)} historical orders")
             else:
                 logger.warning("No historical orders data found")
-                self.orders = pd.DataFrame()
+                self._orders = pd.DataFrame()
 
             # Load wait times (if available)
-            wait_times_file = self.processed_dir / "wait_times_from_real_data.csv"
-            if wait_times_file.exists():
-                self.wait_times = pd.read_csv(wait_times_file)
-                time_col = (
-                    "log_timestamp"
-                    if "log_timestamp" in self.wait_times.columns
-                    else "timestamp_quoted"
+            wait_times_source = self._source("wait_times")
+            if wait_times_source is not None:
+                self._wait_times = self._read_wait_times(wait_times_source)
+                self._remember_file(
+                    "wait_times", wait_times_source, len(self._wait_times)
+                )
+                logger.info(
+                    f"✓ Loaded {len(self._wait_times)} historical wait times "
+                    f"({self._frame_mb(self._wait_times):.2f} MB)"
                 )
-                self.wait_times[time_col] = pd.to_datetime(self.wait_times[time_col])
-                self.wait_times["date"] = self.wait_times[time_col].dt.date
-                logger.info(f"✓ Loaded {len(self.wait_times)} historical wait times")
             else:
                 logger.warning("No historical wait times data found")
-                self.wait_times = pd.DataFrame()
+                self._wait_times = pd.DataFrame()
 
         except Exception as e:
             logger.error(f"Error loading historical data: {e}")
-            self.orders = pd.DataFrame()
-            self.wait_times = pd.DataFrame()
+            self._orders = pd.DataFrame()
+            self._wait_times = pd.DataFrame()
+
+        self._build_daily_aggregates()
+
+    def _read_orders(self, path: Path, skip_rows: int = 0) -> pd.DataFrame:
+        """
+        Read only the order columns comparisons need, with compact dtypes
+
+        skip_rows reads just the rows appended to a CSV after them.
+        """
+        wanted = set(ORDER_DTYPES) | {"order_timestamp"}
+        if not skip_rows:
+            return processed_store.read_processed(
+                "orders",
+                columns=list(wanted),
+                processed_dir=self.processed_dir,
+                dtype=ORDER_DTYPES,
+            )
+        return pd.read_csv(
+            path,
+            usecols=lambda column: column in wanted,
+            dtype=ORDER_DTYPES,
+            parse_dates=["order_timestamp"],
+            skiprows=range(1, skip_rows + 1),
+        )
+
+    def _read_wait_times(self, path: Path, skip_rows: int = 0) -> pd.DataFrame:
+        """Read the wait time timestamp and minutes columns, with compact dtypes"""
+        if self.wait_time_col is None:
+            self._resolve_wait_columns(
+                pd.Index(processed_store.list_columns("wait_times", self.processed_dir))
+            )
+        dtypes = {**WAIT_TIME_DTYPES, self.wait_col: WAIT_DTYPE}
+        wanted = set(dtypes) | {self.wait_time_col}
+        if not skip_rows:
+            return processed_store.read_processed(
+                "wait_times",
+                columns=list(wanted),
+                processed_dir=self.processed_dir,
+                dtype=dtypes,
+            )
+        return pd.read_csv(
+            path,
+            usecols=lambda column: column in wanted,
+            dtype=dtypes,
+            parse_dates=[self.wait_time_col],
+            skiprows=range(1, skip_rows + 1),
+        )
+
+    def _resolve_wait_columns(self, columns: pd.Index):
+        self.wait_time_col = (
+            "log_timestamp" if "log_timestamp" in columns else "timestamp_quoted"
+        )
+        if "actual_wait_minutes" in columns:
+            self.wait_col = "actual_wait_minutes"
+        else:
+            self.wait_col = columns[columns.str.contains("wait", case=False)][0]
+
+    def _prepare_orders(self, orders: pd.DataFrame) -> pd.DataFrame:
+        """Coerce rows passed to add_orders to the loaded schema"""
+        orders["order_timestamp"] = pd.to_datetime(orders["order_timestamp"])
+        return orders.astype(
+            {k: v for k, v in ORDER_DTYPES.items() if k in orders.columns}
+        )
+
+    def _prepare_wait_times(self, wait_times: pd.DataFrame) -> pd.DataFrame:
+        """Coerce rows passed to add_wait_times to the loaded schema"""
+        if self.wait_time_col is None:
+            self._resolve_wait_columns(wait_times.columns)
+        wait_times[self.wait_time_col] = pd.to_datetime(wait_times[self.wait_time_col])
+        dtypes = {**WAIT_TIME_DTYPES, self.wait_col: WAIT_DTYPE}
+        return wait_times.astype(
+            {k: v for k, v in dtypes.items() if k in wait_times.columns}
+        )
+
+    @staticmethod
+    def _frame_mb(frame: pd.DataFrame) -> float:
+        return frame.memory_usage(deep=True).sum() / 1024**2
+
+    def get_memory_usage(self) -> Dict:
+        """
+        Memory footprint of the loaded historical data
+
+        Does not trigger a load; reports loaded=False until first use.
+        """
+        if not self._loaded:
+            return {"loaded": False}
+        frames = {
+            "orders": self._orders,
+            "wait_times": self._wait_times,
+            "daily_sales": self._daily_sales,
+            "daily_waits": self._daily_waits,
+        }
+        usage = {
+            name: {
+                "rows": len(frame),
+                "bytes": int(frame.memory_usage(deep=True).sum()),
+            }
+            for name, frame in frames.items()
+        }
+        return {
+            "loaded": True,
+            "total_mb": round(sum(u["bytes"] for u in usage.values()) / 1024**2, 2),
+            "frames": usage,
+        }
+
+    # ------------------------------------------------------------------
+    # Daily aggregates
+    # ------------------------------------------------------------------
+
+    def _build_daily_aggregates(self):
+        """
+        Build per-day sum / count / mean tables indexed by datetime64 date
+
+        Comparisons look days up in these instead of scanning the raw
+        orders and wait times.
+        """
+        self._daily_sales = self._aggregate_orders(self._orders)
+        self._daily_waits = self._aggregate_wait_times(self._wait_times)
+
+    def _aggregate_orders(self, orders: pd.DataFrame) -> pd.DataFrame:
+        if orders.empty:
+            return self._empty_daily(SALES_COLUMNS)
+        # Sum in float64 so daily totals don't pick up float32 rounding
+        totals = orders["order_total"].astype("float64")
+        daily = (
+            totals.groupby(orders["order_timestamp"].dt.normalize())
+            .agg(["sum", "count"])
+            .set_axis(SALES_COLUMNS[:2], axis=1)
+        )
+        return self._finish_daily(daily, SALES_COLUMNS)
+
+    def _aggregate_wait_times(self, wait_times: pd.DataFrame) -> pd.DataFrame:
+        if wait_times.empty:
+            return self._empty_daily(WAIT_COLUMNS)
+        waits = wait_times[self.wait_col].astype("float64")
+        daily = (
+            waits.groupby(wait_times[self.wait_time_col].dt.normalize())
+            .agg(["sum", "count"])
+            .set_axis(WAIT_COLUMNS[:2], axis=1)
+        )
+        return self._finish_daily(daily, WAIT_COLUMNS)
+
+    @staticmethod
+    def _empty_daily(columns) -> pd.DataFrame:
+        return pd.DataFrame(
+            {column: pd.Series(dtype="float64") for column in columns},
+            index=pd.DatetimeIndex([], name="date"),
+        )
+
+    @staticmethod
+    def _finish_daily(daily: pd.DataFrame, columns) -> pd.DataFrame:
+        """Add the mean column from sum / count and sort by date"""
+        total_col, count_col, mean_col = columns
+        daily[count_col] = daily[count_col].astype("int64")
+        daily[mean_col] = daily[total_col] / daily[count_col].where(
+            daily[count_col] > 0
+        )
+        daily.index.name = "date"
+        return daily.sort_index()
+
+    @classmethod
+    def _merge_daily(cls, current: pd.DataFrame, new: pd.DataFrame, columns):
+        """Fold new per-day sums and counts into an existing table"""
+        if current.empty:
+            return new
+        if new.empty:
+            return current
+        totals = list(columns[:2])
+        merged = current[totals].add(new[totals], fill_value=0)
+        return cls._finish_daily(merged, columns)
+
+    @staticmethod
+    def _day_stats(daily: pd.DataFrame, day) -> Optional[pd.Series]:
+        """O(1) lookup of one day's aggregates (None if no data that day)"""
+        try:
+            return daily.loc[pd.Timestamp(day)]
+        except KeyError:
+            return None
+
+    def _sales_on(self, day) -> Tuple[float, int]:
+        stats = self._day_stats(self.daily_sales, day)
+        if stats is None:
+            return 0.0, 0
+        return float(stats["sales_total"]), int(stats["order_count"])
+
+    def _wait_on(self, day) -> Tuple[Optional[float], int]:
+        stats = self._day_stats(self.daily_waits, day)
+        if stats is None or stats["wait_count"] == 0:
+            return None, 0
+        return float(stats["wait_mean"]), int(stats["wait_count"])
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add_orders(self, new_orders: pd.DataFrame) -> int:
+        """
+        Append new orders and fold them into the daily aggregates
+
+        Args:
+            new_orders: Rows with at least order_timestamp and order_total
+
+        Returns:
+            Number of orders added
+        """
+        if new_orders.empty:
+            return 0
+        self._ensure_loaded()
+        return self._append_orders(self._prepare_orders(new_orders.copy()))
+
+    def _append_orders(self, new_orders: pd.DataFrame) -> int:
+        self._orders = pd.concat([self._orders, new_orders], ignore_index=True)
+        self._daily_sales = self._merge_daily(
+            self._daily_sales, self._aggregate_orders(new_orders), SALES_COLUMNS
+        )
+        return len(new_orders)
+
+    def add_wait_times(self, new_wait_times: pd.DataFrame) -> int:
+        """
+        Append new wait time records and fold them into the daily aggregates
+
+        Returns:
+            Number of records added
+        """
+        if new_wait_times.empty:
+            return 0
+        self._ensure_loaded()
+        return self._append_wait_times(self._prepare_wait_times(new_wait_times.copy()))
+
+    def _append_wait_times(self, new_wait_times: pd.DataFrame) -> int:
+        self._wait_times = pd.concat(
+            [self._wait_times, new_wait_times], ignore_index=True
+        )
+        self._daily_waits = self._merge_daily(
+            self._daily_waits,
+            self._aggregate_wait_times(new_wait_times),
+            WAIT_COLUMNS,
+        )
+        return len(new_wait_times)
+
+    def refresh(self) -> Dict:
+        """
+        Pick up processed data written since it was loaded
+
+        Rows appended to a CSV are parsed and aggregated on their own.
+        Anything else - a rewritten Parquet partition, or a CSV whose
+        previously read bytes changed - triggers a full reload. Nothing
+        happens before the first load, which reads everything anyway.
+
+        Returns:
+            Rows added per dataset, or {"reloaded": True}
+        """
+        added = {"orders": 0, "wait_times": 0}
+        if not self._loaded:
+            return added
+        with self._load_lock:
+            for name, read, append in (
+                ("orders", self._read_orders, self._append_orders),
+                ("wait_times", self._read_wait_times, self._append_wait_times),
+            ):
+                path = self._source(name)
+                if path is None:
+                    continue
+                state = self._file_state.get(name)
+                current = self._fingerprint(path, state["size"]) if state else None
+                if current and current == self._without_rows(state):
+                    continue
+                if not self._is_append(state, current):
+                    logger.info(f"Historical {name} data rewritten - reloading")
+                    self._load_historical_data()
+                    return {"reloaded": True}
+
+                new_rows = read(path, skip_rows=state["rows"])
+                added[name] = append(new_rows)
+                self._remember_file(name, path, state["rows"] + len(new_rows))
+
+        if any(added.values()):
+            logger.info(
+                f"✓ Historical data refreshed: +{added['orders']} orders, "
+                f"+{added['wait_times']} wait times"
+            )
+        return added
+
+    @staticmethod
+    def _is_append(state: Optional[Dict], current: Optional[Dict]) -> bool:
+        """
+        True if the only change since the last read is bytes added to a CSV
+
+        The bytes already read must be untouched: same file (inode), and the
+        same head and tail of the previously read range. A Parquet dataset
+        is never appended to in place.
+        """
+        return (
+            state is not None
+            and current["path"] == state["path"]
+            and not current["path"].is_dir()
+            and current["inode"] == state["inode"]
+            and current["size"] > state["size"]
+            and current["digest"] == state["digest"]
+        )
+
+    @staticmethod
+    def _without_rows(state: Dict) -> Dict:
+        return {k: v for k, v in state.items() if k != "rows"}
+
+    def _remember_file(self, name: str, path: Path, rows: int):
+        state = self._fingerprint(path)
+        state["rows"] = rows
+        self._file_state[name] = state
+
+    @staticmethod
+    def _fingerprint(path: Path, upto: Optional[int] = None) -> Dict:
+        """
+        Identify a data source's content cheaply
+
+        CSV: inode, size, mtime and a hash of the first and last
+        FINGERPRINT_BYTES of bytes [0, upto) (the whole file by default).
+        Parquet: every part file's path, size and mtime, so rewriting one
+        partition shows up even though the dataset directory is untouched.
+        """
+        stat = path.stat()
+        digest = hashlib.sha1()
+        if path.is_dir():
+            for part in sorted(p for p in path.rglob("*") if p.is_file()):
+                part_stat = part.stat()
+                digest.update(
+                    f"{part.relative_to(path)}:{part_stat.st_size}:"
+                    f"{part_stat.st_mtime_ns}\n".encode()
+                )
+        else:
+            end = stat.st_size if upto is None else min(upto, stat.st_size)
+            with open(path, "rb") as f:
+                digest.update(f.read(min(end, FINGERPRINT_BYTES)))
+                f.seek(max(end - FINGERPRINT_BYTES, 0))
+                digest.update(f.read(end - f.tell()))
+        return {
+            "path": path,
+            "inode": stat.st_ino,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "digest": digest.hexdigest(),
+        }
 
     def get_same_day_last_week(self, reference_date: datetime = None) -> datetime:
         """
@@ -121,26 +522,10 @@ class HistoricalService:
         last_week = self.get_same_day_last_week(reference_date).date()
         last_year = self.get_same_day_last_year(reference_date).date()
 
-        # Get wait times for each period
-        today_data = self.wait_times[self.wait_times["date"] == today]
-        last_week_data = self.wait_times[self.wait_times["date"] == last_week]
-        last_year_data = self.wait_times[self.wait_times["date"] == last_year]
-
-        # Calculate averages
-        if "actual_wait_minutes" in self.wait_times.columns:
-            wait_col = "actual_wait_minutes"
-        else:
-            wait_col = self.wait_times.columns[
-                self.wait_times.columns.str.contains("wait", case=False)
-            ][0]
-
-        today_avg = today_data[wait_col].mean() if len(today_data) > 0 else None
-        last_week_avg = (
-            last_week_data[wait_col].mean() if len(last_week_data) > 0 else None
-        )
-        last_year_avg = (
-            last_year_data[wait_col].mean() if len(last_year_data) > 0 else None
-        )
+        # Average wait and record count for each period
+        today_avg, today_count = self._wait_on(today)
+        last_week_avg, last_week_count = self._wait_on(last_week)
+        last_year_avg, last_year_count = self._wait_on(last_year)
 
         # Calculate changes
         comparison = {
@@ -148,12 +533,12 @@ class HistoricalService:
             "today": {
                 "date": today.isoformat(),
                 "average_minutes": round(today_avg, 1) if today_avg else None,
-                "count": len(today_data),
+                "count": today_count,
             },
             "last_week": {
                 "date": last_week.isoformat(),
                 "average_minutes": round(last_week_avg, 1) if last_week_avg else None,
-                "count": len(last_week_data),
+                "count": last_week_count,
                 "change_percent": (
                     self._calculate_change_percent(today_avg, last_week_avg)
                     if today_avg and last_week_avg
@@ -168,7 +553,7 @@ class HistoricalService:
             "last_year": {
                 "date": last_year.isoformat(),
                 "average_minutes": round(last_year_avg, 1) if last_year_avg else None,
-                "count": len(last_year_data),
+                "count": last_year_count,
                 "change_percent": (
                     self._calculate_change_percent(today_avg, last_year_avg)
                     if today_avg and last_year_avg
@@ -207,19 +592,10 @@ class HistoricalService:
         last_week = self.get_same_day_last_week(reference_date).date()
         last_year = self.get_same_day_last_year(reference_date).date()
 
-        # Get sales for each period
-        today_sales = self.orders[self.orders["date"] == today]["order_total"].sum()
-        last_week_sales = self.orders[self.orders["date"] == last_week][
-            "order_total"
-        ].sum()
-        last_year_sales = self.orders[self.orders["date"] == last_year][
-            "order_total"
-        ].sum()
-
-        # Get order counts
-        today_count = len(self.orders[self.orders["date"] == today])
-        last_week_count = len(self.orders[self.orders["date"] == last_week])
-        last_year_count = len(self.orders[self.orders["date"] == last_year])
+        # Sales and order counts for each period
+        today_sales, today_count = self._sales_on(today)
+        last_week_sales, last_week_count = self._sales_on(last_week)
+        last_year_sales, last_year_count = self._sales_on(last_year)
 
         comparison = {
             "metric": "sales",
@@ -286,10 +662,10 @@ class HistoricalService:
         last_week = self.get_same_day_last_week(reference_date).date()
         last_year = self.get_same_day_last_year(reference_date).date()
 
-        # Count orders per hour for each period
-        today_orders = len(self.orders[self.orders["date"] == today])
-        last_week_orders = len(self.orders[self.orders["date"] == last_week])
-        last_year_orders = len(self.orders[self.orders["date"] == last_year])
+        # Order counts for each period
+        today_orders = self._sales_on(today)[1]
+        last_week_orders = self._sales_on(last_week)[1]
+        last_year_orders = self._sales_on(last_year)[1]
 
         # Calculate busyness score (orders per hour)
         # Assume 12 hour operating day
@@ -345,20 +721,15 @@ class HistoricalService:
         end_date = datetime.now().date()
         start_date = end_date - timedelta(weeks=weeks)
 
-        # Filter data
-        period_orders = self.orders[
-            (self.orders["date"] >= start_date) & (self.orders["date"] <= end_date)
-        ]
-
-        # Group by week
-        period_orders["week"] = (
-            pd.to_datetime(period_orders["date"]).dt.isocalendar().week
-        )
-        period_orders["year"] = pd.to_datetime(period_orders["date"]).dt.year
+        # Slice the daily table (sorted index) and group by week
+        period = self.daily_sales.loc[pd.Timestamp(start_date) : pd.Timestamp(end_date)]
+        weeks_index = period.index.isocalendar()
 
         weekly_stats = (
-            period_orders.groupby(["year", "week"])
-            .agg({"order_total": "sum", "order_id": "count"})
+            period.groupby([period.index.year, weeks_index["week"].values])[
+                ["sales_total", "order_count"]
+            ]
+            .sum()
             .reset_index()
         )
 
@@ -6,11 +6,14 @@ Combines High-Accuracy Baseline Models with Event-Aware Heuristics.
 import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 import pickle
 import os
 import logging
 
+from app.services import model_artifacts, tree_engine
+from app.services.model_registry import get_model_registry
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,12 +28,41 @@ except ImportError:
     WeatherService = None
 
 
+# Serve sklearn ensembles through the compiled tree engine (0 to disable)
+USE_TREE_ENGINE = os.getenv("ML_TREE_ENGINE", "1") != "0"
+
+
+def _serving_model(model):
+    """Compile a loaded sklearn ensemble for low-latency predict() calls"""
+    if model is None or not USE_TREE_ENGINE:
+        return model
+    return tree_engine.try_compile(model)
+
+
+WAIT_TIME_FEATURES = [
+    "party_size",
+    "hour",
+    "day",
+    "occupancy",
+    "busy_hour",
+    "high_occ",
+    "interaction",
+]
+
+# The high_occ feature is set above this occupancy (percent, exclusive)
+HIGH_OCCUPANCY_PERCENT = 80
+
+
 class WaitTimePredictor:
+    MODEL_PATHS = ["models/wait_time_model.pkl", "data/models/wait_time_model.pkl"]
+
     def __init__(self):
         self.model = None
         self.feature_names = []
-        paths = ["models/wait_time_model.pkl", "data/models/wait_time_model.pkl"]
-        for p in paths:
+        for p in self.MODEL_PATHS:
+            artifact = model_artifacts.find_artifact(p)
+            if artifact and self.load_flat_model(artifact):
+                break
             if os.path.exists(p):
                 self.load_model(p)
                 break
@@ -45,10 +77,60 @@ class WaitTimePredictor:
                     self.feature_names = data.get("features", [])
                 else:
                     self.model = data
+            self.model = _serving_model(self.model)
             logger.info(f"✓ Wait time model loaded from {path}")
         except Exception as e:
             logger.error(f"Failed to load wait time model: {e}")
 
+    def load_flat_model(self, path) -> bool:
+        """Memory-map the shared flat-array artifact (see model_artifacts)"""
+        try:
+            self.model, meta = model_artifacts.load_model(path)
+            self.feature_names = meta.get("features", [])
+            logger.info(f"✓ Wait time model memory-mapped from {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to map wait time model: {e}")
+            return False
+
+    def warm_up(self):
+        """Run one prediction so the first real request doesn't pay for it"""
+        self.model.predict(
+            self._build_features(
+                np.array([2.0]), np.array([18.0]), np.array([4.0]), np.array([50.0])
+            )
+        )
+
+    @staticmethod
+    def _heuristic_wait(party_size, current_occupancy):
+        """Rule-of-thumb wait used when the model is unavailable"""
+        return (
+            5
+            + (np.maximum(0, party_size - 4) * 2)
+            + (np.maximum(0, current_occupancy - 70) / 2)
+        )
+
+    @staticmethod
+    def _build_features(
+        party_sizes: np.ndarray,
+        hours: np.ndarray,
+        days: np.ndarray,
+        occupancies: np.ndarray,
+    ) -> pd.DataFrame:
+        """Build the model feature matrix for any number of parties in one pass"""
+        matrix = np.column_stack(
+            [
+                party_sizes,
+                hours,
+                days,
+                occupancies,
+                np.isin(hours, [18, 19, 20]).astype(np.float64),
+                (occupancies > HIGH_OCCUPANCY_PERCENT).astype(np.float64),
+                party_sizes * occupancies,
+            ]
+        ).astype(np.float64)
+        return pd.DataFrame(matrix, columns=WAIT_TIME_FEATURES)
+
     def predict(
         self,
         party_size: int,
@@ -57,42 +139,18 @@ class WaitTimePredictor:
         external_factors: Optional[Dict] = None,
     ) -> Dict:
         # 1. Base Logic Fallback
-        base_heuristic = (
-            5 + (max(0, party_size - 4) * 2) + (max(0, current_occupancy - 70) / 2)
-        )
+        base_heuristic = self._heuristic_wait(party_size, current_occupancy)
 
         if not self.model:
             return {"predicted_wait_minutes": int(base_heuristic), "confidence": 0.5}
 
         try:
             # 2. ML Prediction (Baseline)
-            hour = timestamp.hour
-            day = timestamp.weekday()
-            busy_hour = 1 if hour in [18, 19, 20] else 0
-            high_occ = 1 if current_occupancy > 80 else 0
-            interaction = party_size * current_occupancy
-
-            features = pd.DataFrame(
-                [
-                    [
-                        party_size,
-                        hour,
-                        day,
-                        current_occupancy,
-                        busy_hour,
-                        high_occ,
-                        interaction,
-                    ]
-                ],
-                columns=[
-                    "party_size",
-                    "hour",
-                    "day",
-                    "occupancy",
-                    "busy_hour",
-                    "high_occ",
-                    "interaction",
-                ],
+            features = self._build_features(
+                np.array([party_size], dtype=np.float64),
+                np.array([timestamp.hour], dtype=np.float64),
+                np.array([timestamp.weekday()], dtype=np.float64),
+                np.array([current_occupancy], dtype=np.float64),
             )
 
             pred = self.model.predict(features)[0]
@@ -120,13 +178,92 @@ class WaitTimePredictor:
             logger.error(f"Wait prediction error: {e}")
             return {"predicted_wait_minutes": int(base_heuristic), "confidence": 0.5}
 
+    def predict_batch(
+        self,
+        party_sizes: Sequence[int],
+        timestamps: Sequence[datetime],
+        current_occupancies: Sequence[float],
+    ) -> List[Dict]:
+        """
+        Score many parties with a single model call
+
+        Returns one result per party, identical to calling predict() row by row.
+        """
+        if not (len(party_sizes) == len(timestamps) == len(current_occupancies)):
+            raise ValueError(
+                "party_sizes, timestamps and current_occupancies must be the same length"
+            )
+        if len(party_sizes) == 0:
+            return []
+
+        parties = np.asarray(party_sizes, dtype=np.float64)
+        occupancies = np.asarray(current_occupancies, dtype=np.float64)
+        heuristic = self._heuristic_wait(parties, occupancies).astype(int)
+
+        def fallback() -> List[Dict]:
+            return [
+                {"predicted_wait_minutes": int(h), "confidence": 0.5} for h in heuristic
+            ]
+
+        if not self.model:
+            return fallback()
+
+        try:
+            hours = np.fromiter(
+                (t.hour for t in timestamps), np.float64, len(timestamps)
+            )
+            days = np.fromiter(
+                (t.weekday() for t in timestamps), np.float64, len(timestamps)
+            )
+            features = self._build_features(parties, hours, days, occupancies)
+            base_waits = np.maximum(0, self.model.predict(features).astype(int))
+
+            # Event impact for every timestamp in one vectorized pass
+            impacts = [0] * len(timestamps)
+            if self.event_service:
+                try:
+                    impacts = self.event_service.calculate_impact_batch(
+                        timestamps
+                    ).tolist()
+                except:
+                    impacts = [0] * len(timestamps)
+
+            results = []
+            for party_size, occupancy, base_wait, event_impact in zip(
+                party_sizes, current_occupancies, base_waits, impacts
+            ):
+                base_wait = int(base_wait)
+                results.append(
+                    {
+                        "predicted_wait_minutes": base_wait + event_impact,
+                        "confidence": 0.85,
+                        "factors": {
+                            "party_size": party_size,
+                            "occupancy": occupancy,
+                            "base_wait": base_wait,
+                            "event_impact": event_impact,
+                        },
+                    }
+                )
+            return results
+        except Exception as e:
+            logger.error(f"Batch wait prediction error: {e}")
+            return fallback()
+
 
 class BusynessPredictor:
+    GUESTS_MAP = {"Slow": 15, "Moderate": 45, "Peak": 85}
+    MODEL_PATHS = ["models/busyness_model.pkl", "data/models/busyness_model.pkl"]
+
     def __init__(self):
         self.model = None
         self.label_mapping = {0: "Slow", 1: "Moderate", 2: "Peak"}
-        paths = ["models/busyness_model.pkl", "data/models/busyness_model.pkl"]
-        for p in paths:
+        # Model output for every (hour, weekday, month) - the whole input space
+        self.level_table = None
+        for p in self.MODEL_PATHS:
+            artifact = model_artifacts.find_artifact(p)
+            if artifact and self.load_flat_model(artifact):
+                break
             if os.path.exists(p):
                 self.load_model(p)
                 break
@@ -139,33 +276,87 @@ class BusynessPredictor:
                     self.model = data.get("model")
                 else:
                     self.model = data
+            self.model = _serving_model(self.model)
             logger.info(f"✓ Busyness model loaded from {path}")
         except Exception as e:
             logger.error(f"Failed to load busyness model: {e}")
+            return
+
+        self.level_table = self._build_level_table()
+
+    def load_flat_model(self, path) -> bool:
+        """Memory-map the shared flat-array artifact (see model_artifacts)"""
+        try:
+            self.model, _ = model_artifacts.load_model(path)
+            logger.info(f"✓ Busyness model memory-mapped from {path}")
+        except Exception as e:
+            logger.error(f"Failed to map busyness model: {e}")
+            return False
+
+        self.level_table = self._build_level_table()
+        return True
+
+    def warm_up(self):
+        """Ensure the lookup table is ready before the predictor goes live"""
+        if self.level_table is None:
+            self.level_table = self._build_level_table()
+
+    def _build_level_table(self) -> Optional[np.ndarray]:
+        """
+        Score all 24 x 7 x 12 calendar combinations once
+
+        The model only sees hour, weekday, month and is_weekend, so every
+        request afterwards is a plain array lookup instead of a sklearn call.
+        """
+        try:
+            hours, days, months = np.meshgrid(
+                np.arange(24), np.arange(7), np.arange(1, 13), indexing="ij"
+            )
+            features = pd.DataFrame(
+                {
+                    "hour": hours.ravel(),
+                    "day": days.ravel(),
+                    "month": months.ravel(),
+                    "is_weekend": (days.ravel() >= 5).astype(int),
+                }
+            )
+            levels = self.model.predict(features)
+            table = np.asarray(levels, dtype=np.int8).reshape(24, 7, 12)
+            logger.info(f"✓ Busyness lookup table built ({table.size} combinations)")
+            return table
+        except Exception as e:
+            logger.error(f"Failed to build busyness lookup table: {e}")
+            return None
 
     def predict(self, timestamp: datetime, weather: Optional[str] = None) -> Dict:
         if not self.model:
             return {"level": "Moderate", "confidence": 0.0}
 
         try:
-            features = pd.DataFrame(
-                [
-                    {
-                        "hour": timestamp.hour,
-                        "day": timestamp.weekday(),
-                        "month": timestamp.month,
-                        "is_weekend": 1 if timestamp.weekday() >= 5 else 0,
-                    }
-                ]
-            )
+            if self.level_table is not None:
+                pred_idx = int(
+                    self.level_table[
+                        timestamp.hour, timestamp.weekday(), timestamp.month - 1
+                    ]
+                )
+            else:
+                features = pd.DataFrame(
+                    [
+                        {
+                            "hour": timestamp.hour,
+                            "day": timestamp.weekday(),
+                            "month": timestamp.month,
+                            "is_weekend": 1 if timestamp.weekday() >= 5 else 0,
+                        }
+                    ]
+                )
+                pred_idx = self.model.predict(features)[0]
 
-            pred_idx = self.model.predict(features)[0]
             level = self.label_mapping.get(pred_idx, "Moderate")
-            guests_map = {"Slow": 15, "Moderate": 45, "Peak": 85}
 
             return {
                 "level": level,
-                "expected_guests": guests_map.get(level, 40),
+                "expected_guests": self.GUESTS_MAP.get(level, 40),
                 "confidence": 0.90,
             }
         except Exception as e:
@@ -174,14 +365,20 @@ class BusynessPredictor:
 
 
 class ItemSalesPredictor:
+    MODEL_PATHS = ["data/models/item_sales_model.pkl", "models/item_sales_model.pkl"]
+
     def __init__(self):
         self.model = None
         self.le_item = None
         self.le_cat = None
         self.feature_names = []
+        self.item_codes = {}
+        self.category_codes = {}
 
-        paths = ["data/models/item_sales_model.pkl", "models/item_sales_model.pkl"]
-        for p in paths:
+        for p in self.MODEL_PATHS:
+            artifact = model_artifacts.find_artifact(p)
+            if artifact and self.load_flat_model(artifact):
+                break
             if os.path.exists(p):
                 self.load_model(p)
                 break
@@ -199,10 +396,100 @@ class ItemSalesPredictor:
                 self.feature_names = data.get("features", []) or data.get(
                     "feature_cols", []
                 )
+            self.model = _serving_model(self.model)
+            # Lookup tables so whole menus can be encoded without LabelEncoder calls
+            self.item_codes = self._encoder_lookup(self.le_item)
+            self.category_codes = self._encoder_lookup(self.le_cat)
             logger.info(f"✓ Item Sales model loaded from {path}")
         except Exception as e:
             logger.error(f"Failed to load item sales model: {e}")
 
+    def load_flat_model(self, path) -> bool:
+        """Memory-map the shared flat-array artifact (see model_artifacts)"""
+        try:
+            self.model, meta = model_artifacts.load_model(path)
+            self.feature_names = meta.get("features", [])
+            encoders = meta.get("encoders", {})
+            self.item_codes = {
+                label: code for code, label in enumerate(encoders.get("le_item", []))
+            }
+            self.category_codes = {
+                label: code for code, label in enumerate(encoders.get("le_cat", []))
+            }
+            logger.info(f"✓ Item Sales model memory-mapped from {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to map item sales model: {e}")
+            return False
+
+    def warm_up(self):
+        """Run one small forecast so the first real request doesn't pay for it"""
+        items = [(0, name, "Food") for name in list(self.item_codes)[:1]]
+        self.forecast_menu([datetime.now()], items)
+
+    @staticmethod
+    def _encoder_lookup(encoder) -> Dict[str, int]:
+        if encoder is None:
+            return {}
+        return {label: code for code, label in enumerate(encoder.classes_)}
+
+    def _build_features(
+        self, item_names: Sequence[str], categories: Sequence[str], dates: pd.Series
+    ) -> pd.DataFrame:
+        """Build the (Standard 6-feature set from train_models_final.py) matrix"""
+        day_of_week = dates.dt.weekday.to_numpy()
+        columns = {
+            # Unknown labels fall back to 0, same as a failed LabelEncoder.transform
+            "item_encoded": [self.item_codes.get(name, 0) for name in item_names],
+            "cat_encoded": [self.category_codes.get(cat, 0) for cat in categories],
+            "price": np.full(len(dates), 12.0),
+            "day_of_week": day_of_week,
+            "month": dates.dt.month.to_numpy(),
+            "is_weekend": (day_of_week >= 5).astype(int),
+        }
+        # Map to feature names expected by the model
+        return pd.DataFrame(
+            {
+                f: columns.get(f, np.zeros(len(dates), dtype=int))
+                for f in self.feature_names
+            },
+            columns=self.feature_names,
+        )
+
+    def _event_multiplier(self, date: datetime):
+        """
+        EVENT BONUS LOGIC
+        Since our historical data didn't capture events, we add the impact here.
+        """
+        event_multiplier = 1.0
+        event_name = None
+
+        if self.event_service:
+            try:
+                events = self.event_service.get_events_for_date(
+                    date, use_cache_only=True
+                )
+                if events:
+                    # Find biggest event
+                    top_event = max(
+                        events, key=lambda x: x.get("attendance_estimated", 0)
+                    )
+                    attendance = top_event.get("attendance_estimated", 0)
+
+                    if attendance > 10000:
+                        event_multiplier = 1.25  # +25% for huge events
+                        event_name = "Huge Event"
+                    elif attendance > 5000:
+                        event_multiplier = 1.15  # +15% for big events
+                        event_name = "Big Event"
+                    elif attendance > 1000:
+                        event_multiplier = 1.05  # +5% for local events
+                        event_name = "Local Event"
+            except Exception as e:
+                logger.warning(f"Event check failed: {e}")
+
+        return event_multiplier, event_name
+
     def predict_daily_sales(
         self,
         item_id: int,
@@ -214,62 +501,17 @@ class ItemSalesPredictor:
             return {"predicted_quantity": 25, "confidence": 0.0}
 
         try:
-            # 1. Encode Inputs
-            try:
-                item_encoded = self.le_item.transform([item_name])[0]
-            except:
-                item_encoded = 0
-            try:
-                cat_encoded = self.le_cat.transform([category])[0]
-            except:
-                cat_encoded = 0
-
-            # 2. Build Features (Standard 6-feature set from train_models_final.py)
-            input_data = {
-                "item_encoded": item_encoded,
-                "cat_encoded": cat_encoded,
-                "price": 12.0,
-                "day_of_week": date.weekday(),
-                "month": date.month,
-                "is_weekend": 1 if date.weekday() >= 5 else 0,
-            }
-
-            # Map to feature names expected by the model
-            ordered_features = [input_data.get(f, 0) for f in self.feature_names]
-            features_df = pd.DataFrame([ordered_features], columns=self.feature_names)
+            # 1. Encode Inputs + 2. Build Features
+            features_df = self._build_features(
+                [item_name], [category], pd.Series(pd.to_datetime([date]))
+            )
 
             # 3. Base Prediction (Historical Trend)
             pred = self.model.predict(features_df)[0]
             qty = max(0, int(pred))
 
-            # 4. === EVENT BONUS LOGIC ===
-            # Since our historical data didn't capture events, we add the impact here.
-            event_multiplier = 1.0
-            event_name = None
-
-            if self.event_service:
-                try:
-                    events = self.event_service.get_events_for_date(
-                        date, use_cache_only=True
-                    )
-                    if events:
-                        # Find biggest event
-                        top_event = max(
-                            events, key=lambda x: x.get("attendance_estimated", 0)
-                        )
-                        attendance = top_event.get("attendance_estimated", 0)
-
-                        if attendance > 10000:
-                            event_multiplier = 1.25  # +25% for huge events
-                            event_name = "Huge Event"
-                        elif attendance > 5000:
-                            event_multiplier = 1.15  # +15% for big events
-                            event_name = "Big Event"
-                        elif attendance > 1000:
-                            event_multiplier = 1.05  # +5% for local events
-                            event_name = "Local Event"
-                except Exception as e:
-                    logger.warning(f"Event check failed: {e}")
+            # 4. Event bonus
+            event_multiplier, _ = self._event_multiplier(date)
 
             # Apply Bonus
             adjusted_qty = int(qty * event_multiplier)
@@ -291,12 +533,125 @@ class ItemSalesPredictor:
             logger.error(f"Sales prediction error: {e}")
             return {"predicted_quantity": 20, "confidence": 0.0}
 
+    def forecast_menu(
+        self,
+        dates: Sequence[datetime],
+        items: Optional[Sequence[Tuple[int, str, str]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Forecast every (item, date) pair with a single model call
+
+        Args:
+            dates: Days to forecast
+            items: (item_id, item_name, category) tuples, defaults to the full menu
+
+        Returns:
+            Tidy DataFrame with one row per item and date, matching
+            predict_daily_sales() for each pair
+        """
+        if items is None:
+            items = load_menu_reference()
+
+        columns = [
+            "item_id",
+            "item_name",
+            "category",
+            "date",
+            "base_prediction",
+            "event_multiplier",
+            "predicted_quantity",
+            "confidence",
+        ]
+        if not items or not dates:
+            # Same dtypes as a real forecast, so callers can use .dt on "date"
+            return pd.DataFrame(columns=columns).astype({"date": "datetime64[ns]"})
+
+        # Item-major grid: every item repeated across every date
+        day_index = pd.to_datetime(list(dates)).normalize()
+        item_ids, item_names, categories = (list(col) for col in zip(*items))
+        grid = pd.DataFrame(
+            {
+                "item_id": np.repeat(item_ids, len(day_index)),
+                "item_name": np.repeat(item_names, len(day_index)),
+                "category": np.repeat(categories, len(day_index)),
+                "date": np.tile(day_index, len(items)),
+            }
+        )
+
+        if not self.model:
+            grid["base_prediction"] = 25
+            grid["event_multiplier"] = 1.0
+            grid["predicted_quantity"] = 25
+            grid["confidence"] = 0.0
+            return grid[columns]
+
+        try:
+            features = self._build_features(
+                grid["item_name"], grid["category"], grid["date"]
+            )
+            preds = self.model.predict(features)
+            grid["base_prediction"] = np.maximum(0, preds.astype(int))
+
+            # Events only vary by day, so look each date up once
+            multipliers = {
+                day: self._event_multiplier(day.to_pydatetime())[0]
+                for day in day_index.unique()
+            }
+            grid["event_multiplier"] = grid["date"].map(multipliers)
+            grid["predicted_quantity"] = (
+                grid["base_prediction"] * grid["event_multiplier"]
+            ).astype(int)
+            grid["confidence"] = 0.85
+            return grid[columns]
+        except Exception as e:
+            logger.error(f"Menu forecast error: {e}")
+            grid["base_prediction"] = 20
+            grid["event_multiplier"] = 1.0
+            grid["predicted_quantity"] = 20
+            grid["confidence"] = 0.0
+            return grid[columns]
+
+
+def load_menu_reference(
+    path: str = "data/menu_items_reference.csv",
+) -> List[Tuple[int, str, str]]:
+    """Load the Toast menu as (item_id, item_name, category) tuples"""
+    if not os.path.exists(path):
+        logger.warning(f"Menu reference not found at {path}")
+        return []
+    menu = pd.read_csv(path, usecols=["item_id", "item_name", "category"])
+    return list(
+        menu[["item_id", "item_name", "category"]].itertuples(index=False, name=None)
+    )
+
 
 # Global Instances
+# Initial load at import; the registry swaps in retrained models afterwards,
+# so always go through model_registry.get() rather than these names.
 wait_time_predictor = WaitTimePredictor()
 busyness_predictor = BusynessPredictor()
 item_sales_predictor = ItemSalesPredictor()
 
+model_registry = get_model_registry()
+model_registry.register(
+    "wait_time",
+    WaitTimePredictor,
+    model_artifacts.watch_paths(WaitTimePredictor.MODEL_PATHS),
+    instance=wait_time_predictor,
+)
+model_registry.register(
+    "busyness",
+    BusynessPredictor,
+    model_artifacts.watch_paths(BusynessPredictor.MODEL_PATHS),
+    instance=busyness_predictor,
+)
+model_registry.register(
+    "item_sales",
+    ItemSalesPredictor,
+    model_artifacts.watch_paths(ItemSalesPredictor.MODEL_PATHS),
+    instance=item_sales_predictor,
+)
+
 
 def initialize_models():
     pass
@@ -304,14 +659,26 @@ def initialize_models():
 
 # API Wrappers
 def predict_wait_time(party_size, timestamp, current_occupancy, external_factors=None):
-    return wait_time_predictor.predict(
+    return model_registry.get("wait_time").predict(
         party_size, timestamp, current_occupancy, external_factors
     )
 
 
+def predict_wait_time_batch(party_sizes, timestamps, current_occupancies):
+    return model_registry.get("wait_time").predict_batch(
+        party_sizes, timestamps, current_occupancies
+    )
+
+
 def predict_busyness(timestamp, weather=None):
-    return busyness_predictor.predict(timestamp, weather)
+    return model_registry.get("busyness").predict(timestamp, weather)
 
 
 def predict_item_sales(item_id, date, item_name="Unknown", category="Food"):
-    return item_sales_predictor.predict_daily_sales(item_id, date, item_name, category)
+    return model_registry.get("item_sales").predict_daily_sales(
+        item_id, date, item_name, category
+    )
+
+
+def forecast_menu_sales(dates, items=None):
+    return model_registry.get("item_sales").forecast_menu(dates, items)
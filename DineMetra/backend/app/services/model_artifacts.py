@@ -0,0 +1,187 @@
+"""
+Memory-Mapped Model Artifacts
+Flat-array model format that every API worker can share through the page cache
+
+A pickled sklearn forest is rebuilt node-by-node in each process that loads
+it, so N workers hold N private copies of every tree. This format stores the
+fitted trees as plain .npy arrays (all trees concatenated) plus a JSON
+manifest, and the loader opens them with np.load(mmap_mode="r"). Workers
+then read the same physical pages.
+
+Layout of <stem>.mmap/ (written next to <stem>.pkl):
+    manifest.json   engine metadata (kind, depth, baseline, classes, feature
+                    names), encoder classes and array shapes
+    <array>.npy     one file per tree_engine array (feature, threshold,
+                    children, value, roots)
+"""
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.tree_engine import ARRAY_NAMES, TreeEnsembleEngine, compile_model
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+
+def flat_artifact_path(pickle_path) -> Path:
+    """models/busyness_model.pkl -> models/busyness_model.mmap"""
+    return Path(pickle_path).with_suffix(".mmap")
+
+
+def export_model(
+    model,
+    pickle_path,
+    features: Optional[List[str]] = None,
+    encoders: Optional[Dict[str, List[str]]] = None,
+) -> Path:
+    """
+    Write the flat-array artifact that sits next to a pickled model
+
+    Args:
+        model: Fitted sklearn ensemble (or compiled TreeEnsembleEngine)
+        pickle_path: Path of the matching .pkl (used to name the directory)
+        features: Feature names in training order
+        encoders: Label classes to ship with the model, e.g. {"le_item": [...]}
+
+    Returns:
+        Path of the written <stem>.mmap directory
+    """
+    engine = compile_model(model, features)
+    arrays = engine.arrays
+    meta = dict(engine.meta)
+    meta["format_version"] = FORMAT_VERSION
+    meta["encoders"] = {
+        name: [str(label) for label in classes]
+        for name, classes in (encoders or {}).items()
+    }
+    meta["arrays"] = {
+        name: {"dtype": str(array.dtype), "shape": list(array.shape)}
+        for name, array in arrays.items()
+    }
+
+    target = flat_artifact_path(pickle_path)
+    staging = target.with_name(f".{target.name}.tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(staging / f"{name}.npy", array)
+    # Manifest last: it is what loaders and the model registry look for
+    with open(staging / MANIFEST_NAME, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap directories; processes that already mapped the old arrays keep them
+    if target.exists():
+        retired = target.with_name(f".{target.name}.old")
+        if retired.exists():
+            shutil.rmtree(retired)
+        os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+
+    logger.info(
+        f"✓ Exported {meta['kind']} ({meta['n_trees']} trees, "
+        f"{meta['n_nodes']:,} nodes) to {target}"
+    )
+    return target
+
+
+def load_model(path) -> Tuple[TreeEnsembleEngine, Dict]:
+    """
+    Memory-map a flat-array artifact
+
+    Args:
+        path: The <stem>.mmap directory
+
+    Returns:
+        (model, manifest)
+    """
+    path = Path(path)
+    with open(path / MANIFEST_NAME) as f:
+        meta = json.load(f)
+
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model artifact version: {meta.get('format_version')}"
+        )
+
+    # Plain ndarray views over the mapping: same shared pages, without the
+    # np.memmap subclass overhead on every fancy-index during traversal
+    arrays = {
+        name: np.load(path / f"{name}.npy", mmap_mode="r").view(np.ndarray)
+        for name in ARRAY_NAMES
+    }
+    return TreeEnsembleEngine(arrays, meta), meta
+
+
+def find_artifact(pickle_path) -> Optional[Path]:
+    """
+    Get the flat artifact for a pickle if it is present and current
+
+    A flat artifact older than its pickle (e.g. a retrain that only wrote the
+    pickle) is ignored so a stale model is never served.
+    """
+    manifest = flat_artifact_path(pickle_path) / MANIFEST_NAME
+    if not manifest.exists():
+        return None
+    pickle_path = Path(pickle_path)
+    if pickle_path.exists() and pickle_path.stat().st_mtime > manifest.stat().st_mtime:
+        return None
+    return manifest.parent
+
+
+def watch_paths(pickle_paths: List[str]) -> List[str]:
+    """Files the model registry should watch for a predictor"""
+    paths = []
+    for p in pickle_paths:
+        paths.append(p)
+        paths.append(str(flat_artifact_path(p) / MANIFEST_NAME))
+    return paths
+
+
+def export_pickle(pickle_path) -> Path:
+    """Build the flat artifact for an existing pickled model (no retraining)"""
+    import pickle
+
+    with open(pickle_path, "rb") as f:
+        data = pickle.load(f)
+
+    if not isinstance(data, dict):
+        return export_model(data, pickle_path)
+
+    encoders = {}
+    for name, aliases in {
+        "le_item": ("le_item", "label_encoder_item"),
+        "le_cat": ("le_cat", "label_encoder_category"),
+    }.items():
+        encoder = next((data[a] for a in aliases if data.get(a) is not None), None)
+        if encoder is not None:
+            encoders[name] = encoder.classes_
+
+    return export_model(
+        data["model"],
+        pickle_path,
+        features=data.get("features") or data.get("feature_cols"),
+        encoders=encoders,
+    )
+
+
+if __name__ == "__main__":
+    # python -m app.services.model_artifacts models/busyness_model.pkl ...
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    for pickle_path in sys.argv[1:]:
+        export_pickle(pickle_path)
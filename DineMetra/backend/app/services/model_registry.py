@@ -0,0 +1,221 @@
+"""
+Model Registry
+Hot-reloads trained model artifacts without restarting the API
+
+The registry watches the artifact files behind each predictor. When one
+changes (e.g. auto_retrain deploys new models), a fresh predictor is built
+and warmed up on a background thread, then swapped in with a single
+reference assignment. Requests that already hold the old predictor finish
+with it; new requests get the new one. A half-loaded model is never visible.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Holds the live predictor for each model and swaps in new versions
+
+    Features:
+    - Watches artifact mtimes/sizes for changes
+    - Loads and warms up replacements off the request path
+    - Atomic swap (old predictor stays live if the new one fails to load)
+    - Listeners notified on every swap (e.g. to invalidate caches)
+    """
+
+    def __init__(self, poll_interval: float = 30.0):
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._models: Dict[str, object] = {}
+        self._factories: Dict[str, Callable[[], object]] = {}
+        self._watch_paths: Dict[str, List[Path]] = {}
+        self._signatures: Dict[str, Tuple] = {}
+        self._loaded_at: Dict[str, str] = {}
+        self._listeners: List[Callable[[str, int], None]] = []
+
+        # Bumped on every swap so caches can tell model versions apart
+        self.version = 0
+        self.reload_count = 0
+        self.failed_reloads = 0
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], object],
+        watch_paths: List[str],
+        instance: Optional[object] = None,
+    ):
+        """
+        Register a predictor
+
+        Args:
+            name: Registry key (e.g. "wait_time")
+            factory: Builds a fully loaded predictor
+            watch_paths: Artifact files that trigger a reload when changed
+            instance: Already-loaded predictor to serve until the first reload
+        """
+        paths = [Path(p) for p in watch_paths]
+        with self._lock:
+            self._factories[name] = factory
+            self._watch_paths[name] = paths
+            self._signatures[name] = self._signature(paths)
+            self._models[name] = instance if instance is not None else factory()
+            self._loaded_at[name] = datetime.now().isoformat()
+
+    def get(self, name: str):
+        """Get the live predictor (a plain dict read - safe without the lock)"""
+        return self._models[name]
+
+    def add_listener(self, callback: Callable[[str, int], None]):
+        """Call callback(name, version) after every model swap"""
+        self._listeners.append(callback)
+
+    # ========================================
+    # RELOADING
+    # ========================================
+
+    @staticmethod
+    def _signature(paths: List[Path]) -> Tuple:
+        signature = []
+        for path in paths:
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def check_for_updates(self) -> List[str]:
+        """
+        Reload every model whose artifacts changed
+
+        Returns:
+            Names of the models that were swapped
+        """
+        swapped = []
+        for name in list(self._factories):
+            signature = self._signature(self._watch_paths[name])
+            if signature == self._signatures.get(name):
+                continue
+            if self.reload(name, signature):
+                swapped.append(name)
+        return swapped
+
+    def reload(self, name: str, signature: Optional[Tuple] = None) -> bool:
+        """
+        Build, warm up and swap in a new predictor
+
+        The current predictor keeps serving if loading fails, and the
+        signature is not recorded so the next poll retries (e.g. a file
+        that was still being written).
+        """
+        if signature is None:
+            signature = self._signature(self._watch_paths[name])
+
+        logger.info(f"🔄 Reloading model '{name}'...")
+        try:
+            candidate = self._factories[name]()
+            if getattr(candidate, "model", None) is None:
+                raise ValueError("artifact did not produce a model")
+            if hasattr(candidate, "warm_up"):
+                candidate.warm_up()
+        except Exception as e:
+            self.failed_reloads += 1
+            logger.error(f"Model '{name}' reload failed, keeping current: {e}")
+            return False
+
+        with self._lock:
+            self._models[name] = candidate
+            self._signatures[name] = signature
+            self._loaded_at[name] = datetime.now().isoformat()
+            self.version += 1
+            self.reload_count += 1
+            version = self.version
+
+        logger.info(f"✓ Model '{name}' swapped in (registry version {version})")
+
+        for callback in self._listeners:
+            try:
+                callback(name, version)
+            except Exception as e:
+                logger.error(f"Model registry listener failed: {e}")
+
+        return True
+
+    # ========================================
+    # BACKGROUND WATCHER
+    # ========================================
+
+    def _watch_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_updates()
+            except Exception as e:
+                logger.error(f"Model registry watch error: {e}", exc_info=True)
+
+    def start(self):
+        """Start watching artifacts on a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            logger.warning("Model registry watcher already running")
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._watch_loop, name="model-registry", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"✅ Model registry watching artifacts every {self.poll_interval}s")
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        logger.info("Model registry watcher stopped")
+
+    def get_status(self) -> Dict:
+        """Get registry status for system info"""
+        return {
+            "version": self.version,
+            "watching": bool(self._thread and self._thread.is_alive()),
+            "poll_interval_seconds": self.poll_interval,
+            "reload_count": self.reload_count,
+            "failed_reloads": self.failed_reloads,
+            "models": {
+                name: {
+                    "loaded": getattr(self._models.get(name), "model", None)
+                    is not None,
+                    "loaded_at": self._loaded_at.get(name),
+                    "artifacts": [
+                        str(p) for p in self._watch_paths[name] if p.exists()
+                    ],
+                }
+                for name in self._factories
+            },
+        }
+
+
+# Global registry instance
+_model_registry = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the global model registry instance"""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry(
+            poll_interval=float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+        )
+    return _model_registry
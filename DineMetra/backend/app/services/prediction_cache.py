@@ -0,0 +1,172 @@
+"""
+Prediction Cache
+Memoizes enhanced predictions keyed on their quantized inputs
+
+Dashboard cards, the WebSocket broadcaster, the alert checker and the
+compare endpoints all ask about the same hour many times a minute. Keys
+snap inputs to buckets (timestamp slot, occupancy step), so every caller in
+a bucket gets the same answer; callers add anything a bucket must not mix
+(e.g. the side of a model threshold) to the key themselves. Entries expire after a TTL, the least recently used entry is
+evicted when full, and the whole cache is cleared when the model registry
+swaps in a new model.
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 300.0,
+        time_bucket_minutes: int = 15,
+        occupancy_step: float = 5.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.time_bucket_minutes = max(1, time_bucket_minutes)
+        self.occupancy_step = occupancy_step
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    # ========================================
+    # KEY QUANTIZATION
+    # ========================================
+
+    def time_bucket(self, timestamp: datetime) -> datetime:
+        """Floor a timestamp to the start of its slot (e.g. 18:07 -> 18:00)"""
+        minute = timestamp.minute - timestamp.minute % self.time_bucket_minutes
+        return timestamp.replace(minute=minute, second=0, microsecond=0)
+
+    def occupancy_bucket(self, occupancy: float) -> float:
+        """Round occupancy to the nearest step (e.g. 63.2 -> 65.0)"""
+        if self.occupancy_step <= 0:
+            return float(occupancy)
+        return float(round(occupancy / self.occupancy_step) * self.occupancy_step)
+
+    # ========================================
+    # CACHE OPERATIONS
+    # ========================================
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Get a copy of a cached value, or None if missing/expired"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Dict):
+        """Store a copy of value, evicting the least recently used entry"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.ttl_seconds,
+                copy.deepcopy(value),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict]) -> Dict:
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Results carrying an "error" field are fallbacks, not predictions,
+        and are never cached.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        if isinstance(value, dict) and "error" not in value:
+            self.set(key, value)
+        return value
+
+    def clear(self, reason: str = "manual"):
+        """Drop every entry"""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self.invalidations += 1
+        logger.info(f"🧹 Prediction cache cleared ({reason}, {dropped} entries)")
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics for system info"""
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "time_bucket_minutes": self.time_bucket_minutes,
+            "occupancy_step": self.occupancy_step,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global cache instance
+_prediction_cache = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Get or create the global prediction cache instance"""
+    global _prediction_cache
+    if _prediction_cache is None:
+        _prediction_cache = PredictionCache(
+            max_entries=int(os.getenv("PREDICTION_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", "300")),
+            time_bucket_minutes=int(
+                os.getenv("PREDICTION_CACHE_TIME_BUCKET_MINUTES", "15")
+            ),
+            occupancy_step=float(os.getenv("PREDICTION_CACHE_OCCUPANCY_STEP", "5")),
+        )
+    return _prediction_cache
@@ -0,0 +1,148 @@
+"""
+Prediction Context
+Request-scoped weather, event and calendar data shared by enhanced predictions
+
+One dashboard render or batch request makes many enhanced predictions for
+the same handful of days. A PredictionContext is created once for that
+scope and passed to every prediction: the forecast, current conditions,
+each day's events and each timestamp's calendar features are resolved the
+first time they are asked for and reused afterwards.
+
+Contexts are short-lived by design (one request or batch) so they never
+serve data older than the request itself; cross-request reuse is the job of
+the weather/event caches and the prediction cache.
+"""
+
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional
+
+DAY_NAMES = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+PEAK_HOURS = [11, 12, 13, 17, 18, 19, 20]
+LUNCH_HOURS = [11, 12, 13]
+DINNER_HOURS = [17, 18, 19, 20]
+
+
+def get_time_period(hour: int) -> str:
+    """Convert hour to time period"""
+    if 6 <= hour < 11:
+        return "breakfast"
+    elif 11 <= hour < 15:
+        return "lunch"
+    elif 15 <= hour < 17:
+        return "afternoon"
+    elif 17 <= hour < 22:
+        return "dinner"
+    else:
+        return "late_night"
+
+
+class PredictionContext:
+    """
+    Lazily resolved inputs shared by the predictions of one request
+
+    Safe to share between threads (dashboard sections may run concurrently);
+    each value is resolved at most once. Resolution is single-flight per key:
+    threads asking for the same key wait for one computation, while other
+    keys resolve in parallel.
+    """
+
+    def __init__(self, weather_service=None, event_service=None):
+        self.weather_service = weather_service
+        self.event_service = event_service
+        self.created_at = datetime.now()
+
+        self._values: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()  # guards _values only, never compute()
+
+    def resolve(self, key: Hashable, compute: Callable[[], object]):
+        """Get the value for key, computing it on first use"""
+        with self._lock:
+            future = self._values.get(key)
+            owner = future is None
+            if owner:
+                future = self._values[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(compute())
+        except BaseException as e:
+            # Waiters see the error; the next call retries
+            with self._lock:
+                self._values.pop(key, None)
+            future.set_exception(e)
+            raise
+        return future.result()
+
+    # ========================================
+    # SHARED INPUTS
+    # ========================================
+
+    def get_forecasts(self) -> List[Dict]:
+        """7-day daily forecast, fetched once per context"""
+
+        def fetch():
+            if self.weather_service is None:
+                return []
+            return self.weather_service.get_forecast(days=7)
+
+        return self.resolve("forecasts", fetch)
+
+    def get_forecast_for_date(self, date: datetime) -> Optional[Dict]:
+        """Daily forecast matching a date, if it is within the forecast"""
+        target_date = date.date().isoformat()
+        by_date = self.resolve(
+            "forecasts_by_date",
+            lambda: {f.get("date"): f for f in self.get_forecasts()},
+        )
+        return by_date.get(target_date)
+
+    def get_current_weather(self) -> Optional[Dict]:
+        """Current observed conditions, fetched once per context"""
+
+        def fetch():
+            if self.weather_service is None:
+                return None
+            return self.weather_service.get_current_weather()
+
+        return self.resolve("current_weather", fetch)
+
+    def get_events(self, date: datetime) -> List[Dict]:
+        """Cached events for a calendar day, read once per context"""
+
+        def fetch():
+            if self.event_service is None:
+                return []
+            return self.event_service.get_events_for_date(date, use_cache_only=True)
+
+        return self.resolve(("events", date.date()), fetch)
+
+    def get_calendar_features(self, timestamp: datetime) -> Dict:
+        """Calendar features for a timestamp (per date and hour)"""
+
+        def build():
+            return {
+                "day_of_week": DAY_NAMES[timestamp.weekday()],
+                "hour": timestamp.hour,
+                "month": timestamp.month,
+                "time_period": get_time_period(timestamp.hour),
+                "is_weekend": timestamp.weekday() >= 5,
+                "is_peak_hour": timestamp.hour in PEAK_HOURS,
+                "is_lunch": timestamp.hour in LUNCH_HOURS,
+                "is_dinner": timestamp.hour in DINNER_HOURS,
+                "is_holiday": timestamp.month in [11, 12],
+            }
+
+        return self.resolve(("calendar", timestamp.date(), timestamp.hour), build)
@@ -0,0 +1,260 @@
+"""
+Sales Rollup Service
+Maintains the daily_sales_rollup and hourly_sales_rollup tables
+
+The dashboard and historical endpoints read per-day and per-hour order
+totals from these tables instead of grouping the raw orders table on every
+request, so their cost no longer grows with order history.
+
+Writers keep them current:
+- record_orders() adds freshly inserted orders (same transaction as the insert)
+- rebuild() recomputes a date range from orders (deletes, backfills, ETL loads)
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models.database_models import DailySalesRollup, HourlySalesRollup, Order
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_MODELS = (DailySalesRollup, HourlySalesRollup)
+
+
+def _as_date(value) -> date:
+    """func.date() gives a date on Postgres and an ISO string on SQLite"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class SalesRollupService:
+    """Incremental per-day / per-hour sales aggregates"""
+
+    def record_orders(
+        self, db: Session, orders: Iterable[Tuple[datetime, float]]
+    ) -> int:
+        """
+        Add new orders to the rollups
+
+        Args:
+            db: Session the orders were inserted with (caller commits)
+            orders: (order_timestamp, order_total) for each new order
+
+        Returns:
+            Number of orders added
+        """
+        daily = defaultdict(lambda: [0.0, 0])
+        hourly = defaultdict(lambda: [0.0, 0])
+        count = 0
+        for timestamp, total in orders:
+            for bucket in (
+                daily[timestamp.date()],
+                hourly[(timestamp.date(), timestamp.hour)],
+            ):
+                bucket[0] += float(total or 0)
+                bucket[1] += 1
+            count += 1
+
+        if not count:
+            return 0
+
+        self._upsert(
+            db,
+            DailySalesRollup,
+            ["sales_date"],
+            [
+                {"sales_date": day, "total_sales": sales, "order_count": n}
+                for day, (sales, n) in daily.items()
+            ],
+            increment=True,
+        )
+        self._upsert(
+            db,
+            HourlySalesRollup,
+            ["sales_date", "hour"],
+            [
+                {
+                    "sales_date": day,
+                    "hour": hour,
+                    "total_sales": sales,
+                    "order_count": n,
+                }
+                for (day, hour), (sales, n) in hourly.items()
+            ],
+            increment=True,
+        )
+        return count
+
+    def rebuild(
+        self,
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict:
+        """
+        Recompute the rollups from the orders table
+
+        Args:
+            db: Session (caller commits)
+            start_date: First day to rebuild (None = earliest order)
+            end_date: Last day to rebuild, inclusive (None = latest order)
+
+        Returns:
+            Days and hours written
+        """
+        conditions = []
+        if start_date is not None:
+            conditions.append(
+                Order.order_timestamp >= datetime.combine(start_date, time.min)
+            )
+        if end_date is not None:
+            conditions.append(
+                Order.order_timestamp
+                < datetime.combine(end_date + timedelta(days=1), time.min)
+            )
+
+        day_expr = func.date(Order.order_timestamp)
+        hour_expr = func.extract("hour", Order.order_timestamp)
+        query = select(
+            day_expr.label("sales_date"),
+            hour_expr.label("hour"),
+            func.sum(Order.order_total).label("total_sales"),
+            func.count(Order.id).label("order_count"),
+        ).group_by(day_expr, hour_expr)
+        if conditions:
+            query = query.where(and_(*conditions))
+
+        hourly_rows = []
+        daily = defaultdict(lambda: [0.0, 0])
+        for row in db.execute(query):
+            day = _as_date(row.sales_date)
+            sales = float(row.total_sales or 0)
+            hourly_rows.append(
+                {
+                    "sales_date": day,
+                    "hour": int(row.hour),
+                    "total_sales": sales,
+                    "order_count": int(row.order_count),
+                }
+            )
+            daily[day][0] += sales
+            daily[day][1] += int(row.order_count)
+
+        for model in ROLLUP_MODELS:
+            stmt = delete(model)
+            if start_date is not None:
+                stmt = stmt.where(model.sales_date >= start_date)
+            if end_date is not None:
+                stmt = stmt.where(model.sales_date <= end_date)
+            db.execute(stmt)
+
+        daily_rows = [
+            {"sales_date": day, "total_sales": sales, "order_count": n}
+            for day, (sales, n) in daily.items()
+        ]
+        self._upsert(db, DailySalesRollup, ["sales_date"], daily_rows)
+        self._upsert(db, HourlySalesRollup, ["sales_date", "hour"], hourly_rows)
+
+        logger.info(
+            f"📊 Rebuilt sales rollups: {len(daily_rows)} days, "
+            f"{len(hourly_rows)} hours"
+        )
+        return {"days": len(daily_rows), "hours": len(hourly_rows)}
+
+    def ensure_ready(self, db: Session) -> bool:
+        """
+        Create the rollup tables and backfill them if they are empty
+
+        Returns:
+            True if a backfill ran
+        """
+        bind = db.get_bind()
+        for model in ROLLUP_MODELS:
+            model.__table__.create(bind=bind, checkfirst=True)
+
+        has_rollups = db.execute(select(DailySalesRollup.sales_date).limit(1)).first()
+        has_orders = db.execute(select(Order.id).limit(1)).first()
+        if has_rollups or not has_orders:
+            return False
+
+        logger.info("📊 Sales rollups empty - backfilling from orders...")
+        self.rebuild(db)
+        db.commit()
+        return True
+
+    def _upsert(
+        self,
+        db: Session,
+        model,
+        keys: List[str],
+        rows: List[Dict],
+        increment: bool = False,
+    ):
+        """Insert rows; on key conflict add to (increment) or replace the totals"""
+        if not rows:
+            return
+
+        now = datetime.utcnow()
+        for row in rows:
+            row["updated_at"] = now
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            self._merge(db, model, keys, rows, increment)
+            return
+
+        stmt = insert(model)
+        if increment:
+            totals = {
+                "total_sales": model.total_sales + stmt.excluded.total_sales,
+                "order_count": model.order_count + stmt.excluded.order_count,
+            }
+        else:
+            totals = {
+                "total_sales": stmt.excluded.total_sales,
+                "order_count": stmt.excluded.order_count,
+            }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={**totals, "updated_at": stmt.excluded.updated_at},
+        )
+        db.execute(stmt, rows)
+
+    def _merge(self, db: Session, model, keys, rows, increment):
+        """Row-at-a-time fallback for databases without ON CONFLICT"""
+        for row in rows:
+            existing = db.get(model, tuple(row[k] for k in keys))
+            if existing is None:
+                db.add(model(**row))
+                continue
+            if increment:
+                existing.total_sales += row["total_sales"]
+                existing.order_count += row["order_count"]
+            else:
+                existing.total_sales = row["total_sales"]
+                existing.order_count = row["order_count"]
+            existing.updated_at = row["updated_at"]
+
+
+# Global rollup service instance
+_sales_rollup_service = None
+
+
+def get_sales_rollup_service() -> SalesRollupService:
+    """Get or create the global sales rollup service instance"""
+    global _sales_rollup_service
+    if _sales_rollup_service is None:
+        _sales_rollup_service = SalesRollupService()
+    return _sales_rollup_service
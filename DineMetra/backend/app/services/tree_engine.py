@@ -0,0 +1,243 @@
+"""
+Tree Ensemble Inference Engine
+Evaluates fitted sklearn forests from flat node arrays with vectorized NumPy
+
+sklearn's predict() validates input and dispatches each estimator in Python,
+which dominates latency for the one-row requests the API serves. The engine
+compiles a fitted ensemble once into flat arrays and then evaluates every
+row through every tree at once:
+
+    feature    int32   split feature per node (0 for leaves)
+    threshold  float64 split threshold per node (+inf for leaves)
+    children   int32   (n_nodes, 2) absolute [left, right] child per node;
+                       leaves point at themselves
+    value      float64 leaf value, (n_nodes,) or (n_nodes, n_classes);
+                       gradient boosting values are pre-scaled by the
+                       learning rate
+    roots      int64   root node index of each tree
+
+Because leaves loop back to themselves, traversal is a fixed max_depth
+steps of gather + compare with no per-tree branching.
+
+The vectorized walk wins below a few hundred rows (the API's single
+predictions and small batches). Above LARGE_BATCH_ROWS sklearn's C loops are
+faster, so an engine compiled from an in-memory model hands those batches
+back to it; memory-mapped engines have no sklearn copy and always walk.
+
+Supported: GradientBoostingRegressor, RandomForestRegressor,
+RandomForestClassifier (single output). Predictions match model.predict.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GRADIENT_BOOSTING = "gradient_boosting"
+FOREST_CLASSIFIER = "forest_classifier"
+FOREST_REGRESSOR = "forest_regressor"
+
+ARRAY_NAMES = ["feature", "threshold", "children", "value", "roots"]
+
+# Batch size above which sklearn's per-tree C loops beat the vectorized walk
+# (see scripts/benchmark_tree_engine.py)
+LARGE_BATCH_ROWS = 200
+
+
+class TreeEnsembleEngine:
+    """
+    Compiled, read-only tree ensemble with a sklearn-style predict()
+
+    Arrays may be in memory or memory-mapped (see model_artifacts).
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict, sklearn_model=None):
+        self.arrays = arrays
+        self.meta = meta
+        self.sklearn_model = sklearn_model
+
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        # Flattened so a step is one gather: children[2 * node + go_right]
+        self.children = arrays["children"].reshape(-1)
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+
+        self.kind = meta["kind"]
+        self.max_depth = int(meta["max_depth"])
+        self.baseline = float(meta.get("baseline", 0.0))
+        self.n_features_in_ = int(meta["n_features"])
+        self.feature_names_in_ = meta.get("features") or None
+        self.classes_ = np.asarray(meta["classes"]) if meta.get("classes") else None
+
+    # ========================================
+    # EVALUATION
+    # ========================================
+
+    def _to_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "columns"):
+            # Reorder DataFrame columns to the training order
+            if self.feature_names_in_ and list(X.columns) != self.feature_names_in_:
+                X = X[self.feature_names_in_]
+            X = X.to_numpy()
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input with {self.n_features_in_} features, got {X.shape}"
+            )
+        return X
+
+    def apply(self, X) -> np.ndarray:
+        """Get the leaf reached in every tree: shape (n_trees, n_rows)"""
+        X = self._to_matrix(X)
+        n_rows = X.shape[0]
+        # Column-major copy so each step is a single 1-D gather
+        columns = np.ascontiguousarray(X.T).reshape(-1)
+        column_offsets = self.feature.astype(np.int64) * n_rows
+        rows = np.arange(n_rows, dtype=np.int64)
+
+        node = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = columns.take(column_offsets.take(node) + rows)
+            go_right = ~(x <= self.threshold.take(node))
+            node = self.children.take(2 * node + go_right)
+        return node
+
+    def _tree_total(self, X, start: float = 0.0) -> np.ndarray:
+        leaf_values = self.value[self.apply(X)]
+        # Running sum from `start` tree by tree, the same order as sklearn
+        first = np.full((1,) + leaf_values.shape[1:], start)
+        return np.cumsum(np.concatenate([first, leaf_values]), axis=0)[-1]
+
+    def _use_sklearn(self, X) -> bool:
+        return self.sklearn_model is not None and len(X) >= LARGE_BATCH_ROWS
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.kind != FOREST_CLASSIFIER:
+            raise AttributeError("predict_proba is only available for classifiers")
+        if self._use_sklearn(X):
+            return self.sklearn_model.predict_proba(X)
+        return self._tree_total(X) / len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        if self._use_sklearn(X):
+            return self.sklearn_model.predict(X)
+        if self.kind == GRADIENT_BOOSTING:
+            return self._tree_total(X, start=self.baseline)
+        if self.kind == FOREST_CLASSIFIER:
+            return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+        return self._tree_total(X) / len(self.roots)
+
+
+# ========================================
+# COMPILATION
+# ========================================
+
+
+def compile_model(
+    model, features: Optional[List[str]] = None, keep_model: bool = True
+) -> TreeEnsembleEngine:
+    """
+    Compile a fitted sklearn ensemble into a TreeEnsembleEngine
+
+    Args:
+        model: Fitted ensemble (an existing engine is returned unchanged)
+        features: Feature names in training order, if the model lacks them
+        keep_model: Keep the sklearn model for batches of LARGE_BATCH_ROWS+
+
+    Raises:
+        ValueError: For unsupported model types
+    """
+    if isinstance(model, TreeEnsembleEngine):
+        return model
+
+    name = type(model).__name__
+    if name == "GradientBoostingRegressor":
+        kind = GRADIENT_BOOSTING
+        estimators = list(model.estimators_[:, 0])
+        scale = float(model.learning_rate)
+    elif name == "RandomForestClassifier":
+        kind = FOREST_CLASSIFIER
+        estimators = list(model.estimators_)
+        scale = 1.0
+    elif name == "RandomForestRegressor":
+        kind = FOREST_REGRESSOR
+        estimators = list(model.estimators_)
+        scale = 1.0
+    else:
+        raise ValueError(f"Unsupported model type for tree engine: {name}")
+
+    features_out, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left < 0
+        roots.append(offset)
+
+        features_out.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        # Absolute child indices; leaves loop back to themselves
+        left = np.where(is_leaf, nodes, tree.children_left) + offset
+        right = np.where(is_leaf, nodes, tree.children_right) + offset
+        children.append(np.column_stack([left, right]))
+
+        value = tree.value[:, 0, :]
+        if kind == FOREST_CLASSIFIER:
+            # Per-tree class probabilities, as in DecisionTreeClassifier.predict_proba
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+        else:
+            values.append(scale * value[:, 0])
+        offset += tree.node_count
+
+    arrays = {
+        "feature": np.concatenate(features_out).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "children": np.concatenate(children).astype(np.int32),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+
+    meta = {
+        "kind": kind,
+        "n_features": int(model.n_features_in_),
+        "n_trees": len(estimators),
+        "n_nodes": int(offset),
+        "max_depth": max(int(e.tree_.max_depth) for e in estimators),
+    }
+    if kind == GRADIENT_BOOSTING:
+        meta["learning_rate"] = scale
+        meta["baseline"] = (
+            0.0
+            if model.init_ == "zero"
+            else float(
+                np.ravel(model.init_.predict(np.zeros((1, model.n_features_in_))))[0]
+            )
+        )
+    if kind == FOREST_CLASSIFIER:
+        meta["classes"] = np.asarray(model.classes_).tolist()
+    if features:
+        meta["features"] = [str(f) for f in features]
+    elif hasattr(model, "feature_names_in_"):
+        meta["features"] = [str(f) for f in model.feature_names_in_]
+
+    return TreeEnsembleEngine(arrays, meta, model if keep_model else None)
+
+
+def try_compile(model, features: Optional[List[str]] = None):
+    """
+    Compile when supported, otherwise hand back the original model
+
+    Used by the ml_service predictors so an unexpected model type still
+    serves through sklearn.
+    """
+    try:
+        return compile_model(model, features)
+    except Exception as e:
+        logger.warning(f"Tree engine unavailable, using sklearn predict: {e}")
+        return model
@@ -0,0 +1,459 @@
+"""
+Upload Job Service
+Persisted queue of CSV upload jobs run on a bounded worker pool
+
+Each upload becomes a row in upload_jobs. Jobs run on UPLOAD_WORKERS
+threads, so several managers uploading month files at once queue up
+instead of competing with API requests. WebSocket progress messages are
+built from the job row after every update.
+
+- Dedupe: a file whose SHA-256 matches a queued, running or completed
+  job is not loaded again (enforced by a unique partial index)
+- Resume: re-uploading a file whose job failed or was cancelled requeues
+  that job, which skips the rows it already committed
+- Cancellation: queued jobs never start; running jobs stop after the
+  current chunk (chunks already committed stay loaded)
+- Restart recovery: queued jobs are resubmitted, jobs that were running
+  are marked failed (their committed chunks are already in the database)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.database.database import SessionLocal
+from app.models.database_models import UploadJob
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+DEDUPE_STATUSES = ("queued", "running", "completed")
+RESUME_STATUSES = ("failed", "cancelled")
+
+
+class UploadCancelled(Exception):
+    """Raised by the loader when its job has been cancelled"""
+
+
+class UploadJobService:
+    """
+    Upload job queue
+
+    Features:
+    - Persisted job state and progress
+    - Bounded worker pool
+    - Content-hash dedupe
+    - Cancellation and restart recovery
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="upload-job"
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cancel_requested = set()
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def _session(self):
+        if SessionLocal is None:
+            raise Exception("Database not configured")
+        db = SessionLocal()
+        if not self._table_ready:
+            bind = db.get_bind()
+            UploadJob.__table__.create(bind=bind, checkfirst=True)
+            for index in UploadJob.__table__.indexes:
+                index.create(bind=bind, checkfirst=True)
+            self._table_ready = True
+        return db
+
+    @staticmethod
+    def _to_dict(job: UploadJob) -> Dict:
+        return {
+            "job_id": job.id,
+            "filename": job.filename,
+            "content_hash": job.content_hash,
+            "status": job.status,
+            "progress": job.progress or 0,
+            "total_bytes": job.total_bytes or 0,
+            "bytes_processed": job.bytes_processed or 0,
+            "rows_processed": job.rows_processed or 0,
+            "orders_created": job.orders_created or 0,
+            "message": job.message,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(
+        self, spool_path: str, filename: str, content_hash: str, total_bytes: int
+    ) -> Dict:
+        """
+        Queue a spooled upload
+
+        Returns:
+            The new job, the existing job (duplicate=True) if the same
+            content is already queued, running or loaded, or the earlier
+            failed/cancelled job requeued to resume (resumed=True)
+        """
+        self.attach_loop()
+        db = self._session()
+        try:
+            existing = self._find_job(db, content_hash, DEDUPE_STATUSES)
+            if existing is not None:
+                return self._duplicate(existing, spool_path, filename)
+
+            job = self._find_job(db, content_hash, RESUME_STATUSES)
+            resumed = job is not None
+            if resumed:
+                # Rows it committed stay loaded; the worker skips them
+                job.status = "queued"
+                job.filename = filename
+                job.spool_path = spool_path
+                job.total_bytes = total_bytes
+                job.error = None
+                job.finished_at = None
+                job.message = f"Queued to resume after {job.rows_processed or 0:,} rows"
+            else:
+                job = UploadJob(
+                    id=uuid.uuid4().hex,
+                    filename=filename,
+                    content_hash=content_hash,
+                    status="queued",
+                    spool_path=spool_path,
+                    total_bytes=total_bytes,
+                    message="Queued",
+                )
+                db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent upload of the same file got there first
+                db.rollback()
+                existing = self._find_job(db, content_hash, DEDUPE_STATUSES)
+                if existing is None:
+                    raise
+                return self._duplicate(existing, spool_path, filename)
+            result = self._to_dict(job)
+        finally:
+            db.close()
+
+        self._executor.submit(self._run, result["job_id"])
+        action = "Requeued" if resumed else "Queued"
+        logger.info(f"📥 {action} upload job {result['job_id']} ({filename})")
+        return {**result, "duplicate": False, "resumed": resumed}
+
+    @staticmethod
+    def _find_job(db, content_hash: str, statuses) -> Optional[UploadJob]:
+        return db.execute(
+            select(UploadJob)
+            .where(
+                UploadJob.content_hash == content_hash,
+                UploadJob.status.in_(statuses),
+            )
+            .order_by(UploadJob.created_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+    def _duplicate(self, existing: UploadJob, spool_path: str, filename: str) -> Dict:
+        self._remove_spool(spool_path)
+        logger.info(
+            f"📎 Upload {filename} matches job {existing.id} "
+            f"({existing.status}) - not loading again"
+        )
+        return {**self._to_dict(existing), "duplicate": True, "resumed": False}
+
+    def recover(self) -> Dict:
+        """Resubmit queued jobs and fail jobs interrupted by a restart"""
+        self.attach_loop()
+        db = self._session()
+        try:
+            jobs = (
+                db.execute(
+                    select(UploadJob)
+                    .where(UploadJob.status.in_(ACTIVE_STATUSES))
+                    .order_by(UploadJob.created_at)
+                )
+                .scalars()
+                .all()
+            )
+            requeued = []
+            interrupted = 0
+            for job in jobs:
+                if (
+                    job.status == "queued"
+                    and job.spool_path
+                    and os.path.exists(job.spool_path)
+                ):
+                    requeued.append(job.id)
+                    continue
+                job.status = "failed"
+                job.error = "Interrupted by server restart"
+                job.finished_at = datetime.utcnow()
+                self._remove_spool(job.spool_path)
+                interrupted += 1
+            db.commit()
+        finally:
+            db.close()
+
+        for job_id in requeued:
+            self._executor.submit(self._run, job_id)
+        if requeued or interrupted:
+            logger.info(
+                f"🔁 Upload jobs recovered: {len(requeued)} requeued, "
+                f"{interrupted} marked failed"
+            )
+        return {"requeued": len(requeued), "failed": interrupted}
+
+    # ------------------------------------------------------------------
+    # Status and cancellation
+    # ------------------------------------------------------------------
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        db = self._session()
+        try:
+            job = db.get(UploadJob, job_id)
+            return self._to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        db = self._session()
+        try:
+            jobs = (
+                db.execute(
+                    select(UploadJob).order_by(UploadJob.created_at.desc()).limit(limit)
+                )
+                .scalars()
+                .all()
+            )
+            return [self._to_dict(job) for job in jobs]
+        finally:
+            db.close()
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job
+
+        Returns:
+            The job after the request, None if it does not exist
+        """
+        db = self._session()
+        try:
+            job = db.get(UploadJob, job_id)
+            if job is None:
+                return None
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.message = "Cancelled before start"
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                self._remove_spool(job.spool_path)
+            elif job.status == "running":
+                with self._lock:
+                    self._cancel_requested.add(job_id)
+                job.message = "Cancelling after current chunk"
+                db.commit()
+            return self._to_dict(job)
+        finally:
+            db.close()
+
+    def clear_finished(self) -> int:
+        """
+        Delete finished job records (after their uploaded orders are cleared)
+
+        Queued and running jobs are kept. Returns the number deleted.
+        """
+        db = self._session()
+        try:
+            deleted = (
+                db.query(UploadJob)
+                .filter(UploadJob.status.notin_(ACTIVE_STATUSES))
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancel_requested
+
+    def get_stats(self) -> Dict:
+        """Queue depth for system info / upload status"""
+        try:
+            db = self._session()
+        except Exception:
+            return {"enabled": False}
+        try:
+            counts = {
+                status: db.query(UploadJob).filter(UploadJob.status == status).count()
+                for status in ACTIVE_STATUSES
+            }
+        finally:
+            db.close()
+        return {"enabled": True, "workers": self.max_workers, **counts}
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _run(self, job_id: str):
+        """Run one job on a worker thread"""
+        # Imported here: the upload API imports this service
+        from app.api.upload import load_toast_items_csv, refresh_dashboard
+
+        job = self._update(
+            job_id,
+            only_if_status="queued",
+            status="running",
+            started_at=datetime.utcnow(),
+            message="Starting upload",
+        )
+        if job is None:
+            return  # cancelled while queued
+        self._broadcast("upload_started", job)
+
+        # Rows stay committed if a later chunk fails; the error says so
+        committed = {"rows": job["rows_processed"], "chunks": 0}
+
+        def report(progress: Dict):
+            # Called after each commit: record it before honouring a cancel
+            committed["rows"] = progress["rows_processed"]
+            committed["chunks"] += 1
+            updated = self._update(
+                job_id,
+                progress=progress["progress"],
+                bytes_processed=progress["bytes_processed"],
+                rows_processed=progress["rows_processed"],
+                orders_created=progress["orders_created"],
+                message=progress["message"],
+            )
+            self._broadcast("upload_progress", updated)
+            if self.is_cancel_requested(job_id):
+                raise UploadCancelled()
+
+        try:
+            result = load_toast_items_csv(
+                job["spool_path"],
+                job["filename"],
+                report,
+                order_prefix=f"UPLOAD_{job_id[:8]}",
+                skip_rows=job["rows_processed"],
+                orders_done=job["orders_created"],
+            )
+            job = self._update(
+                job_id,
+                status="completed",
+                progress=100,
+                orders_created=result["orders"],
+                message=f"✅ Successfully loaded data from {job['filename']}!",
+                finished_at=datetime.utcnow(),
+            )
+            self._broadcast("upload_complete", job)
+            self._submit_coroutine(refresh_dashboard("Dashboard updated with new data"))
+        except UploadCancelled:
+            job = self._update(
+                job_id,
+                status="cancelled",
+                message="Upload cancelled",
+                finished_at=datetime.utcnow(),
+            )
+            self._broadcast("upload_cancelled", job)
+            self._submit_coroutine(refresh_dashboard("Upload cancelled"))
+        except Exception as e:
+            logger.error(f"Upload job {job_id} failed: {e}", exc_info=True)
+            message = f"❌ Upload failed: {str(e)}"
+            if committed["rows"]:
+                message += (
+                    f" ({committed['rows']:,} rows were already committed,"
+                    f" {committed['chunks']} chunks in this attempt;"
+                    " upload the same file again to resume after them)"
+                )
+            job = self._update(
+                job_id,
+                status="failed",
+                message=message,
+                error=str(e),
+                finished_at=datetime.utcnow(),
+            )
+            self._broadcast("upload_error", job)
+        finally:
+            with self._lock:
+                self._cancel_requested.discard(job_id)
+            self._remove_spool(job["spool_path"] if job else None)
+
+    def _update(self, job_id: str, only_if_status: Optional[str] = None, **fields):
+        """Persist job fields; returns the job dict (None if the status check fails)"""
+        db = self._session()
+        try:
+            job = db.get(UploadJob, job_id)
+            if job is None or (only_if_status and job.status != only_if_status):
+                return None
+            for key, value in fields.items():
+                setattr(job, key, value)
+            db.commit()
+            return {**self._to_dict(job), "spool_path": job.spool_path}
+        finally:
+            db.close()
+
+    def _broadcast(self, message_type: str, job: Dict):
+        from app.websocket.manager import manager
+
+        message = {k: v for k, v in job.items() if k != "spool_path"}
+        self._submit_coroutine(manager.broadcast({"type": message_type, **message}))
+
+    def attach_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Set the event loop WebSocket broadcasts are scheduled on"""
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+        self._loop = loop
+
+    def _submit_coroutine(self, coroutine):
+        """Schedule a coroutine on the API event loop from a worker thread"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coroutine.close()
+            return
+        asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    @staticmethod
+    def _remove_spool(path: Optional[str]):
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Global upload job service instance
+_upload_job_service = None
+
+
+def get_upload_job_service() -> UploadJobService:
+    """Get or create the global upload job service instance"""
+    global _upload_job_service
+    if _upload_job_service is None:
+        _upload_job_service = UploadJobService(
+            max_workers=int(os.getenv("UPLOAD_WORKERS", "2"))
+        )
+    return _upload_job_service
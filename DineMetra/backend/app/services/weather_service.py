@@ -12,7 +12,9 @@ Run: python -m app.services.weather_service
 
 import requests
 import json
-from datetime import datetime, timedelta
+import os
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Optional, List
 import logging
@@ -28,8 +30,25 @@ logger = logging.getLogger(__name__)
 class WeatherService:
     """
     Fetches weather data from weather.gov API
+
+    Forecasts are cached in memory (shared by every instance) and on disk in
+    data/weather. Fresh entries are served directly; stale entries are served
+    while one background fetch refreshes them; concurrent cold-start callers
+    share a single in-flight request. Entries older than WEATHER_MAX_STALE
+    are never served, and periods that have already ended are dropped.
     """
 
+    # Seconds before a failed grid/forecast request is retried
+    RETRY_SECONDS = 60
+
+    # Shared across instances: grid info by location, raw periods by URL
+    _grid_cache: Dict[str, Dict] = {}
+    _forecast_cache: Dict[str, Dict] = {}
+    _failed_at: Dict[str, float] = {}
+    _inflight: Dict[str, threading.Event] = {}
+    _disk_checked = False
+    _cache_lock = threading.Lock()
+
     def __init__(self, lat: float = 36.1540, lng: float = -95.9928):
         """
         Initialize weather service
@@ -51,6 +70,12 @@ class WeatherService:
         self.cache_dir = Path("data/weather")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+        # How long a fetched forecast is served before revalidating
+        self.cache_ttl = float(os.getenv("WEATHER_CACHE_TTL", "1800"))
+
+        # Oldest forecast served at all (e.g. while weather.gov is down)
+        self.max_stale = float(os.getenv("WEATHER_MAX_STALE", "21600"))
+
         # Get grid point info (required for weather.gov API)
         self.grid_info = self._get_grid_info()
 
@@ -64,6 +89,24 @@ class WeatherService:
         Returns:
             Dictionary with grid office and coordinates
         """
+        # Grid points never move: resolve once per location, then reuse
+        location = f"{self.lat},{self.lng}"
+        if location in WeatherService._grid_cache:
+            return WeatherService._grid_cache[location]
+
+        grid_file = self.cache_dir / f"grid_{self.lat}_{self.lng}.json"
+        if grid_file.exists():
+            try:
+                with open(grid_file, "r") as f:
+                    grid_info = json.load(f)
+                WeatherService._grid_cache[location] = grid_info
+                return grid_info
+            except Exception as e:
+                logger.error(f"Grid cache read error: {e}")
+
+        if self._recently_failed(location):
+            return {}
+
         try:
             url = f"https://api.weather.gov/points/{self.lat},{self.lng}"
             response = requests.get(url, headers=self.headers, timeout=10)
@@ -84,12 +127,166 @@ class WeatherService:
             logger.info(
                 f"✓ Grid info: {grid_info['office']} ({grid_info['grid_x']}, {grid_info['grid_y']})"
             )
+            WeatherService._grid_cache[location] = grid_info
+            with open(grid_file, "w") as f:
+                json.dump(grid_info, f, indent=2)
             return grid_info
 
         except Exception as e:
             logger.error(f"Error getting grid info: {e}")
+            WeatherService._failed_at[location] = time.monotonic()
             return {}
 
+    def _ensure_grid_info(self) -> Dict:
+        """Retry grid lookup if it failed when this instance was created"""
+        if not self.grid_info:
+            self.grid_info = self._get_grid_info()
+        return self.grid_info
+
+    @staticmethod
+    def _recently_failed(key: str) -> bool:
+        failed_at = WeatherService._failed_at.get(key)
+        return (
+            failed_at is not None
+            and time.monotonic() - failed_at < WeatherService.RETRY_SECONDS
+        )
+
+    # ========================================
+    # FORECAST CACHE
+    # ========================================
+
+    def _get_periods(self, url: str, persist: bool = False) -> List[Dict]:
+        """
+        Get raw forecast periods for a weather.gov forecast URL
+
+        Fresh cache -> served directly. Stale cache -> served while one
+        background fetch revalidates. Empty or expired cache -> disk copy,
+        else a single shared fetch. Periods that have ended are dropped.
+        """
+        entry = WeatherService._forecast_cache.get(url)
+        if entry is None and persist:
+            entry = self._load_periods_from_disk(url)
+
+        if not self._usable(entry):
+            if self._recently_failed(url):
+                return []
+            return self._drop_expired(self._fetch_periods(url, persist))
+
+        if time.monotonic() - entry["fetched_at"] >= self.cache_ttl:
+            self._refresh_in_background(url, persist)
+        return self._drop_expired(entry["periods"])
+
+    def _usable(self, entry: Optional[Dict]) -> bool:
+        """True if a cache entry is within WEATHER_MAX_STALE"""
+        return (
+            entry is not None
+            and time.monotonic() - entry["fetched_at"] < self.max_stale
+        )
+
+    @staticmethod
+    def _drop_expired(periods: List[Dict]) -> List[Dict]:
+        """Drop forecast periods whose endTime has passed"""
+        now = datetime.now(timezone.utc)
+        return [
+            period
+            for period in periods
+            if "endTime" not in period
+            or datetime.fromisoformat(period["endTime"].replace("Z", "+00:00")) > now
+        ]
+
+    def _fetch_periods(self, url: str, persist: bool) -> List[Dict]:
+        """Fetch periods, sharing one request between concurrent callers"""
+        with WeatherService._cache_lock:
+            in_flight = WeatherService._inflight.get(url)
+            if in_flight is None:
+                WeatherService._inflight[url] = threading.Event()
+
+        if in_flight is not None:
+            # Someone else is already fetching; wait for their result
+            in_flight.wait(timeout=15)
+            entry = WeatherService._forecast_cache.get(url)
+            return entry["periods"] if self._usable(entry) else []
+
+        try:
+            response = requests.get(url, headers=self.headers, timeout=10)
+            response.raise_for_status()
+            periods = response.json().get("properties", {}).get("periods", [])
+
+            WeatherService._forecast_cache[url] = {
+                "periods": periods,
+                "fetched_at": time.monotonic(),
+            }
+            WeatherService._failed_at.pop(url, None)
+            logger.info(f"✓ Fetched {len(periods)} forecast periods")
+
+            if persist:
+                self.save_forecast_to_cache(
+                    self._build_daily_forecast(periods, days=7),
+                    periods=periods,
+                    forecast_url=url,
+                )
+            return periods
+
+        except Exception as e:
+            logger.error(f"Error fetching forecast: {e}")
+            WeatherService._failed_at[url] = time.monotonic()
+            # Serve stale data rather than nothing, up to WEATHER_MAX_STALE
+            entry = WeatherService._forecast_cache.get(url)
+            return entry["periods"] if self._usable(entry) else []
+
+        finally:
+            with WeatherService._cache_lock:
+                WeatherService._inflight.pop(url).set()
+
+    def _refresh_in_background(self, url: str, persist: bool):
+        if url in WeatherService._inflight or self._recently_failed(url):
+            return
+        threading.Thread(
+            target=self._fetch_periods,
+            args=(url, persist),
+            name="weather-refresh",
+            daemon=True,
+        ).start()
+
+    def _load_periods_from_disk(self, url: str) -> Optional[Dict]:
+        """
+        Seed the memory cache from the newest forecast file (once per process)
+
+        Files older than WEATHER_MAX_STALE are ignored. Runs under the cache
+        lock so concurrent first callers read the disk once and all see the
+        seeded entry.
+        """
+        with WeatherService._cache_lock:
+            if WeatherService._disk_checked:
+                return WeatherService._forecast_cache.get(url)
+            WeatherService._disk_checked = True
+
+            for cache_file in sorted(
+                self.cache_dir.glob("forecast_*.json"), reverse=True
+            ):
+                try:
+                    with open(cache_file, "r") as f:
+                        data = json.load(f)
+                    if "periods" not in data or data.get("forecast_url") != url:
+                        continue
+
+                    age = (
+                        datetime.now() - datetime.fromisoformat(data["fetched_at"])
+                    ).total_seconds()
+                    if age >= self.max_stale:
+                        logger.info(f"Ignoring expired forecast cache {cache_file}")
+                        return None
+                    entry = {
+                        "periods": data["periods"],
+                        "fetched_at": time.monotonic() - max(0.0, age),
+                    }
+                    WeatherService._forecast_cache[url] = entry
+                    logger.info(f"✓ Loaded cached forecast from {cache_file}")
+                    return entry
+                except Exception as e:
+                    logger.error(f"Forecast cache read error: {e}")
+            return None
+
     def get_current_weather(self) -> Optional[Dict]:
         """
         Get current weather conditions
@@ -99,7 +296,7 @@ class WeatherService:
         """
         try:
             # Get observation stations
-            stations_url = self.grid_info.get("observation_stations_url")
+            stations_url = self._ensure_grid_info().get("observation_stations_url")
             if not stations_url:
                 logger.warning("No observation stations URL available")
                 return None
@@ -157,69 +354,66 @@ class WeatherService:
             List of daily forecast dictionaries
         """
         try:
-            forecast_url = self.grid_info.get("forecast_url")
+            forecast_url = self._ensure_grid_info().get("forecast_url")
             if not forecast_url:
                 logger.warning("No forecast URL available")
                 return []
 
-            response = requests.get(forecast_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            periods = self._get_periods(forecast_url, persist=True)
+            return self._build_daily_forecast(periods, days)
 
-            periods = data.get("properties", {}).get("periods", [])
+        except Exception as e:
+            logger.error(f"Error fetching forecast: {e}")
+            return []
 
-            # Process forecast periods
-            forecasts = []
-            current_date = None
-            daily_forecast = {}
+    def _build_daily_forecast(self, periods: List[Dict], days: int) -> List[Dict]:
+        """Group day/night forecast periods into daily forecasts"""
+        forecasts = []
+        current_date = None
+        daily_forecast = {}
 
-            for period in periods[: days * 2]:  # Each day has 2 periods (day/night)
-                start_time = datetime.fromisoformat(
-                    period["startTime"].replace("Z", "+00:00")
+        for period in periods[: days * 2]:  # Each day has 2 periods (day/night)
+            start_time = datetime.fromisoformat(
+                period["startTime"].replace("Z", "+00:00")
+            )
+            period_date = start_time.date()
+
+            # Start new day
+            if period_date != current_date:
+                if daily_forecast:
+                    forecasts.append(daily_forecast)
+
+                current_date = period_date
+                daily_forecast = {
+                    "date": period_date.isoformat(),
+                    "day_of_week": period_date.weekday(),
+                    "temperature_high_f": None,
+                    "temperature_low_f": None,
+                    "condition": "",
+                    "precipitation_chance": 0,
+                    "short_forecast": "",
+                }
+
+            # Day period
+            if period["isDaytime"]:
+                daily_forecast["temperature_high_f"] = period.get("temperature")
+                daily_forecast["condition"] = self._standardize_condition(
+                    period.get("shortForecast", "")
                 )
-                period_date = start_time.date()
-
-                # Start new day
-                if period_date != current_date:
-                    if daily_forecast:
-                        forecasts.append(daily_forecast)
-
-                    current_date = period_date
-                    daily_forecast = {
-                        "date": period_date.isoformat(),
-                        "day_of_week": period_date.weekday(),
-                        "temperature_high_f": None,
-                        "temperature_low_f": None,
-                        "condition": "",
-                        "precipitation_chance": 0,
-                        "short_forecast": "",
-                    }
+                daily_forecast["short_forecast"] = period.get("shortForecast", "")
+                precip_prob = period.get("probabilityOfPrecipitation", {})
+                daily_forecast["precipitation_chance"] = (
+                    precip_prob.get("value", 0) if precip_prob else 0
+                )
+            # Night period
+            else:
+                daily_forecast["temperature_low_f"] = period.get("temperature")
 
-                # Day period
-                if period["isDaytime"]:
-                    daily_forecast["temperature_high_f"] = period.get("temperature")
-                    daily_forecast["condition"] = self._standardize_condition(
-                        period.get("shortForecast", "")
-                    )
-                    daily_forecast["short_forecast"] = period.get("shortForecast", "")
-                    precip_prob = period.get("probabilityOfPrecipitation", {})
-                    daily_forecast["precipitation_chance"] = (
-                        precip_prob.get("value", 0) if precip_prob else 0
-                    )
-                # Night period
-                else:
-                    daily_forecast["temperature_low_f"] = period.get("temperature")
-
-            # Add last day if exists
-            if daily_forecast and daily_forecast not in forecasts:
-                forecasts.append(daily_forecast)
-
-            logger.info(f"✓ Fetched {len(forecasts)} day forecast")
-            return forecasts
+        # Add last day if exists
+        if daily_forecast and daily_forecast not in forecasts:
+            forecasts.append(daily_forecast)
 
-        except Exception as e:
-            logger.error(f"Error fetching forecast: {e}")
-            return []
+        return forecasts
 
     def get_hourly_forecast(self, hours: int = 24) -> List[Dict]:
         """
@@ -232,16 +426,12 @@ class WeatherService:
             List of hourly forecast dictionaries
         """
         try:
-            forecast_url = self.grid_info.get("forecast_hourly_url")
+            forecast_url = self._ensure_grid_info().get("forecast_hourly_url")
             if not forecast_url:
                 logger.warning("No hourly forecast URL available")
                 return []
 
-            response = requests.get(forecast_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            periods = data.get("properties", {}).get("periods", [])
+            periods = self._get_periods(forecast_url)
 
             hourly_forecasts = []
             for period in periods[:hours]:
@@ -264,7 +454,6 @@ class WeatherService:
 
                 hourly_forecasts.append(hourly)
 
-            logger.info(f"✓ Fetched {len(hourly_forecasts)} hour forecast")
             return hourly_forecasts
 
         except Exception as e:
@@ -376,22 +565,36 @@ class WeatherService:
 
         return round(max(-5, min(10, impact)), 1)
 
-    def save_forecast_to_cache(self, forecasts: List[Dict]):
-        """Save forecast to cache file"""
+    def save_forecast_to_cache(
+        self,
+        forecasts: List[Dict],
+        periods: Optional[List[Dict]] = None,
+        forecast_url: Optional[str] = None,
+    ):
+        """
+        Save forecast to cache file
+
+        When the raw periods are included the file also seeds the in-memory
+        forecast cache after a restart.
+        """
         cache_file = (
             self.cache_dir / f"forecast_{datetime.now().strftime('%Y%m%d')}.json"
         )
 
-        with open(cache_file, "w") as f:
-            json.dump(
-                {
-                    "fetched_at": datetime.now().isoformat(),
-                    "location": f"{self.lat},{self.lng}",
-                    "forecasts": forecasts,
-                },
-                f,
-                indent=2,
-            )
+        data = {
+            "fetched_at": datetime.now().isoformat(),
+            "location": f"{self.lat},{self.lng}",
+            "forecasts": forecasts,
+        }
+        if periods is not None:
+            data["forecast_url"] = forecast_url
+            data["periods"] = periods
+
+        # Write then rename so readers never see a partial file
+        tmp_file = cache_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_file, cache_file)
 
         logger.info(f"✓ Cached forecast to {cache_file}")
 
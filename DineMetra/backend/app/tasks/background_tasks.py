@@ -8,6 +8,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
 import logging
 import asyncio
+import os
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,8 @@ class BackgroundTaskService:
     - Check alerts every 1 minute
     - Cleanup old data every hour
     - Monitor system health
+    - Refresh the dashboard snapshot every minute
+    - Pick up new processed historical data every 5 minutes
     """
 
     def __init__(self):
@@ -69,8 +72,84 @@ class BackgroundTaskService:
             except Exception as e:
                 logger.warning(f"Prediction service not available: {e}")
 
+        try:
+            from app.services.dashboard_snapshot_service import (
+                get_dashboard_snapshot_service,
+            )
+
+            self.snapshot_service = get_dashboard_snapshot_service()
+        except Exception as e:
+            logger.warning(f"Dashboard snapshot service not available: {e}")
+            self.snapshot_service = None
+
+        self.snapshot_interval = float(os.getenv("DASHBOARD_SNAPSHOT_INTERVAL", "60"))
+
+        try:
+            from app.services.historical_service import get_historical_service
+
+            self.historical_service = get_historical_service()
+        except Exception as e:
+            logger.warning(f"Historical service not available: {e}")
+            self.historical_service = None
+
+        self.historical_refresh_interval = float(
+            os.getenv("HISTORICAL_REFRESH_INTERVAL", "300")
+        )
+
         logger.info("Background Task Service initialized")
 
+    async def refresh_dashboard_snapshot(self, reason: str = "scheduled"):
+        """
+        Rebuild the dashboard snapshot and tell clients when it changed
+
+        Runs every minute, at startup and after uploads
+        """
+        if not self.snapshot_service:
+            logger.debug("Skipping snapshot refresh - service not available")
+            return None
+
+        try:
+            previous_version = self.snapshot_service.version
+            snapshot = await self.snapshot_service.refresh(reason)
+
+            if snapshot["version"] != previous_version and self.connection_manager:
+                await self.connection_manager.broadcast(
+                    {
+                        "type": "refresh_dashboard",
+                        "version": snapshot["version"],
+                        "etag": snapshot["etag"],
+                        "message": "Dashboard updated with new data",
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                    group="dashboard",
+                )
+            return snapshot
+
+        except Exception as e:
+            logger.error(f"Error refreshing dashboard snapshot: {e}", exc_info=True)
+            return None
+
+    async def refresh_historical_data(self):
+        """
+        Fold newly written processed data (ETL runs, scripts) into the
+        historical comparisons, and rebuild the snapshot when it changed
+
+        Runs every 5 minutes
+        """
+        if not self.historical_service:
+            logger.debug("Skipping historical refresh - service not available")
+            return None
+
+        try:
+            result = await asyncio.to_thread(self.historical_service.refresh)
+            if any(result.values()):
+                await self.refresh_dashboard_snapshot("historical data")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error refreshing historical data: {e}", exc_info=True)
+            return None
+
     async def broadcast_predictions(self):
         """
         Broadcast latest predictions to all connected clients
@@ -381,6 +460,29 @@ class BackgroundTaskService:
             replace_existing=True,
         )
 
+        # Dashboard snapshot at startup, then every minute
+        self.scheduler.add_job(
+            self.refresh_dashboard_snapshot,
+            trigger=IntervalTrigger(seconds=self.snapshot_interval),
+            id="refresh_dashboard_snapshot",
+            name="Refresh Dashboard Snapshot",
+            next_run_time=datetime.now(),
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+
+        # Historical data every 5 minutes
+        self.scheduler.add_job(
+            self.refresh_historical_data,
+            trigger=IntervalTrigger(seconds=self.historical_refresh_interval),
+            id="refresh_historical_data",
+            name="Refresh Historical Data",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+
         # Start scheduler
         self.scheduler.start()
         self.is_running = True
@@ -391,6 +493,10 @@ class BackgroundTaskService:
         logger.info("  - Cleanup: every 1 hour")
         logger.info("  - Health monitoring: every 15 minutes")
         logger.info("  - Keepalive: every 30 seconds")
+        logger.info(f"  - Dashboard snapshot: every {self.snapshot_interval:g} seconds")
+        logger.info(
+            f"  - Historical data: every {self.historical_refresh_interval:g} seconds"
+        )
 
     def stop(self):
         """Stop all background tasks"""
@@ -3,20 +3,35 @@ import numpy as np
 import os
 import json
 import logging
-import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, time, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from etl import processed_store
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+FIRST_ORDER_ID = 100000
+PARTY_SIZES = np.array([1, 2, 3, 4, 5, 6, 8])
+PARTY_SIZE_WEIGHTS = np.array([10, 40, 20, 15, 10, 4, 1]) / 100
+
 
 class RealDataExtractor:
-    def __init__(self, data_dir: str = "data/real"):
+    def __init__(
+        self,
+        data_dir: str = "data/real",
+        workers: Optional[int] = None,
+        seed: Optional[int] = 42,
+    ):
         self.data_dir = Path(data_dir)
+        # Seed for synthetic order generation (None: different orders each run)
+        self.seed = seed
+        # Month folders are extracted in parallel on this many processes
+        self.workers = workers or int(os.getenv("ETL_WORKERS", os.cpu_count() or 1))
         self.processed_dir = Path("data/processed")
         self.processed_dir.mkdir(parents=True, exist_ok=True)
 
@@ -33,194 +48,55 @@ class RealDataExtractor:
         orders_df, order_items_df = self.generate_detailed_orders()
 
         if not orders_df.empty:
-            orders_path = self.processed_dir / "orders_from_real_data.csv"
-            orders_df.to_csv(orders_path, index=False)
-            logger.info(f"✓ Saved {len(orders_df)} orders to {orders_path}")
+            processed_store.write_processed(orders_df, "orders", self.processed_dir)
 
         if not order_items_df.empty:
-            items_path = self.processed_dir / "order_items_from_real_data.csv"
-            order_items_df.to_csv(items_path, index=False)
-            logger.info(f"✓ Saved {len(order_items_df)} order items to {items_path}")
+            processed_store.write_processed(
+                order_items_df, "order_items", self.processed_dir
+            )
 
     def load_raw_files(self):
+        """
+        Extract every month folder, one folder per worker process
+
+        Month results are merged in folder order, so the output does not
+        depend on which worker finishes first.
+        """
         if not self.data_dir.exists():
             logger.error(f"❌ Data directory not found: {self.data_dir}")
             return
 
-        for month_dir in sorted(self.data_dir.glob("202*-*")):
-            if not month_dir.is_dir():
-                continue
-            logger.info(f"\n📅 Processing {month_dir.name}...")
-
-            for csv_file in month_dir.glob("*.csv"):
-                try:
-                    filename = csv_file.name.lower()
-
-                    # 1. DAILY SALES (Priority Match)
-                    if "sales by day" in filename:
-                        self._process_daily_sales(csv_file)
-                        continue
-
-                    # 2. HOURLY SALES
-                    elif "time of day" in filename:
-                        self._process_hourly_sales(csv_file)
-                        continue
-
-                    # 3. PRODUCT MIX
-                    elif "_items.csv" in filename or "menu item" in filename:
-                        self._process_product_mix(csv_file)
-                        continue
-
-                    # Fallback check
-                    try:
-                        df_preview = pd.read_csv(csv_file, nrows=1)
-                        columns = set(c.lower().strip() for c in df_preview.columns)
-
-                        # UPDATED MATCHERS for your specific file format
-                        if {"yyyymmdd", "net sales"}.issubset(columns):
-                            self._process_daily_sales(csv_file)
-                        elif {"date", "gross sales"}.issubset(columns):
-                            self._process_daily_sales(csv_file)
-                        elif {"item", "qty sold"}.issubset(columns):
-                            self._process_product_mix(csv_file)
-                    except:
-                        continue
-                except Exception as e:
-                    logger.warning(f"   ⚠️ Error reading {csv_file.name}: {e}")
-
-    def _process_daily_sales(self, filepath):
-        try:
-            df = pd.read_csv(filepath)
-            df.columns = [c.lower().strip() for c in df.columns]
-
-            # --- UPDATED COLUMN MATCHING LOGIC ---
-            # Date: looks for 'date', 'day', OR your specific 'yyyymmdd'
-            date_col = next(
-                (
-                    c
-                    for c in df.columns
-                    if any(x in c for x in ["date", "day", "yyyymmdd"])
-                ),
-                None,
-            )
-
-            # Orders: looks for 'orders', 'count', etc.
-            orders_col = next(
-                (
-                    c
-                    for c in df.columns
-                    if any(
-                        x in c
-                        for x in ["total orders", "count", "orders", "trans", "checks"]
-                    )
-                ),
-                None,
-            )
-
-            # Revenue: looks for 'net sales', 'revenue'
-            rev_col = next(
-                (
-                    c
-                    for c in df.columns
-                    if any(x in c for x in ["net sales", "revenue", "sales"])
-                ),
-                None,
-            )
-
-            if date_col and orders_col:
-                df = df[[date_col, orders_col, rev_col]].copy()
-                df.columns = ["date", "order_count", "revenue"]
-
-                # Intelligent date parsing
-                if "yyyymmdd" in date_col:
-                    # Parse specifically for the 20250101 format
-                    df["date"] = pd.to_datetime(
-                        df["date"], format="%Y%m%d", errors="coerce"
-                    )
-                else:
-                    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        month_dirs = [
+            str(d) for d in sorted(self.data_dir.glob("202*-*")) if d.is_dir()
+        ]
+        if not month_dirs:
+            return
 
-                df = df.dropna(subset=["date"])
-                self.daily_sales = pd.concat([self.daily_sales, df], ignore_index=True)
-                logger.info(f"   ✓ Loaded daily sales ({len(df)} days)")
-            else:
-                # Debug log if it still fails
-                logger.warning(
-                    f"   ⚠️ Skipping {filepath.name}: Missing cols. Found: {list(df.columns)}"
+        workers = min(self.workers, len(month_dirs))
+        results = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(extract_month, month_dirs))
+                logger.info(
+                    f"✓ Extracted {len(month_dirs)} month folders on {workers} processes"
                 )
-
-        except Exception as e:
-            logger.warning(f"   ⚠️ Failed to process daily sales: {e}")
-
-    def _process_hourly_sales(self, filepath):
-        try:
-            df = pd.read_csv(filepath)
-            df.columns = [c.lower().strip() for c in df.columns]
-            time_col = next((c for c in df.columns if "time" in c or "hour" in c), None)
-            val_col = next(
-                (
-                    c
-                    for c in df.columns
-                    if any(x in c for x in ["count", "orders", "sales", "trans"])
-                ),
-                None,
-            )
-
-            if time_col and val_col:
-                df["hour"] = pd.to_datetime(
-                    df[time_col], format="%H:%M", errors="coerce"
-                ).dt.hour
-                df = df.dropna(subset=["hour"])
-                total = df[val_col].sum()
-                if total > 0:
-                    dist = df.set_index("hour")[val_col] / total
-                    self.hourly_patterns["default"] = dist.to_dict()
-                    logger.info("   ✓ Loaded hourly pattern")
-        except Exception as e:
-            logger.warning(f"   ⚠️ Failed to process hourly pattern: {e}")
-
-    def _process_product_mix(self, filepath):
-        try:
-            df = pd.read_csv(filepath)
-            df.columns = [c.lower().strip() for c in df.columns]
-            item_col = next(
-                (c for c in df.columns if c in ["item", "menu item", "name"]), None
-            )
-            qty_col = next(
-                (c for c in df.columns if c in ["qty sold", "quantity", "count"]), None
-            )
-            price_col = next(
-                (c for c in df.columns if c in ["avg. price", "price", "amount"]), None
-            )
-            cat_col = next(
-                (c for c in df.columns if c in ["sales category", "group", "category"]),
-                None,
+            except Exception as e:
+                logger.warning(f"⚠️ Parallel extraction failed ({e}), running serially")
+        if results is None:
+            results = [extract_month(month_dir) for month_dir in month_dirs]
+
+        for result in results:
+            self._merge_month(result)
+
+    def _merge_month(self, result: Dict):
+        if result["daily_sales"]:
+            self.daily_sales = pd.concat(
+                [self.daily_sales, *result["daily_sales"]], ignore_index=True
             )
-
-            if item_col and qty_col:
-                for _, row in df.iterrows():
-                    name = str(row[item_col]).strip()
-                    if not name or name.lower() in ["total", "nan"]:
-                        continue
-                    try:
-                        qty = float(row[qty_col])
-                        if qty <= 0:
-                            continue
-                        price = float(row[price_col]) if price_col else 10.0
-                        category = str(row[cat_col]) if cat_col else "Food"
-                        self.product_mix.append(
-                            {
-                                "name": name,
-                                "category": category,
-                                "price": price,
-                                "weight": qty,
-                            }
-                        )
-                    except:
-                        continue
-                logger.info(f"   ✓ Loaded {len(df)} items into product mix")
-        except Exception as e:
-            logger.warning(f"   ⚠️ Failed to process product mix: {e}")
+        if result["hourly_pattern"]:
+            self.hourly_patterns["default"] = result["hourly_pattern"]
+        self.product_mix.extend(result["product_mix"])
 
     def generate_menu_reference(self):
         if not self.product_mix:
@@ -252,76 +128,282 @@ class RealDataExtractor:
         self.item_weights = menu_df["weight"].values / menu_df["weight"].sum()
 
     def generate_detailed_orders(self):
+        """
+        Expand daily totals into synthetic orders and order items
+
+        Every random draw (minutes, party sizes, item counts, items) is made
+        for the whole date range at once from a generator seeded with
+        self.seed, so the same inputs always give the same orders.
+        """
         logger.info("🔄 Generating detailed orders...")
         if self.daily_sales.empty:
             logger.error("❌ No daily sales data loaded")
             return pd.DataFrame(), pd.DataFrame()
 
-        # NaN Safety Fix
-        self.daily_sales["order_count"] = self.daily_sales["order_count"].fillna(0)
-        self.daily_sales["revenue"] = self.daily_sales["revenue"].fillna(0)
+        rng = np.random.default_rng(self.seed)
 
-        all_orders, all_order_items = [], []
-        order_id_counter = 100000
+        # NaN Safety Fix: unparseable dates ("Total" rows) and empty days are skipped
+        dates = pd.to_datetime(self.daily_sales["date"], errors="coerce")
+        totals = pd.to_numeric(self.daily_sales["order_count"], errors="coerce")
+        totals = totals.fillna(0).astype(int)
+        valid = dates.notna() & (totals > 0)
+        dates = pd.DatetimeIndex(dates[valid]).normalize()
+        totals = totals[valid].to_numpy()
 
-        for _, day_row in self.daily_sales.iterrows():
-            try:
-                # Safe date check
-                if isinstance(day_row["date"], str) and "Total" in day_row["date"]:
-                    continue
-                date = pd.to_datetime(day_row["date"])
+        dist = self.hourly_patterns.get("default", {12: 0.3, 19: 0.7})
+        hours = np.array([int(hour) for hour in dist], dtype=np.int64)
+        probs = np.array(list(dist.values()), dtype=float)
+
+        # Orders per (day, hour), then one row per order in day/hour order
+        counts = (totals[:, None] * probs[None, :]).astype(np.int64).ravel()
+        n_orders = int(counts.sum())
+        if n_orders == 0:
+            return pd.DataFrame(), pd.DataFrame()
+
+        slot_starts = (
+            dates.values[:, None] + hours[None, :].astype("timedelta64[h]")
+        ).ravel()
+        minutes = rng.integers(0, 60, size=n_orders).astype("timedelta64[m]")
+        timestamps = np.repeat(slot_starts, counts) + minutes
+
+        order_ids = np.arange(FIRST_ORDER_ID, FIRST_ORDER_ID + n_orders)
+        party_sizes = rng.choice(PARTY_SIZES, size=n_orders, p=PARTY_SIZE_WEIGHTS)
+        item_counts = party_sizes + rng.integers(0, 3, size=n_orders)
+
+        # Items for all orders in one draw, weighted by product mix
+        menu = pd.DataFrame(self.menu_items)
+        weights = np.asarray(self.item_weights, dtype=float)
+        item_idx = rng.choice(len(menu), size=int(item_counts.sum()), p=weights)
+        item_order = np.repeat(np.arange(n_orders), item_counts)
+        prices = menu["price"].to_numpy(dtype=float)[item_idx]
+
+        order_totals = np.bincount(item_order, weights=prices, minlength=n_orders)
+
+        orders_df = pd.DataFrame(
+            {
+                "order_id": order_ids,
+                "order_timestamp": timestamps,
+                "party_size": party_sizes,
+                "order_total": np.round(order_totals * 1.08, 2),
+                "item_count": item_counts,
+            }
+        )
+        order_items_df = pd.DataFrame(
+            {
+                "order_id": order_ids[item_order],
+                "item_id": menu["item_id"].to_numpy()[item_idx],
+                "item_name": menu["name"].to_numpy()[item_idx],
+                "category": menu["category"].to_numpy()[item_idx],
+                "quantity": 1,
+                "price": np.round(prices, 2),
+            }
+        )
+        logger.info(
+            f"✓ Generated {len(orders_df):,} orders / {len(order_items_df):,} items "
+            f"for {len(dates)} days"
+        )
+        return orders_df, order_items_df
+
+
+# ----------------------------------------------------------------------
+# Month extraction (runs in worker processes)
+# ----------------------------------------------------------------------
+
+
+def classify_file(filename: str, columns) -> Optional[str]:
+    """Report type of a Toast export, from its name or else its columns"""
+    filename = filename.lower()
+
+    # 1. DAILY SALES (Priority Match)
+    if "sales by day" in filename:
+        return "daily_sales"
+    # 2. HOURLY SALES
+    if "time of day" in filename:
+        return "hourly_sales"
+    # 3. PRODUCT MIX
+    if "_items.csv" in filename or "menu item" in filename:
+        return "product_mix"
+
+    # Fallback check on the header
+    columns = set(c.lower().strip() for c in columns)
+    if {"yyyymmdd", "net sales"}.issubset(columns):
+        return "daily_sales"
+    if {"date", "gross sales"}.issubset(columns):
+        return "daily_sales"
+    if {"item", "qty sold"}.issubset(columns):
+        return "product_mix"
+    return None
+
+
+def extract_month(month_dir: str) -> Dict:
+    """
+    Read and parse one month folder
+
+    Each CSV is read once; the same frame is used to classify and parse
+    it. Files are visited in name order.
+
+    Returns:
+        dict: daily_sales frames, hourly_pattern (or None) and product_mix
+    """
+    month_dir = Path(month_dir)
+    logger.info(f"\n📅 Processing {month_dir.name}...")
+    result = {
+        "month": month_dir.name,
+        "daily_sales": [],
+        "hourly_pattern": None,
+        "product_mix": [],
+    }
+
+    for csv_file in sorted(month_dir.glob("*.csv")):
+        try:
+            df = pd.read_csv(csv_file)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Error reading {csv_file.name}: {e}")
+            continue
+
+        file_type = classify_file(csv_file.name, df.columns)
+        df.columns = [c.lower().strip() for c in df.columns]
+        if file_type == "daily_sales":
+            daily = parse_daily_sales(df, csv_file.name)
+            if daily is not None:
+                result["daily_sales"].append(daily)
+        elif file_type == "hourly_sales":
+            pattern = parse_hourly_sales(df)
+            if pattern:
+                result["hourly_pattern"] = pattern
+        elif file_type == "product_mix":
+            result["product_mix"].extend(parse_product_mix(df))
+
+    return result
+
+
+def parse_daily_sales(df: pd.DataFrame, filename: str) -> Optional[pd.DataFrame]:
+    try:
+        # --- UPDATED COLUMN MATCHING LOGIC ---
+        # Date: looks for 'date', 'day', OR your specific 'yyyymmdd'
+        date_col = next(
+            (c for c in df.columns if any(x in c for x in ["date", "day", "yyyymmdd"])),
+            None,
+        )
 
-                total_orders = int(day_row["order_count"])
-                if total_orders <= 0:
+        # Orders: looks for 'orders', 'count', etc.
+        orders_col = next(
+            (
+                c
+                for c in df.columns
+                if any(
+                    x in c
+                    for x in ["total orders", "count", "orders", "trans", "checks"]
+                )
+            ),
+            None,
+        )
+
+        # Revenue: looks for 'net sales', 'revenue'
+        rev_col = next(
+            (
+                c
+                for c in df.columns
+                if any(x in c for x in ["net sales", "revenue", "sales"])
+            ),
+            None,
+        )
+
+        if date_col and orders_col:
+            df = df[[date_col, orders_col, rev_col]].copy()
+            df.columns = ["date", "order_count", "revenue"]
+
+            # Intelligent date parsing
+            if "yyyymmdd" in date_col:
+                # Parse specifically for the 20250101 format
+                df["date"] = pd.to_datetime(
+                    df["date"], format="%Y%m%d", errors="coerce"
+                )
+            else:
+                df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+            df = df.dropna(subset=["date"])
+            logger.info(f"   ✓ Loaded daily sales ({len(df)} days)")
+            return df
+
+        # Debug log if it still fails
+        logger.warning(
+            f"   ⚠️ Skipping {filename}: Missing cols. Found: {list(df.columns)}"
+        )
+    except Exception as e:
+        logger.warning(f"   ⚠️ Failed to process daily sales: {e}")
+    return None
+
+
+def parse_hourly_sales(df: pd.DataFrame) -> Optional[Dict]:
+    try:
+        time_col = next((c for c in df.columns if "time" in c or "hour" in c), None)
+        val_col = next(
+            (
+                c
+                for c in df.columns
+                if any(x in c for x in ["count", "orders", "sales", "trans"])
+            ),
+            None,
+        )
+
+        if time_col and val_col:
+            df["hour"] = pd.to_datetime(
+                df[time_col], format="%H:%M", errors="coerce"
+            ).dt.hour
+            df = df.dropna(subset=["hour"])
+            total = df[val_col].sum()
+            if total > 0:
+                dist = df.set_index("hour")[val_col] / total
+                logger.info("   ✓ Loaded hourly pattern")
+                return dist.to_dict()
+    except Exception as e:
+        logger.warning(f"   ⚠️ Failed to process hourly pattern: {e}")
+    return None
+
+
+def parse_product_mix(df: pd.DataFrame) -> List[Dict]:
+    product_mix = []
+    try:
+        item_col = next(
+            (c for c in df.columns if c in ["item", "menu item", "name"]), None
+        )
+        qty_col = next(
+            (c for c in df.columns if c in ["qty sold", "quantity", "count"]), None
+        )
+        price_col = next(
+            (c for c in df.columns if c in ["avg. price", "price", "amount"]), None
+        )
+        cat_col = next(
+            (c for c in df.columns if c in ["sales category", "group", "category"]),
+            None,
+        )
+
+        if item_col and qty_col:
+            for _, row in df.iterrows():
+                name = str(row[item_col]).strip()
+                if not name or name.lower() in ["total", "nan"]:
                     continue
-            except:
-                continue
-
-            dist = self.hourly_patterns.get("default", {12: 0.3, 19: 0.7})
-
-            for hour, prob in dist.items():
-                hour = int(hour)
-                num_orders_hour = int(total_orders * prob)
-
-                for _ in range(num_orders_hour):
-                    order_id = order_id_counter
-                    order_id_counter += 1
-                    timestamp = date.replace(hour=hour, minute=random.randint(0, 59))
-                    party_size = random.choices(
-                        [1, 2, 3, 4, 5, 6, 8], weights=[10, 40, 20, 15, 10, 4, 1]
-                    )[0]
-                    num_items = random.randint(party_size, party_size + 2)
-
-                    selected_items = np.random.choice(
-                        self.menu_items, size=num_items, p=self.item_weights
-                    )
-                    order_total = 0
-
-                    for item in selected_items:
-                        price = item["price"]
-                        order_total += price
-                        all_order_items.append(
-                            {
-                                "order_id": order_id,
-                                "item_id": item["item_id"],
-                                "item_name": item["name"],
-                                "category": item["category"],
-                                "quantity": 1,
-                                "price": round(price, 2),
-                            }
-                        )
-
-                    all_orders.append(
+                try:
+                    qty = float(row[qty_col])
+                    if qty <= 0:
+                        continue
+                    price = float(row[price_col]) if price_col else 10.0
+                    category = str(row[cat_col]) if cat_col else "Food"
+                    product_mix.append(
                         {
-                            "order_id": order_id,
-                            "order_timestamp": timestamp,
-                            "party_size": party_size,
-                            "order_total": round(order_total * 1.08, 2),
-                            "item_count": num_items,
+                            "name": name,
+                            "category": category,
+                            "price": price,
+                            "weight": qty,
                         }
                     )
-
-        return pd.DataFrame(all_orders), pd.DataFrame(all_order_items)
+                except:
+                    continue
+            logger.info(f"   ✓ Loaded {len(df)} items into product mix")
+    except Exception as e:
+        logger.warning(f"   ⚠️ Failed to process product mix: {e}")
+    return product_mix
 
 
 if __name__ == "__main__":
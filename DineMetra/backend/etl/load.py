@@ -1,8 +1,11 @@
 # backend/etl/load.py
 import logging
+import time
 import psycopg_pool
 import pandas as pd
+from psycopg import sql
 from config import DATABASE_URL
+from etl.rollups import refresh_sales_rollups
 
 # Configure logging
 logging.basicConfig(
@@ -14,19 +17,101 @@ logging.basicConfig(
 # Connection pool
 pool = psycopg_pool.ConnectionPool(DATABASE_URL)
 
-def insert_dataframe(df: pd.DataFrame, table_name: str, conn):
+# Rows per CSV chunk streamed into COPY
+COPY_CHUNK_ROWS = 50_000
+
+# Written for NaN/None and declared as COPY's NULL string, so empty strings
+# load as empty strings rather than NULL
+COPY_NULL = r"\N"
+
+
+def _integer_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Whole-number float columns (ints upcast by NaN) back to nullable Int64"""
+    ints = {
+        col: "Int64"
+        for col in df.select_dtypes("float").columns
+        if df[col].dropna().mod(1).eq(0).all()
+    }
+    return df.astype(ints) if ints else df
+
+
+def _csv_chunks(df: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS):
+    """Yield the DataFrame as CSV text (no header) for COPY ... NULL COPY_NULL"""
+    df = _integer_columns(df)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(
+            index=False,
+            header=False,
+            na_rep=COPY_NULL,
+            date_format="%Y-%m-%d %H:%M:%S.%f",
+        )
+
+
+def insert_dataframe(df: pd.DataFrame, table_name: str, conn) -> dict:
     """
-    Generic insert function for a DataFrame into a given table.
+    Bulk insert a DataFrame into a given table.
     Assumes DataFrame columns match table columns.
+
+    Rows are streamed with COPY FROM STDIN into a temporary staging table,
+    then merged with INSERT ... ON CONFLICT DO NOTHING, so re-running a load
+    skips rows that already exist.
+
+    Returns:
+        Rows received, rows inserted, seconds and rows/sec
     """
+    if df.empty:
+        logging.warning(f"No rows to load into {table_name}")
+        return {
+            "table": table_name,
+            "rows": 0,
+            "inserted": 0,
+            "seconds": 0.0,
+            "rows_per_sec": 0.0,
+        }
+
+    started = time.perf_counter()
+    table = sql.Identifier(table_name)
+    staging = sql.Identifier(f"_staging_{table_name}")
+    columns = sql.SQL(", ").join(sql.Identifier(col) for col in df.columns)
+
     with conn.cursor() as cur:
-        for _, row in df.iterrows():
-            cols = ','.join(df.columns)
-            placeholders = ','.join(['%s'] * len(row))
-            sql = f"INSERT INTO {table_name} ({cols}) VALUES ({placeholders}) ON CONFLICT DO NOTHING"
-            cur.execute(sql, tuple(row))
+        # Only the loaded columns: no serial defaults or constraints to trip over
+        cur.execute(
+            sql.SQL(
+                "CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                "SELECT {columns} FROM {table} WITH NO DATA"
+            ).format(staging=staging, columns=columns, table=table)
+        )
+        with cur.copy(
+            sql.SQL(
+                "COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL {null})"
+            ).format(staging=staging, columns=columns, null=sql.Literal(COPY_NULL))
+        ) as copy:
+            for chunk in _csv_chunks(df):
+                copy.write(chunk)
+
+        cur.execute(
+            sql.SQL(
+                "INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                "ON CONFLICT DO NOTHING"
+            ).format(table=table, columns=columns, staging=staging)
+        )
+        inserted = cur.rowcount
     conn.commit()
-    logging.info(f"Inserted {len(df)} rows into {table_name}")
+
+    seconds = time.perf_counter() - started
+    stats = {
+        "table": table_name,
+        "rows": len(df),
+        "inserted": inserted,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(df) / seconds, 1) if seconds > 0 else 0.0,
+    }
+    logging.info(
+        f"Loaded {inserted:,}/{len(df):,} rows into {table_name} in {seconds:.2f}s "
+        f"({stats['rows_per_sec']:,.0f} rows/sec, {len(df) - inserted:,} already present)"
+    )
+    return stats
     
 def safe_insert(df, table, conn):
     if df.empty:
@@ -36,26 +121,53 @@ def safe_insert(df, table, conn):
     expected_cols = get_expected_columns(table)
     if set(df.columns) != set(expected_cols):
         raise ValueError(f"Schema mismatch for {table}")
-    insert_dataframe(df, table, conn)
+    return insert_dataframe(df, table, conn)
 
 def load_dataframes(menu_items, orders, order_items, wait_times, external_factors):
     """
     Load all cleaned DataFrames into PostgreSQL with FK handling.
+
+    Returns:
+        Per-table load stats (rows, inserted, seconds, rows_per_sec)
     """
+    stats = []
+    started = time.perf_counter()
     with pool.connection() as conn:
         # Insert menu_items first (FK target for order_items)
-        insert_dataframe(menu_items, "menu_items", conn)
+        stats.append(insert_dataframe(menu_items, "menu_items", conn))
 
         # Insert orders (FK target for order_items, wait_times)
-        insert_dataframe(orders, "orders", conn)
+        stats.append(insert_dataframe(orders, "orders", conn))
 
         # Insert order_items (links orders ↔ menu_items)
-        insert_dataframe(order_items, "order_items", conn)
+        stats.append(insert_dataframe(order_items, "order_items", conn))
 
         # Insert wait_times (FK to orders)
-        insert_dataframe(wait_times, "wait_times", conn)
+        stats.append(insert_dataframe(wait_times, "wait_times", conn))
 
         # Insert external_factors (independent table)
-        insert_dataframe(external_factors, "external_factors", conn)
+        stats.append(insert_dataframe(external_factors, "external_factors", conn))
+
+        # Rollups last: every table is committed even if this fails
+        try:
+            refresh_sales_rollups(orders, conn)
+        except Exception as e:
+            conn.rollback()
+            logging.error(
+                f"Sales rollup refresh failed ({e}); "
+                f"run scripts/backfill_sales_rollups.py to rebuild them"
+            )
 
-    logging.info("All DataFrames loaded successfully")
+    total_rows = sum(s["rows"] for s in stats)
+    seconds = time.perf_counter() - started
+    logging.info(f"{'table':<18} {'rows':>9} {'inserted':>9} {'seconds':>8} {'rows/sec':>10}")
+    for s in stats:
+        logging.info(
+            f"{s['table']:<18} {s['rows']:>9,} {s['inserted']:>9,} "
+            f"{s['seconds']:>8.2f} {s['rows_per_sec']:>10,.0f}"
+        )
+    logging.info(
+        f"All DataFrames loaded successfully: {total_rows:,} rows in {seconds:.2f}s "
+        f"({total_rows / seconds if seconds > 0 else 0:,.0f} rows/sec)"
+    )
+    return stats
@@ -0,0 +1,262 @@
+# backend/etl/processed_store.py
+"""
+Processed Data Store
+Typed, compressed Parquet for the data/processed layer
+
+Each processed dataset is written as a Parquet directory partitioned by
+month (hive layout, e.g. orders_from_real_data.parquet/month=2025-03/),
+so readers can load only the columns and months they need and get
+timestamps back as datetime64 without re-parsing text.
+
+- CSV export: set PROCESSED_CSV_EXPORT=true (or pass csv=True) to also
+  write the <name>.csv file other tools expect
+- Fallback: without pyarrow, datasets are written and read as CSV
+- Readers use the Parquet copy unless the CSV is newer (e.g. a script
+  rewrote it), so a stale Parquet copy is never preferred
+"""
+
+import logging
+import os
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_DIR = Path("data/processed")
+PARQUET_COMPRESSION = "zstd"
+PARTITION_COLUMN = "month"
+
+# name -> (file stem, timestamp column used for month partitions)
+DATASETS = {
+    "orders": ("orders_from_real_data", "order_timestamp"),
+    "order_items": ("order_items_from_real_data", None),
+    "wait_times": ("wait_times_from_real_data", "log_timestamp"),
+    "orders_with_events": ("orders_with_events", "order_timestamp"),
+}
+
+DateLike = Union[str, date, datetime, pd.Timestamp, None]
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+def csv_export_enabled() -> bool:
+    return os.getenv("PROCESSED_CSV_EXPORT", "false").lower() in ("1", "true", "yes")
+
+
+def csv_path(name: str, processed_dir: Union[str, Path] = PROCESSED_DIR) -> Path:
+    return Path(processed_dir) / f"{DATASETS[name][0]}.csv"
+
+
+def parquet_path(name: str, processed_dir: Union[str, Path] = PROCESSED_DIR) -> Path:
+    return Path(processed_dir) / f"{DATASETS[name][0]}.parquet"
+
+
+def source_path(
+    name: str, processed_dir: Union[str, Path] = PROCESSED_DIR
+) -> Optional[Path]:
+    """
+    The file or Parquet directory a reader should load, None if neither exists
+
+    Parquet wins unless pyarrow is missing or the CSV was written later.
+    """
+    parquet, csv = parquet_path(name, processed_dir), csv_path(name, processed_dir)
+    if parquet.exists() and parquet_available():
+        if not csv.exists() or csv.stat().st_mtime <= parquet.stat().st_mtime:
+            return parquet
+    return csv if csv.exists() else None
+
+
+def exists(name: str, processed_dir: Union[str, Path] = PROCESSED_DIR) -> bool:
+    return source_path(name, processed_dir) is not None
+
+
+def write_processed(
+    df: pd.DataFrame,
+    name: str,
+    processed_dir: Union[str, Path] = PROCESSED_DIR,
+    csv: Optional[bool] = None,
+) -> Dict:
+    """
+    Write a processed dataset
+
+    Args:
+        df: Data to write (replaces the existing dataset)
+        name: Dataset name (key of DATASETS)
+        processed_dir: Output directory
+        csv: Also export CSV (default: PROCESSED_CSV_EXPORT)
+
+    Returns:
+        dict: Rows and paths written
+    """
+    processed_dir = Path(processed_dir)
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    if csv is None:
+        csv = csv_export_enabled()
+
+    written = {"dataset": name, "rows": len(df), "paths": []}
+    parquet = parquet_available()
+    if not parquet:
+        logger.warning(f"pyarrow not installed - writing {name} as CSV only")
+        csv = True
+
+    # CSV first, so the Parquet copy is the newer one readers pick
+    if csv:
+        path = csv_path(name, processed_dir)
+        df.to_csv(path, index=False)
+        written["paths"].append(str(path))
+
+    if parquet:
+        path = _write_parquet(df, name, processed_dir)
+        written["paths"].insert(0, str(path))
+
+    logger.info(f"✓ Saved {len(df):,} rows of {name} to {', '.join(written['paths'])}")
+    return written
+
+
+def _write_parquet(df: pd.DataFrame, name: str, processed_dir: Path) -> Path:
+    """Write to a temporary directory, then swap it in"""
+    time_col = _time_column(name, df.columns)
+    target = parquet_path(name, processed_dir)
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    if time_col:
+        df = df.copy()
+        df[time_col] = pd.to_datetime(df[time_col])
+        df[PARTITION_COLUMN] = df[time_col].dt.strftime("%Y-%m")
+        df.to_parquet(
+            staging,
+            partition_cols=[PARTITION_COLUMN],
+            compression=PARQUET_COMPRESSION,
+            index=False,
+        )
+    else:
+        staging.mkdir(parents=True)
+        df.to_parquet(
+            staging / "part-0.parquet", compression=PARQUET_COMPRESSION, index=False
+        )
+
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+    os.utime(target)
+    return target
+
+
+def read_processed(
+    name: str,
+    columns: Optional[List[str]] = None,
+    start: DateLike = None,
+    end: DateLike = None,
+    processed_dir: Union[str, Path] = PROCESSED_DIR,
+    dtype: Optional[Dict] = None,
+) -> pd.DataFrame:
+    """
+    Read a processed dataset
+
+    Args:
+        name: Dataset name (key of DATASETS)
+        columns: Columns to load (default: all); missing ones are skipped
+        start: First day to include (by the dataset's timestamp column)
+        end: Last day to include
+        processed_dir: Directory holding the dataset
+        dtype: Column dtypes to coerce to
+
+    Returns:
+        DataFrame with the timestamp column as datetime64
+    """
+    path = source_path(name, processed_dir)
+    if path is None:
+        raise FileNotFoundError(f"No processed {name} data in {processed_dir}")
+
+    if path.suffix == ".parquet":
+        df = _read_parquet(name, path, columns, start, end)
+    else:
+        df = _read_csv(name, path, columns, dtype)
+
+    time_col = _time_column(name, df.columns)
+    if time_col and (start is not None or end is not None):
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df[time_col] >= pd.Timestamp(start).normalize()
+        if end is not None:
+            mask &= df[time_col] < pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        df = df[mask].reset_index(drop=True)
+
+    if dtype:
+        df = df.astype({k: v for k, v in dtype.items() if k in df.columns})
+    return df
+
+
+def _read_parquet(name, path: Path, columns, start, end) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+
+    available = list_columns(name, path.parent)
+    time_col = _time_column(name, available)
+    if columns is not None:
+        wanted = [c for c in available if c in columns or c == time_col]
+    else:
+        wanted = available
+
+    # Prune whole month partitions before reading any row data
+    filters = []
+    if time_col and start is not None:
+        filters.append((PARTITION_COLUMN, ">=", pd.Timestamp(start).strftime("%Y-%m")))
+    if time_col and end is not None:
+        filters.append((PARTITION_COLUMN, "<=", pd.Timestamp(end).strftime("%Y-%m")))
+
+    table = pq.read_table(path, columns=wanted, filters=filters or None)
+    df = table.to_pandas()
+    if PARTITION_COLUMN in df.columns and (
+        columns is None or PARTITION_COLUMN not in columns
+    ):
+        df = df.drop(columns=PARTITION_COLUMN)
+    if time_col in df.columns:
+        df = df.sort_values(time_col, kind="stable").reset_index(drop=True)
+    return df
+
+
+def _read_csv(name, path: Path, columns, dtype) -> pd.DataFrame:
+    header = pd.read_csv(path, nrows=0).columns
+    time_col = _time_column(name, header)
+    wanted = set(header if columns is None else columns)
+    if time_col:
+        wanted.add(time_col)
+    return pd.read_csv(
+        path,
+        usecols=lambda column: column in wanted,
+        dtype={k: v for k, v in (dtype or {}).items() if k in header},
+        parse_dates=[time_col] if time_col else False,
+    )
+
+
+def list_columns(
+    name: str, processed_dir: Union[str, Path] = PROCESSED_DIR
+) -> List[str]:
+    """Column names of a dataset without reading its rows"""
+    path = source_path(name, processed_dir)
+    if path is None:
+        return []
+    if path.suffix == ".parquet":
+        import pyarrow.dataset as ds
+
+        schema = ds.dataset(path, format="parquet", partitioning="hive").schema
+        return [c for c in schema.names if c != PARTITION_COLUMN]
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _time_column(name: str, columns) -> Optional[str]:
+    time_col = DATASETS[name][1]
+    if time_col == "log_timestamp" and time_col not in columns:
+        time_col = "timestamp_quoted"
+    return time_col if time_col in columns else None
@@ -0,0 +1,114 @@
+# backend/etl/rollups.py
+"""
+Sales rollups for ETL loads
+
+Recomputes the dashboard's daily_sales_rollup and hourly_sales_rollup rows
+for the days an ETL load touched (same totals as
+app.services.sales_rollup_service.rebuild), on the loader's own psycopg
+connection.
+
+Databases created before the rollup tables existed get them here: they are
+created and backfilled from the whole orders table, not just the loaded
+days, so the app's startup backfill (which only runs on empty rollups)
+never sees a partial table.
+"""
+
+import logging
+
+import pandas as pd
+
+ROLLUP_TABLES = ("hourly_sales_rollup", "daily_sales_rollup")
+
+# Mirrors app.models.database_models.HourlySalesRollup / DailySalesRollup
+CREATE_ROLLUP_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS hourly_sales_rollup (
+        sales_date DATE NOT NULL,
+        hour INTEGER NOT NULL,
+        total_sales DOUBLE PRECISION NOT NULL DEFAULT 0,
+        order_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP,
+        PRIMARY KEY (sales_date, hour)
+    );
+    CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+        sales_date DATE PRIMARY KEY,
+        total_sales DOUBLE PRECISION NOT NULL DEFAULT 0,
+        order_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP
+    )
+"""
+
+ROLLUP_TABLES_EXIST_SQL = """
+    SELECT to_regclass('hourly_sales_rollup') IS NOT NULL
+       AND to_regclass('daily_sales_rollup') IS NOT NULL
+"""
+
+ORDER_RANGE_SQL = "SELECT min(order_timestamp), max(order_timestamp) FROM orders"
+
+REFRESH_HOURLY_ROLLUP_SQL = """
+    INSERT INTO hourly_sales_rollup (sales_date, hour, total_sales, order_count, updated_at)
+    SELECT date(order_timestamp), extract(hour FROM order_timestamp)::int,
+           sum(order_total), count(*), now()
+    FROM orders
+    WHERE order_timestamp >= %(start)s AND order_timestamp < %(end)s
+    GROUP BY 1, 2
+    ON CONFLICT (sales_date, hour) DO UPDATE
+    SET total_sales = EXCLUDED.total_sales,
+        order_count = EXCLUDED.order_count,
+        updated_at = EXCLUDED.updated_at
+"""
+
+REFRESH_DAILY_ROLLUP_SQL = """
+    INSERT INTO daily_sales_rollup (sales_date, total_sales, order_count, updated_at)
+    SELECT sales_date, sum(total_sales), sum(order_count), now()
+    FROM hourly_sales_rollup
+    WHERE sales_date >= %(start)s::date AND sales_date < %(end)s::date
+    GROUP BY sales_date
+    ON CONFLICT (sales_date) DO UPDATE
+    SET total_sales = EXCLUDED.total_sales,
+        order_count = EXCLUDED.order_count,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def _day_range(first, last) -> dict:
+    """[first day, day after last) as query parameters"""
+    return {
+        "start": pd.Timestamp(first).normalize().to_pydatetime(),
+        "end": (pd.Timestamp(last).normalize() + pd.Timedelta(days=1)).to_pydatetime(),
+    }
+
+
+def refresh_sales_rollups(orders: pd.DataFrame, conn) -> dict:
+    """
+    Refresh daily/hourly sales rollups for the days covered by orders
+
+    Args:
+        orders: Orders just loaded (only order_timestamp is used)
+        conn: psycopg connection; committed on success
+
+    Returns:
+        The refreshed range and whether the tables had to be created
+    """
+    if orders.empty or "order_timestamp" not in orders.columns:
+        return {"refreshed": False}
+
+    timestamps = pd.to_datetime(orders["order_timestamp"])
+    params = _day_range(timestamps.min(), timestamps.max())
+    created = False
+    with conn.cursor() as cur:
+        cur.execute(ROLLUP_TABLES_EXIST_SQL)
+        if not cur.fetchone()[0]:
+            logging.warning(
+                "Sales rollup tables missing - creating and backfilling them from orders"
+            )
+            cur.execute(CREATE_ROLLUP_TABLES_SQL)
+            cur.execute(ORDER_RANGE_SQL)
+            params = _day_range(*cur.fetchone())
+            created = True
+        cur.execute(REFRESH_HOURLY_ROLLUP_SQL, params)
+        cur.execute(REFRESH_DAILY_ROLLUP_SQL, params)
+    conn.commit()
+    logging.info(
+        f"Refreshed sales rollups from {params['start']:%Y-%m-%d} to {params['end']:%Y-%m-%d}"
+    )
+    return {"refreshed": True, "created": created, **params}
@@ -174,28 +174,29 @@ def main():
     try:
         # Import extraction
         from etl.extract_real_data import RealDataExtractor
+        from etl import processed_store
 
         # 1. Run Extraction (Ensures CSVs exist)
         logger.info("📥 Running Extraction Phase...")
         extractor = RealDataExtractor(data_dir="data/real")
         extractor.run()
 
-        # 2. Load CSVs from Disk
-        logger.info("📥 Loading extracted CSVs for transformation...")
+        # 2. Load extracted data from disk
+        logger.info("📥 Loading extracted data for transformation...")
         processed_dir = Path("data/processed")
 
         raw_data = {}
 
-        if (processed_dir / "orders_from_real_data.csv").exists():
-            raw_data["orders"] = pd.read_csv(
-                processed_dir / "orders_from_real_data.csv"
+        if processed_store.exists("orders", processed_dir):
+            raw_data["orders"] = processed_store.read_processed(
+                "orders", processed_dir=processed_dir
             )
             # Use orders as wait times base if real wait times don't exist
             raw_data["wait_times"] = raw_data["orders"].copy()
 
-        if (processed_dir / "order_items_from_real_data.csv").exists():
-            raw_data["order_items"] = pd.read_csv(
-                processed_dir / "order_items_from_real_data.csv"
+        if processed_store.exists("order_items", processed_dir):
+            raw_data["order_items"] = processed_store.read_processed(
+                "order_items", processed_dir=processed_dir
             )
 
         if (Path("data/menu_items_reference.csv")).exists():
@@ -208,12 +209,12 @@ def main():
         # 4. Save Final Cleaned Files (Ready for Training)
         # We overwrite the processed files with the CLEAN versions
         if "orders" in cleaned_data:
-            cleaned_data["orders"].to_csv(
-                processed_dir / "orders_from_real_data.csv", index=False
+            processed_store.write_processed(
+                cleaned_data["orders"], "orders", processed_dir
             )
         if "wait_times" in cleaned_data:
-            cleaned_data["wait_times"].to_csv(
-                processed_dir / "wait_times_from_real_data.csv", index=False
+            processed_store.write_processed(
+                cleaned_data["wait_times"], "wait_times", processed_dir
             )
 
         logger.info("📦 Data ready for Model Training")
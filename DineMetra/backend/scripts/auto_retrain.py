@@ -20,6 +20,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import json
 import logging
+import os
 import shutil
 import pickle
 
@@ -446,12 +447,12 @@ class AutoRetrainer:
         temp_dir = Path("models/temp")
 
         for model_file in temp_dir.glob("*.pkl"):
-            shutil.copy2(model_file, self.models_dir / model_file.name)
+            self._atomic_copy(model_file, self.models_dir / model_file.name)
 
         # Copy training report
         report_file = temp_dir / "training_report.json"
         if report_file.exists():
-            shutil.copy2(report_file, self.models_dir / "training_report.json")
+            self._atomic_copy(report_file, self.models_dir / "training_report.json")
 
         # Clean up temp directory
         shutil.rmtree(temp_dir)
@@ -459,14 +460,24 @@ class AutoRetrainer:
     def _rollback_to_backup(self, backup_path: Path):
         """Rollback to backed up models"""
         for model_file in backup_path.glob("*.pkl"):
-            shutil.copy2(model_file, self.models_dir / model_file.name)
+            self._atomic_copy(model_file, self.models_dir / model_file.name)
 
         report_file = backup_path / "training_report.json"
         if report_file.exists():
-            shutil.copy2(report_file, self.models_dir / "training_report.json")
+            self._atomic_copy(report_file, self.models_dir / "training_report.json")
 
         logger.info("   ✓ Rolled back to previous models")
 
+    @staticmethod
+    def _atomic_copy(src: Path, dest: Path):
+        """
+        Copy then rename into place so the API's model registry
+        never picks up a partially written file
+        """
+        tmp_path = dest.with_name(f".{dest.name}.tmp")
+        shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dest)
+
     def _log_retrain_event(self, result: dict):
         """Log retrain event to history"""
         with open(self.retrain_log_path, "a") as f:
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Sales Rollup Backfill
+Rebuilds daily_sales_rollup and hourly_sales_rollup from the orders table
+
+Run once after deploying the rollup tables, or for a date range after
+loading or deleting orders outside the upload API / ETL.
+
+Usage: python scripts/backfill_sales_rollups.py [--start 2025-01-01] [--end 2025-06-30]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from app.database.database import SessionLocal
+from app.models.database_models import DailySalesRollup, HourlySalesRollup
+from app.services.sales_rollup_service import get_sales_rollup_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild sales rollup tables")
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    if SessionLocal is None:
+        logger.error("❌ DATABASE_URL not set")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        bind = db.get_bind()
+        for model in (DailySalesRollup, HourlySalesRollup):
+            model.__table__.create(bind=bind, checkfirst=True)
+
+        started = time.perf_counter()
+        result = get_sales_rollup_service().rebuild(db, args.start, args.end)
+        db.commit()
+        logger.info(
+            f"✅ Backfilled {result['days']:,} days / {result['hours']:,} hours "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Backfill failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
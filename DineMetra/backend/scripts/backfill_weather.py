@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 """
 Weather Backfill - Uses Open-Meteo for historical data
-Properly updates the weather_condition column in orders_from_real_data.csv
+Properly updates the weather_condition column in the processed orders data
 """
 
 import pandas as pd
 import requests
+import sys
 from datetime import datetime
+from pathlib import Path
 import logging
 
+sys.path.append(str(Path(__file__).parent.parent))
+from etl import processed_store
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -18,7 +23,7 @@ def backfill_weather():
 
     # Load the data
     logger.info("📊 Loading orders data...")
-    df = pd.read_csv("data/processed/orders_from_real_data.csv")
+    df = processed_store.read_processed("orders")
 
     logger.info(f"Found {len(df)} orders")
     logger.info(f"Columns: {list(df.columns)}")
@@ -136,9 +141,9 @@ def backfill_weather():
     logger.info("\n🔄 Applying weather to orders...")
     df["weather_condition"] = df["order_timestamp"].apply(get_weather_for_date)
 
-    # Save back to CSV
+    # Save back to the processed store
     logger.info("💾 Saving updated data...")
-    df.to_csv("data/processed/orders_from_real_data.csv", index=False)
+    processed_store.write_processed(df, "orders")
 
     # Show results
     logger.info("\n✅ Weather backfill complete!")
@@ -0,0 +1,102 @@
+"""
+Benchmark pooled vs NullPool database sessions on the dashboard query path
+
+Each "request" opens a session, runs the dashboard's latest-order lookup and
+closes the session, exactly like DashboardService.get_sales_chart_data. With
+NullPool every request pays TCP + TLS + auth to Postgres; the pooled engine
+pays it once per pooled connection.
+
+Usage: python scripts/benchmark_db_pool.py [--requests 50] [--threads 8]
+       [--url postgresql://...] [--query select1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import func, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).parent.parent))
+from app.database.database import create_db_engine, pool_metrics
+from app.models.database_models import Order
+
+
+def run_request(Session, query: str) -> float:
+    """One dashboard-style request; returns wall time in ms"""
+    start = time.perf_counter()
+    db = Session()
+    try:
+        if query == "select1":
+            db.execute(text("SELECT 1")).scalar()
+        else:
+            db.query(func.max(Order.order_timestamp)).scalar()
+    finally:
+        db.close()
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark(url: str, pooled: bool, requests: int, threads: int, query: str):
+    engine = create_db_engine(url, pooled=pooled)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        run_request(Session, query)  # warm up (first pooled connect)
+
+        sequential = [run_request(Session, query) for _ in range(requests)]
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            concurrent = list(
+                pool.map(lambda _: run_request(Session, query), range(requests))
+            )
+        return np.array(sequential), np.array(concurrent)
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database pool latency benchmark")
+    parser.add_argument("--url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument(
+        "--query", choices=["dashboard", "select1"], default="dashboard"
+    )
+    args = parser.parse_args()
+
+    if not args.url:
+        print("❌ Set DATABASE_URL or pass --url")
+        sys.exit(1)
+
+    print("🔌 DATABASE POOL BENCHMARK (ms per request: session + query + close)")
+    print("=" * 70)
+    print(
+        f"{'engine':<10} {'mode':<12} {'p50':>8} {'p95':>8} {'max':>8} {'total s':>9}"
+    )
+
+    results = {}
+    for label, pooled in [("NullPool", False), ("pooled", True)]:
+        sequential, concurrent = benchmark(
+            args.url, pooled, args.requests, args.threads, args.query
+        )
+        results[label] = sequential
+        for mode, samples in [
+            ("sequential", sequential),
+            (f"{args.threads} threads", concurrent),
+        ]:
+            print(
+                f"{label:<10} {mode:<12} {np.percentile(samples, 50):>8.2f} "
+                f"{np.percentile(samples, 95):>8.2f} {samples.max():>8.2f} "
+                f"{samples.sum() / 1000:>9.2f}"
+            )
+
+    saved = np.median(results["NullPool"]) - np.median(results["pooled"])
+    print(f"\nConnection setup removed per request (p50): {saved:.2f} ms")
+    print(f"Pool metrics: {pool_metrics.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
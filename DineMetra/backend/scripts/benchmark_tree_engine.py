@@ -0,0 +1,74 @@
+"""
+Benchmark the compiled tree engine against sklearn predict()
+
+Usage: python scripts/benchmark_tree_engine.py [--repeat 200]
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+from app.services.tree_engine import LARGE_BATCH_ROWS, compile_model
+
+MODELS = {
+    "wait_time": "models/wait_time_model.pkl",
+    "busyness": "models/busyness_model.pkl",
+    "item_sales": "data/models/item_sales_model.pkl",
+}
+BATCH_SIZES = [1, 32, 128, 512, 2000]
+
+
+def time_call(fn, repeat):
+    """Median wall time of fn() in milliseconds"""
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tree engine latency benchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print("⚡ TREE ENGINE BENCHMARK (median ms per predict call)")
+    print("=" * 60)
+    print(f"(serving hands batches of {LARGE_BATCH_ROWS}+ rows back to sklearn)\n")
+    print(f"{'model':<12} {'rows':>6} {'sklearn':>10} {'engine':>10} {'speedup':>8}")
+
+    rng = np.random.default_rng(0)
+    for name, path in MODELS.items():
+        if not Path(path).exists():
+            print(f"{name:<12} (no model at {path})")
+            continue
+
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        model = data["model"] if isinstance(data, dict) else data
+        # Pure vectorized walk, without the large-batch sklearn hand-off
+        engine = compile_model(model, keep_model=False)
+
+        for rows in BATCH_SIZES:
+            X = pd.DataFrame(
+                rng.integers(0, 100, size=(rows, model.n_features_in_)).astype(float),
+                columns=model.feature_names_in_,
+            )
+            sk_ms = time_call(lambda: model.predict(X), args.repeat)
+            engine_ms = time_call(lambda: engine.predict(X), args.repeat)
+            print(
+                f"{name:<12} {rows:>6} {sk_ms:>10.3f} {engine_ms:>10.3f} "
+                f"{sk_ms / engine_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,13 @@ Adds event features to training data for better predictions
 
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 
+sys.path.append(str(Path(__file__).parent.parent))
+from etl import processed_store
+
 def load_historical_events():
     """Load the backfilled events"""
     events_file = Path("data/events/historical_events_2025_jan_jun.json")
@@ -57,7 +61,7 @@ def main():
     
     # Load data
     print("Loading sales data...")
-    orders_df = pd.read_csv("data/processed/orders_from_real_data.csv")
+    orders_df = processed_store.read_processed("orders")
     print(f"  ✓ {len(orders_df):,} orders loaded")
     
     print("\nLoading historical events...")
@@ -79,10 +83,9 @@ def main():
     print(f"  Average Event Attendance: {orders_with_events['max_event_attendance'].mean():,.0f}")
     
     # Save enhanced dataset
-    output_file = "data/processed/orders_with_events.csv"
-    enhanced_orders.to_csv(output_file, index=False)
+    written = processed_store.write_processed(enhanced_orders, "orders_with_events")
     
-    print(f"\n💾 Saved enhanced dataset: {output_file}")
+    print(f"\n💾 Saved enhanced dataset: {', '.join(written['paths'])}")
     print("\n✅ Complete! Your training data now includes event context.")
     print("\nNext: Retrain models with event features:")
     print("  python scripts/train_models_from_db.py")
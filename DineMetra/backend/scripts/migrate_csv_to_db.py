@@ -6,6 +6,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from app.database.database import SessionLocal, init_db
 from app.models.database_models import MenuItem, Order, OrderItem, WaitTime
+from app.services.sales_rollup_service import get_sales_rollup_service
+from etl import processed_store
 
 def main():
     print("�� MIGRATING TO NEON DATABASE")
@@ -13,10 +15,9 @@ def main():
     
     init_db()
     
-    base = Path("data/processed")
-    items_df = pd.read_csv(base / "order_items_from_real_data.csv")
-    orders_df = pd.read_csv(base / "orders_from_real_data.csv")
-    wait_df = pd.read_csv(base / "wait_times_from_real_data.csv")
+    items_df = processed_store.read_processed("order_items")
+    orders_df = processed_store.read_processed("orders")
+    wait_df = processed_store.read_processed("wait_times")
     
     print(f"✓ {len(items_df):,} items")
     print(f"✓ {len(orders_df):,} orders")
@@ -55,6 +56,12 @@ def main():
         order_map = {o.order_number: o.id for o in db.query(Order).all()}
         print(f"✓ {len(order_map)} orders\n")
         
+        # Daily / hourly sales rollups read by the dashboard
+        print("Building sales rollups...")
+        rollups = get_sales_rollup_service().rebuild(db)
+        db.commit()
+        print(f"✓ {rollups['days']:,} days, {rollups['hours']:,} hours\n")
+        
         # Order items
         print("Loading order items (batched)...")
         order_items = []
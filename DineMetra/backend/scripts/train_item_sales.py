@@ -9,27 +9,29 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import pickle
+import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+from etl import processed_store
+
 print("=" * 80)
 print("TRAINING ITEM SALES MODEL ON ALL DATA")
 print("=" * 80)
 print()
 
 # Load all your order items
-data_path = Path('data/processed/order_items_from_real_data.csv')
-orders_path = Path('data/processed/orders_from_real_data.csv')
-
-if not data_path.exists():
-    print(f"❌ File not found: {data_path}")
+if not processed_store.exists('order_items'):
+    print(f"❌ No processed order items in {processed_store.PROCESSED_DIR}")
     exit(1)
 
-# Load data
+# Load data (timestamps come back as datetime64)
 print("📂 Loading data...")
-items_df = pd.read_csv(data_path)
-orders_df = pd.read_csv(orders_path)
-orders_df['order_timestamp'] = pd.to_datetime(orders_df['order_timestamp'])
+items_df = processed_store.read_processed('order_items')
+orders_df = processed_store.read_processed(
+    'orders', columns=['order_id', 'order_timestamp']
+)
 
 print(f"✅ Loaded {len(items_df):,} item sales")
 print(f"✅ Loaded {len(orders_df):,} orders")
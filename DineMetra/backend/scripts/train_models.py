@@ -120,11 +120,13 @@ class ModelTrainer:
         logger.info("-" * 60)
 
         # --- FIXED: Load wait times and merge weather from orders ---
+        from etl import processed_store
+
         df = None
         
         # Try wait_times file first
         try:
-            df = pd.read_csv("data/processed/wait_times_from_real_data.csv")
+            df = processed_store.read_processed("wait_times")
             if "weather_condition" in df.columns and df["weather_condition"].nunique() > 1:
                 logger.info("✓ Loaded enriched wait time data with weather history")
             else:
@@ -139,7 +141,7 @@ class ModelTrainer:
             
             # Try to merge weather from orders_from_real_data.csv
             try:
-                orders_with_weather = pd.read_csv("data/processed/orders_from_real_data.csv")
+                orders_with_weather = processed_store.read_processed("orders")
                 if "weather_condition" in orders_with_weather.columns:
                     # Prepare both dataframes for merge
                     time_col = "log_timestamp" if "log_timestamp" in df.columns else "timestamp_quoted"
@@ -16,6 +16,7 @@ import pickle
 sys.path.append(str(Path(__file__).parent.parent))
 from app.database.database import SessionLocal
 from app.models.database_models import MenuItem, Order, OrderItem, WaitTime
+from app.services import model_artifacts
 
 from sklearn.ensemble import (
     RandomForestRegressor,
@@ -132,6 +133,15 @@ try:
             )
         print("  ✓ Saved to data/models/item_sales_model.pkl")
 
+        # Shared-memory copy for multi-worker serving
+        model_artifacts.export_model(
+            model,
+            "data/models/item_sales_model.pkl",
+            features=features,
+            encoders={"le_item": le_item.classes_, "le_cat": le_cat.classes_},
+        )
+        print("  ✓ Exported data/models/item_sales_model.mmap")
+
     # =====================================================
     # 2. WAIT TIME MODEL (Boosting)
     # =====================================================
@@ -193,6 +203,11 @@ try:
             pickle.dump({"model": model, "features": list(X.columns)}, f)
         print("  ✓ Saved to models/wait_time_model.pkl")
 
+        model_artifacts.export_model(
+            model, "models/wait_time_model.pkl", features=list(X.columns)
+        )
+        print("  ✓ Exported models/wait_time_model.mmap")
+
     # =====================================================
     # 3. BUSYNESS MODEL
     # =====================================================
@@ -241,6 +256,11 @@ try:
             pickle.dump({"model": model, "features": list(X.columns)}, f)
         print("  ✓ Saved to models/busyness_model.pkl")
 
+        model_artifacts.export_model(
+            model, "models/busyness_model.pkl", features=list(X.columns)
+        )
+        print("  ✓ Exported models/busyness_model.mmap")
+
     print("\n" + "=" * 60)
     print("✅ FIXED TRAINING COMPLETE")
     print("=" * 60)
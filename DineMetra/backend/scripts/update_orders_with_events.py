@@ -2,7 +2,6 @@
 Update database orders with event features
 """
 
-import pandas as pd
 import sys
 from pathlib import Path
 
@@ -11,6 +10,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from app.database.database import SessionLocal
 from app.models.database_models import Order
+from etl import processed_store
 from sqlalchemy import text
 
 def main():
@@ -19,7 +19,7 @@ def main():
     
     # Load enhanced data
     print("Loading enhanced orders...")
-    orders_df = pd.read_csv("data/processed/orders_with_events.csv")
+    orders_df = processed_store.read_processed("orders_with_events")
     print(f"  ✓ {len(orders_df):,} orders loaded")
     
     db = SessionLocal()
@@ -0,0 +1,160 @@
+"""
+Test dashboard section assembly and snapshots
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from app.services import dashboard_service
+from app.services.dashboard_service import DashboardService
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+
+
+def test_sections_run_concurrently_with_fallbacks(monkeypatch):
+    print("Testing dashboard section assembly...")
+
+    service = DashboardService()
+
+    def slow_highlights(context=None):
+        time.sleep(1.0)  # e.g. Ticketmaster hanging
+        return [{"id": "late"}]
+
+    def slow_metrics():
+        time.sleep(0.2)
+        return {"categories": ["ok"], "summaries": [], "purchasing": []}
+
+    def failing_chart(period="this-week"):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(service, "get_highlights", slow_highlights)
+    monkeypatch.setattr(service, "get_metrics", slow_metrics)
+    monkeypatch.setattr(
+        service, "get_info_sections", lambda context=None: {"events": ["ok"]}
+    )
+    monkeypatch.setattr(service, "get_sales_chart_data", failing_chart)
+
+    started = time.perf_counter()
+    dashboard = asyncio.run(service.get_full_dashboard(timeout=0.5))
+    elapsed = time.perf_counter() - started
+
+    # Slow highlights only cost their timeout, not the sum of every section
+    assert elapsed < 0.9
+    assert dashboard["highlights"] == []
+    assert dashboard["metrics"]["categories"] == ["ok"]
+    assert dashboard["info_sections"] == {"events": ["ok"]}
+    assert dashboard["sales_chart"]["total_sales"] == 0
+    assert sorted(dashboard["degraded_sections"]) == ["highlights", "sales_chart"]
+
+    timings = dashboard["section_timings_ms"]
+    assert set(timings) == {
+        "highlights",
+        "metrics",
+        "info_sections",
+        "sales_chart",
+        "total",
+    }
+    assert timings["metrics"] >= 200
+    print(f"✓ Built in {elapsed * 1000:.0f}ms, timings: {timings}")
+
+
+def test_timed_out_sections_are_capped(monkeypatch):
+    print("\nTesting the cap on timed-out dashboard sections...")
+
+    monkeypatch.setattr(dashboard_service, "MAX_TIMED_OUT_SECTIONS", 1)
+    monkeypatch.setattr(dashboard_service, "_timed_out", set())
+    service = DashboardService()
+    release = threading.Event()
+
+    def hung_highlights(context=None):
+        release.wait(5)  # e.g. a socket that never answers
+        return [{"id": "late"}]
+
+    monkeypatch.setattr(service, "get_highlights", hung_highlights)
+    monkeypatch.setattr(service, "get_metrics", lambda: {"categories": ["ok"]})
+    monkeypatch.setattr(
+        service, "get_info_sections", lambda context=None: {"events": ["ok"]}
+    )
+    monkeypatch.setattr(
+        service, "get_sales_chart_data", lambda period="this-week": {"ok": True}
+    )
+
+    # The hung section times out but keeps its worker
+    first = asyncio.run(service.get_full_dashboard(timeout=0.2))
+    assert first["degraded_sections"] == ["highlights"]
+    assert len(dashboard_service._timed_out) == 1
+
+    # At the cap, blocking sections are not started at all
+    second = asyncio.run(service.get_full_dashboard(timeout=0.2))
+    assert sorted(second["degraded_sections"]) == [
+        "highlights",
+        "info_sections",
+        "metrics",
+        "sales_chart",
+    ]
+    assert second["metrics"]["categories"] == []
+
+    # Once the hung call returns its worker is counted free again
+    release.set()
+    for _ in range(50):
+        if not dashboard_service._timed_out:
+            break
+        time.sleep(0.01)
+    third = asyncio.run(service.get_full_dashboard(timeout=0.2))
+    assert third["degraded_sections"] == []
+    print(f"✓ Skipped while saturated: {second['degraded_sections']}")
+
+
+class FakeDashboardService:
+    def __init__(self):
+        self.builds = 0
+        self.highlights = [{"id": "steady_week"}]
+
+    async def get_full_dashboard(self):
+        self.builds += 1
+        await asyncio.sleep(0.01)
+        return {
+            "highlights": list(self.highlights),
+            "section_timings_ms": {"total": float(self.builds)},
+        }
+
+
+def test_snapshot_versions_follow_content():
+    print("\nTesting dashboard snapshot...")
+
+    dashboard = FakeDashboardService()
+    snapshots = DashboardSnapshotService(dashboard, max_age_seconds=60)
+
+    async def scenario():
+        # Concurrent cold-start readers share one build
+        first = await asyncio.gather(*(snapshots.get_snapshot() for _ in range(5)))
+        assert dashboard.builds == 1
+        assert len({s["etag"] for s in first}) == 1
+
+        # Reads inside max age never rebuild
+        await snapshots.get_snapshot()
+        assert dashboard.builds == 1
+
+        # Rebuild with identical content keeps the version and ETag
+        same = await snapshots.refresh()
+        assert same["version"] == 1 and same["etag"] == first[0]["etag"]
+
+        # Changed content moves both
+        dashboard.highlights.append({"id": "event_0"})
+        changed = await snapshots.refresh("upload")
+        assert changed["version"] == 2 and changed["etag"] != first[0]["etag"]
+        return changed
+
+    snapshot = asyncio.run(scenario())
+    body = json.loads(snapshot["body"])
+    assert body["snapshot_version"] == 2
+    assert len(body["highlights"]) == 2
+    assert body["user"]["name"] == "Manager"
+    print(f"✓ Snapshot v{snapshot['version']} ({len(snapshot['body'])} bytes)")
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main([__file__, "-s"])
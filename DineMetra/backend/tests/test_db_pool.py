@@ -0,0 +1,74 @@
+"""
+Test the pooled database engine and its checkout metrics
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.database.database import (
+    InstrumentedQueuePool,
+    create_db_engine,
+    pool_metrics,
+    to_async_url,
+)
+
+
+def test_pooled_engine_reuses_connections(tmp_path):
+    print("Testing pooled engine...")
+
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    Session = sessionmaker(bind=engine)
+
+    before = pool_metrics.get_stats()
+
+    def request(_):
+        db = Session()
+        try:
+            return db.execute(text("SELECT 1")).scalar()
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert sum(pool.map(request, range(100))) == 100
+
+    after = pool_metrics.get_stats()
+    opened = after["connections_opened"] - before["connections_opened"]
+    assert after["checkouts"] - before["checkouts"] == 100
+    assert 1 <= opened <= 4  # one connection per concurrent worker at most
+    engine.dispose()
+    print(f"✓ 100 sessions over {opened} connections")
+
+
+def test_nullpool_when_disabled(tmp_path):
+    print("\nTesting NullPool fallback...")
+
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'null.db'}", pooled=False)
+    assert isinstance(engine.pool, NullPool)
+    engine.dispose()
+    print("✓ pooled=False gives a NullPool engine")
+
+
+def test_async_url_uses_psycopg_driver():
+    print("\nTesting async URL conversion...")
+
+    assert (
+        to_async_url("postgresql://u:p@host/db?sslmode=require")
+        == "postgresql+psycopg://u:p@host/db?sslmode=require"
+    )
+    assert to_async_url("postgres://u@host/db") == "postgresql+psycopg://u@host/db"
+    assert (
+        to_async_url("postgresql+psycopg2://u@host/db")
+        == "postgresql+psycopg://u@host/db"
+    )
+    assert to_async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    print("✓ Sync URLs map to the psycopg async driver")
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main([__file__, "-s"])
@@ -1,4 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import tempfile
+from pathlib import Path
+
+from app.services.event_service import EventService
 from app.services.ml_service import predict_wait_time
 
 
@@ -39,6 +43,75 @@ def test_thunder_game_impact():
     ), "Event should increase wait time!"
 
 
+def test_event_index_refreshes_on_save():
+    """Cached events are served from memory until the file is rewritten"""
+    service = EventService()
+    event_date = datetime(2025, 11, 21)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service.cache_dir = Path(tmp)
+        game = {
+            "event_name": "Thunder vs Lakers",
+            "event_type": "sports",
+            "event_datetime": "2025-11-21T19:30:00",
+            "distance_miles": 0.8,
+            "attendance_estimated": 18000,
+        }
+        service.save_events_to_cache([game], event_date)
+        impact = service.calculate_impact(datetime(2025, 11, 21, 19, 0))
+        assert impact == 27.0  # sports 15 x distance 1.2 x attendance 1.5
+
+        # Returned events are copies of the index entries
+        service.get_events_for_date(event_date)[0]["event_name"] = "changed"
+        assert (
+            service.get_events_for_date(event_date)[0]["event_name"]
+            == game["event_name"]
+        )
+
+        service.save_events_to_cache([], event_date)
+        assert service.calculate_impact(datetime(2025, 11, 21, 19, 0)) == 0.0
+
+    print("✓ Event index refreshes when the cache file changes")
+
+
+def test_batch_impact_matches_single():
+    """Vectorized impact over a day of 5-minute slots equals calculate_impact"""
+    service = EventService()
+    event_date = datetime(2025, 11, 22)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service.cache_dir = Path(tmp)
+        service.save_events_to_cache(
+            [
+                {
+                    "event_type": "sports",
+                    "event_datetime": "2025-11-22T19:30:00",
+                    "distance_miles": 0.8,
+                    "attendance_estimated": 18000,
+                },
+                {
+                    "event_type": "concert",
+                    "event_datetime": "2025-11-22T13:00:00",
+                    "distance_miles": 0.3,
+                    "attendance_estimated": 2500,
+                },
+                {"event_type": "festival", "distance_miles": 2},  # no start time
+            ],
+            event_date,
+        )
+
+        slots = [event_date + timedelta(minutes=5 * i) for i in range(12 * 24 * 2)]
+        batch = service.calculate_impact_batch(slots)
+        single = [service.calculate_impact(t) for t in slots]
+
+        assert batch.tolist() == single
+        assert batch.max() == 27.0
+
+    print(f"✓ Batch impact matches for {len(slots)} slots")
+
+
 if __name__ == "__main__":
     test_thunder_game_impact()
+    test_event_index_refreshes_on_save()
+    test_batch_impact_matches_single()
     print("✓ Event impact working!")
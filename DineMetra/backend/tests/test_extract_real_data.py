@@ -0,0 +1,146 @@
+"""
+Test month-folder extraction of Toast exports
+"""
+
+import pandas as pd
+
+from etl import extract_real_data
+from etl.extract_real_data import RealDataExtractor, classify_file
+
+
+def write_month(data_dir, month, days, items):
+    month_dir = data_dir / month
+    month_dir.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "yyyyMMdd": [d.replace("-", "") for d, _, _ in days],
+            "Total orders": [orders for _, orders, _ in days],
+            "Net sales": [sales for _, _, sales in days],
+        }
+    ).to_csv(month_dir / "Sales by day.csv", index=False)
+    pd.DataFrame(
+        {
+            "Item": [name for name, _ in items],
+            "Sales Category": "Food",
+            "Qty sold": [qty for _, qty in items],
+            "Avg. Price": 10.0,
+        }
+    ).to_csv(month_dir / f"{month[-2:]}_Items.csv", index=False)
+    pd.DataFrame({"Tax rate": [0.08]}).to_csv(month_dir / "Tax summary.csv")
+
+
+def make_data_dir(tmp_path):
+    data_dir = tmp_path / "real"
+    write_month(data_dir, "2025-02", [("2025-02-01", 40, 900.0)], [("Pho", 3)])
+    write_month(
+        data_dir,
+        "2025-01",
+        [("2025-01-01", 30, 700.0), ("2025-01-02", 35, 800.0)],
+        [("Banh Mi", 5), ("Total", 5)],
+    )
+    return data_dir
+
+
+def test_classify_file():
+    print("Testing Toast export classification...")
+    assert classify_file("Sales by day.csv", []) == "daily_sales"
+    assert classify_file("Time of day (totals).csv", []) == "hourly_sales"
+    assert classify_file("03_Items.csv", []) == "product_mix"
+    assert classify_file("export.csv", ["yyyyMMdd", "Net sales"]) == "daily_sales"
+    assert classify_file("export.csv", ["Item", "Qty sold"]) == "product_mix"
+    assert classify_file("Tax summary.csv", ["Tax rate"]) is None
+    print("✓ Files classified by name, then by header")
+
+
+def test_parallel_extraction_merges_in_month_order(tmp_path, monkeypatch):
+    print("\nTesting parallel month extraction...")
+
+    data_dir = make_data_dir(tmp_path)
+
+    reads = []
+    read_csv = pd.read_csv
+
+    def counting_read_csv(path, *args, **kwargs):
+        reads.append(path.name)
+        return read_csv(path, *args, **kwargs)
+
+    # Serial run: each CSV is read exactly once
+    monkeypatch.setattr(extract_real_data.pd, "read_csv", counting_read_csv)
+    serial = RealDataExtractor(data_dir=str(data_dir), workers=1)
+    serial.load_raw_files()
+    assert sorted(reads) == sorted(
+        ["Sales by day.csv", "Tax summary.csv", "01_Items.csv"]
+        + ["Sales by day.csv", "Tax summary.csv", "02_Items.csv"]
+    )
+    monkeypatch.undo()
+
+    parallel = RealDataExtractor(data_dir=str(data_dir), workers=2)
+    parallel.load_raw_files()
+
+    assert parallel.daily_sales["date"].dt.strftime("%Y-%m-%d").tolist() == [
+        "2025-01-01",
+        "2025-01-02",
+        "2025-02-01",
+    ]
+    assert parallel.daily_sales["order_count"].tolist() == [30, 35, 40]
+    pd.testing.assert_frame_equal(parallel.daily_sales, serial.daily_sales)
+    assert [item["name"] for item in parallel.product_mix] == ["Banh Mi", "Pho"]
+    assert parallel.product_mix == serial.product_mix
+    print(f"✓ {len(parallel.daily_sales)} days merged in month order")
+
+
+def make_generator(seed=7):
+    extractor = RealDataExtractor(data_dir="unused", workers=1, seed=seed)
+    extractor.daily_sales = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2025-01-01", "2025-01-02", None]),
+            "order_count": [100, 0, 50],
+            "revenue": [2000.0, 0.0, 900.0],
+        }
+    )
+    extractor.hourly_patterns = {"default": {12.0: 0.25, 18.0: 0.75}}
+    extractor.menu_items = [
+        {"item_id": 1, "name": "Pho", "category": "Food", "price": 14.0},
+        {"item_id": 2, "name": "Soda", "category": "Drinks", "price": 3.0},
+    ]
+    extractor.item_weights = [0.25, 0.75]
+    return extractor
+
+
+def test_generate_detailed_orders_is_vectorized_and_seeded():
+    print("\nTesting synthetic order generation...")
+
+    orders, items = make_generator().generate_detailed_orders()
+
+    # Deterministic part: int(total * share) orders per hour, ids in order
+    assert orders["order_timestamp"].dt.hour.value_counts().to_dict() == {
+        12: 25,
+        18: 75,
+    }
+    assert (orders["order_timestamp"].dt.date.astype(str) == "2025-01-01").all()
+    assert orders["order_id"].tolist() == list(range(100000, 100100))
+
+    # Random part stays within the generator's ranges
+    assert set(orders["party_size"]) <= {1, 2, 3, 4, 5, 6, 8}
+    extra = orders["item_count"] - orders["party_size"]
+    assert extra.between(0, 2).all()
+
+    # Items line up with their orders
+    per_order = items.groupby("order_id")["price"].agg(["count", "sum"])
+    assert per_order["count"].tolist() == orders["item_count"].tolist()
+    assert ((per_order["sum"] * 1.08).round(2).values == orders["order_total"]).all()
+    assert set(items["item_name"]) == {"Pho", "Soda"}
+
+    # Same seed, same output; a different seed draws differently
+    again, again_items = make_generator().generate_detailed_orders()
+    pd.testing.assert_frame_equal(again, orders)
+    pd.testing.assert_frame_equal(again_items, items)
+    other, _ = make_generator(seed=8).generate_detailed_orders()
+    assert not other["order_total"].equals(orders["order_total"])
+    print(f"✓ {len(orders)} orders / {len(items)} items, reproducible by seed")
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main([__file__, "-s"])
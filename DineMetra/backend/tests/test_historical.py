@@ -3,13 +3,16 @@ Historical Comparison Service Test
 Tests historical data comparison functionality
 """
 
+import os
 import sys
 
 sys.path.insert(0, ".")
 
-from app.services.historical_service import get_historical_service
+from app.services.historical_service import HistoricalService, get_historical_service
 from datetime import datetime
 
+import pandas as pd
+
 
 def test_historical_comparisons():
     print("=" * 60)
@@ -148,5 +151,129 @@ def test_historical_comparisons():
     print("- To test current date, wait for more data or use reference_date parameter")
 
 
+def test_daily_aggregates_update_incrementally(tmp_path):
+    print("\nTesting incremental daily aggregates...")
+
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    pd.DataFrame(
+        {
+            "order_id": [1, 2, 3],
+            "order_timestamp": [
+                "2025-03-08 12:00",
+                "2025-03-15 12:00",
+                "2025-03-15 18:30",
+            ],
+            "order_total": [30.0, 20.0, 40.0],
+        }
+    ).to_csv(processed / "orders_from_real_data.csv", index=False)
+    pd.DataFrame(
+        {
+            "log_timestamp": ["2025-03-15 12:00", "2025-03-15 13:00"],
+            "actual_wait_minutes": [10, 20],
+        }
+    ).to_csv(processed / "wait_times_from_real_data.csv", index=False)
+
+    historical = HistoricalService(data_dir=str(tmp_path))
+    assert historical.get_memory_usage() == {"loaded": False}
+    test_date = datetime(2025, 3, 15)
+
+    sales = historical.compare_sales(reference_date=test_date)
+    assert sales["today"]["total"] == 60.0 and sales["today"]["order_count"] == 2
+    assert sales["last_week"]["total"] == 30.0
+    assert sales["last_year"]["order_count"] == 0
+
+    # New orders fold into the existing day without a reload
+    historical.add_orders(
+        pd.DataFrame(
+            {
+                "order_id": [4],
+                "order_timestamp": ["2025-03-15 20:00"],
+                "order_total": [15.0],
+            }
+        )
+    )
+    assert (
+        historical.compare_busyness(reference_date=test_date)["today"]["total_orders"]
+        == 3
+    )
+
+    # Rows appended to the processed CSV are picked up by refresh()
+    pd.DataFrame(
+        {"log_timestamp": ["2025-03-15 19:00"], "actual_wait_minutes": [30]}
+    ).to_csv(
+        processed / "wait_times_from_real_data.csv",
+        mode="a",
+        header=False,
+        index=False,
+    )
+    assert historical.refresh() == {"orders": 0, "wait_times": 1}
+    waits = historical.compare_wait_times(reference_date=test_date)
+    assert waits["today"] == {
+        "date": "2025-03-15",
+        "average_minutes": 20.0,
+        "count": 3,
+    }
+    print(f"✓ Daily aggregates: {historical.daily_sales.to_dict('index')}")
+
+    # Only the needed columns are held, with compact dtypes
+    assert historical.orders.dtypes.astype(str).to_dict() == {
+        "order_id": "int32",
+        "order_timestamp": "datetime64[ns]",
+        "order_total": "float32",
+    }
+    assert str(historical.wait_times["actual_wait_minutes"].dtype) == "float32"
+    usage = historical.get_memory_usage()
+    assert usage["loaded"] and usage["frames"]["orders"]["rows"] == 4
+    print(f"✓ Loaded lazily: {usage['total_mb']} MB")
+
+
+def test_refresh_reloads_rewritten_data(tmp_path):
+    print("\nTesting refresh of rewritten processed data...")
+
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    orders_csv = processed / "orders_from_real_data.csv"
+
+    def write_orders(totals):
+        pd.DataFrame(
+            {
+                "order_id": range(1, len(totals) + 1),
+                "order_timestamp": "2025-03-15 12:00",
+                "order_total": totals,
+            }
+        ).to_csv(orders_csv, index=False)
+
+    write_orders([30.0, 20.0])
+    historical = HistoricalService(data_dir=str(tmp_path))
+    test_date = datetime(2025, 3, 15)
+    assert historical.compare_sales(reference_date=test_date)["today"]["total"] == 50.0
+    assert historical.refresh() == {"orders": 0, "wait_times": 0}
+
+    # Same size, different numbers: not an append
+    write_orders([31.0, 20.0])
+    assert historical.refresh() == {"reloaded": True}
+    assert historical.compare_sales(reference_date=test_date)["today"]["total"] == 51.0
+
+    # Larger, but the rows already read changed too
+    write_orders([10.0, 20.0, 30.0])
+    assert historical.refresh() == {"reloaded": True}
+    assert historical.compare_sales(reference_date=test_date)["today"]["total"] == 60.0
+
+    # A rewritten Parquet partition changes the dataset fingerprint even
+    # though the dataset directory's own mtime does not
+    dataset = processed / "orders_from_real_data.parquet"
+    part = dataset / "month=2025-03" / "part-0.parquet"
+    part.parent.mkdir(parents=True)
+    part.write_bytes(b"v1")
+    before = HistoricalService._fingerprint(dataset)
+    dir_mtime = dataset.stat().st_mtime_ns
+    part.write_bytes(b"v2")
+    os.utime(part, ns=(part.stat().st_atime_ns, part.stat().st_mtime_ns + 10**9))
+    assert dataset.stat().st_mtime_ns == dir_mtime
+    assert HistoricalService._fingerprint(dataset) != before
+    print("✓ Rewrites reload; appends stay incremental")
+
+
 if __name__ == "__main__":
     test_historical_comparisons()
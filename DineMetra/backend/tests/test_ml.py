@@ -3,8 +3,22 @@ Quick test script for your ML service
 Run this to verify everything works
 """
 
-from app.services.ml_service import predict_wait_time, predict_busyness
-from datetime import datetime
+from app.services.ml_service import (
+    predict_wait_time,
+    predict_wait_time_batch,
+    predict_busyness,
+    predict_item_sales,
+    forecast_menu_sales,
+    busyness_predictor,
+)
+from app.services import model_artifacts
+from app.services.model_registry import ModelRegistry
+from datetime import datetime, timedelta
+import copy
+import numpy as np
+import os
+import pandas as pd
+import tempfile
 
 
 def test_wait_time_prediction():
@@ -25,6 +39,32 @@ def test_wait_time_prediction():
     print("\nWait time predictor working! ✓")
 
 
+def test_wait_time_batch_matches_single():
+    print("\nTesting batch wait time prediction...")
+
+    parties = [
+        (2, datetime(2025, 11, 17, 12, 0), 60.0),
+        (8, datetime(2025, 11, 17, 19, 0), 85.0),
+        (4, datetime(2025, 11, 21, 19, 0), 70.0),
+        (6, datetime(2025, 11, 22, 18, 30), 95.0),
+    ]
+
+    batch = predict_wait_time_batch(
+        party_sizes=[p[0] for p in parties],
+        timestamps=[p[1] for p in parties],
+        current_occupancies=[p[2] for p in parties],
+    )
+
+    assert len(batch) == len(parties)
+    for (party_size, timestamp, occupancy), result in zip(parties, batch):
+        single = predict_wait_time(
+            party_size=party_size, timestamp=timestamp, current_occupancy=occupancy
+        )
+        assert result == single, f"Batch {result} != single {single}"
+
+    print(f"✓ {len(batch)} batch predictions match single-row output")
+
+
 def test_busyness_prediction():
     print("\nTesting busyness prediction...")
 
@@ -36,7 +76,161 @@ def test_busyness_prediction():
     print("\nBusyness predictor working! ✓")
 
 
+def grid_timestamps():
+    """One timestamp per (hour, weekday, month) cell of the lookup table"""
+    for month in range(1, 13):
+        first = datetime(2025, month, 1)
+        for day in range(7):
+            date = first + timedelta(days=(day - first.weekday()) % 7)
+            for hour in range(24):
+                yield date.replace(hour=hour)
+
+
+def test_busyness_table_matches_model():
+    print("\nTesting busyness lookup table against the model...")
+
+    assert busyness_predictor.model is not None
+    assert busyness_predictor.level_table.shape == (24, 7, 12)
+
+    # Same model, no table: every request goes through model.predict
+    raw = copy.copy(busyness_predictor)
+    raw.level_table = None
+
+    timestamps = list(grid_timestamps())
+    assert len({(t.hour, t.weekday(), t.month) for t in timestamps}) == 24 * 7 * 12
+    for timestamp in timestamps:
+        assert busyness_predictor.predict(timestamp) == raw.predict(
+            timestamp
+        ), timestamp
+    print(f"✓ All {len(timestamps)} table cells match the model")
+
+
+def test_busyness_without_table():
+    print("\nTesting busyness fallbacks without a lookup table...")
+
+    class SingleRowModel:
+        """Stands in for a model that cannot score the whole grid at once"""
+
+        def predict(self, features):
+            if len(features) > 1:
+                raise MemoryError("grid too large")
+            return busyness_predictor.model.predict(features)
+
+    # Table build fails: predictions fall back to the model per request
+    fallback = copy.copy(busyness_predictor)
+    fallback.model = SingleRowModel()
+    fallback.level_table = None
+    fallback.warm_up()
+    assert fallback.level_table is None
+    for timestamp in list(grid_timestamps())[::97]:
+        assert fallback.predict(timestamp) == busyness_predictor.predict(timestamp)
+
+    # No model at all: the neutral default, table or not
+    missing = copy.copy(busyness_predictor)
+    missing.model = None
+    missing.level_table = None
+    assert missing.predict(datetime(2025, 11, 17, 18)) == {
+        "level": "Moderate",
+        "confidence": 0.0,
+    }
+    print("✓ Per-request model fallback and missing-model default")
+
+
+def test_menu_forecast_matches_single():
+    print("\nTesting menu-wide sales forecast...")
+
+    items = [
+        (1, "The Pao", "Food"),
+        (2, "Small Kimchi Fry", "Food"),
+        (3, "Coke", "NA Beverage"),
+    ]
+    dates = [datetime(2025, 11, 20) + timedelta(days=i) for i in range(4)]
+
+    forecast = forecast_menu_sales(dates, items)
+    assert len(forecast) == len(items) * len(dates)
+
+    for row in forecast.itertuples():
+        single = predict_item_sales(
+            item_id=row.item_id,
+            date=row.date.to_pydatetime(),
+            item_name=row.item_name,
+            category=row.category,
+        )
+        assert row.predicted_quantity == single["predicted_quantity"]
+
+    print(f"✓ {len(forecast)} item/day forecasts match single predictions")
+
+    # No items: still a datetime "date" column, so the API can format it
+    empty = forecast_menu_sales(dates, [])
+    assert empty.empty and list(empty.columns) == list(forecast.columns)
+    assert empty["date"].dt.strftime("%Y-%m-%d").tolist() == []
+
+
+def test_model_registry_hot_swap():
+    print("\nTesting model hot-reload...")
+
+    class FakePredictor:
+        def __init__(self, model):
+            self.model = model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = os.path.join(tmp, "model.pkl")
+        with open(artifact, "w") as f:
+            f.write("v1")
+
+        state = {"model": "v1"}
+        registry = ModelRegistry()
+        registry.register("fake", lambda: FakePredictor(state["model"]), [artifact])
+        assert registry.check_for_updates() == []
+
+        # A broken artifact keeps the current model live
+        state["model"] = None
+        with open(artifact, "w") as f:
+            f.write("broken")
+        assert registry.check_for_updates() == []
+        assert registry.get("fake").model == "v1"
+
+        # A good artifact is swapped in and bumps the version
+        state["model"] = "v2"
+        assert registry.check_for_updates() == ["fake"]
+        assert registry.get("fake").model == "v2"
+        assert registry.version == 1
+
+    print("✓ New artifacts swap in, broken ones are ignored")
+
+
+def test_flat_artifact_matches_pickle():
+    print("\nTesting memory-mapped model artifact...")
+
+    model = busyness_predictor.model
+    with tempfile.TemporaryDirectory() as tmp:
+        path = model_artifacts.export_model(
+            model, os.path.join(tmp, "busyness_model.pkl")
+        )
+        flat_model, meta = model_artifacts.load_model(path)
+
+        table = busyness_predictor._build_level_table()
+        hours, days, months = [a.ravel() for a in np.indices(table.shape)]
+        features = pd.DataFrame(
+            {
+                "hour": hours,
+                "day": days,
+                "month": months + 1,
+                "is_weekend": (days >= 5).astype(int),
+            }
+        )
+        assert (flat_model.predict(features) == model.predict(features)).all()
+
+    print(f"✓ {meta['n_trees']} mapped trees match the pickled model")
+
+
 if __name__ == "__main__":
     test_wait_time_prediction()
+    test_wait_time_batch_matches_single()
     test_busyness_prediction()
+    test_busyness_table_matches_model()
+    test_busyness_without_table()
+    test_menu_forecast_matches_single()
+    test_model_registry_hot_swap()
+    test_flat_artifact_matches_pickle()
     print("\n🎉 All ML services operational!")
@@ -0,0 +1,81 @@
+"""
+Test the prediction cache (LRU + TTL memoization)
+"""
+
+import time
+from datetime import datetime
+
+from app.services.prediction_cache import PredictionCache
+
+
+def test_lru_eviction_and_stats():
+    print("Testing LRU eviction...")
+
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}  # "a" is now most recent
+
+    cache.set("c", {"value": 3})  # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == {"value": 3}
+
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    print(f"✓ Stats: {stats['hits']} hits, {stats['misses']} misses")
+
+
+def test_ttl_expiry():
+    print("\nTesting TTL expiry...")
+
+    cache = PredictionCache(max_entries=10, ttl_seconds=0.05)
+    cache.set("a", {"value": 1})
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+    print("✓ Expired entries are dropped")
+
+
+def test_get_or_compute_skips_errors():
+    print("\nTesting error results are not cached...")
+
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        return {"predicted_wait_minutes": 15, "error": "model unavailable"}
+
+    cache.get_or_compute("k", failing)
+    cache.get_or_compute("k", failing)
+    assert len(calls) == 2
+
+    # Returned values are copies, so callers can re-stamp fields safely
+    result = cache.get_or_compute("ok", lambda: {"factors": {"hour": 18}})
+    result["factors"]["hour"] = 0
+    assert cache.get("ok") == {"factors": {"hour": 18}}
+    print("✓ Fallback results are recomputed; cached values are isolated")
+
+
+def test_quantization():
+    print("\nTesting key quantization...")
+
+    cache = PredictionCache(time_bucket_minutes=15, occupancy_step=5)
+    assert cache.time_bucket(datetime(2025, 11, 21, 18, 14, 59)) == datetime(
+        2025, 11, 21, 18, 0
+    )
+    assert cache.time_bucket(datetime(2025, 11, 21, 18, 15)) == datetime(
+        2025, 11, 21, 18, 15
+    )
+    assert cache.occupancy_bucket(63.2) == 65.0
+    assert cache.occupancy_bucket(62.4) == 60.0
+    print("✓ Timestamps snap to 15-minute slots, occupancy to 5% steps")
+
+
+if __name__ == "__main__":
+    test_lru_eviction_and_stats()
+    test_ttl_expiry()
+    test_get_or_compute_skips_errors()
+    test_quantization()
+    print("\n🎉 Prediction cache working!")
@@ -0,0 +1,205 @@
+"""
+Test request-scoped prediction contexts
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app.services.prediction_context import PredictionContext
+
+
+class CountingWeatherService:
+    def __init__(self):
+        self.forecast_calls = 0
+        self.current_calls = 0
+
+    def get_forecast(self, days=7):
+        self.forecast_calls += 1
+        today = datetime.now().date()
+        return [
+            {
+                "date": (today + timedelta(days=i)).isoformat(),
+                "condition": "rainy",
+                "temperature_high_f": 70 + i,
+                "precipitation_chance": 80,
+            }
+            for i in range(days)
+        ]
+
+    def get_current_weather(self):
+        self.current_calls += 1
+        return {"condition": "Light Rain", "temperature_f": 68}
+
+
+class CountingEventService:
+    def __init__(self):
+        self.calls = 0
+
+    def get_events_for_date(self, date, use_cache_only=False):
+        self.calls += 1
+        return [{"event_name": "Concert", "attendance_estimated": 8000}]
+
+
+def test_context_resolves_each_input_once():
+    print("Testing context memoization...")
+
+    weather, events = CountingWeatherService(), CountingEventService()
+    context = PredictionContext(weather, events)
+    now = datetime.now()
+
+    for hour in range(24):
+        context.get_forecast_for_date(now.replace(hour=hour))
+        context.get_current_weather()
+        context.get_events(now.replace(hour=hour))
+        context.get_calendar_features(now.replace(hour=hour))
+
+    context.get_events(now + timedelta(days=1))
+
+    assert weather.forecast_calls == 1
+    assert weather.current_calls == 1
+    assert events.calls == 2  # one per calendar day
+    assert context.get_forecast_for_date(now)["temperature_high_f"] == 70
+    print("✓ Forecast, current weather and events fetched once per scope")
+
+
+def test_calendar_features():
+    print("\nTesting calendar features...")
+
+    context = PredictionContext()
+    saturday_dinner = datetime(2025, 11, 22, 18, 30)
+    features = context.get_calendar_features(saturday_dinner)
+
+    assert features["day_of_week"] == "Saturday"
+    assert features["time_period"] == "dinner"
+    assert features["is_weekend"] and features["is_peak_hour"]
+    assert features["is_dinner"] and not features["is_lunch"]
+    assert features["is_holiday"]
+    print("✓ Calendar features computed")
+
+
+def test_enhanced_predictions_share_context():
+    print("\nTesting enhanced predictions with a shared context...")
+
+    from app.services.enhanced_prediction_service import enhanced_prediction_service
+
+    weather, events = CountingWeatherService(), CountingEventService()
+    context = PredictionContext(weather, events)
+    enhanced_prediction_service.prediction_cache.clear("test")
+
+    start = datetime.now().replace(hour=19, minute=0, second=0, microsecond=0)
+    for i in range(7):
+        result = enhanced_prediction_service.predict_busyness_enhanced(
+            start + timedelta(days=i), context=context
+        )
+        assert result["factors"]["weather_condition"] == "rainy"
+    for i in range(3):
+        enhanced_prediction_service.predict_sales_enhanced(
+            1, start + timedelta(days=i), "The Pao", "Entrees", context=context
+        )
+
+    assert weather.forecast_calls == 1
+    assert events.calls == 7
+    enhanced_prediction_service.prediction_cache.clear("test")
+    print("✓ 10 predictions, 1 forecast fetch")
+
+
+def test_wait_time_at_high_occupancy_cut(monkeypatch):
+    print("\nTesting wait times just above the high-occupancy cut...")
+
+    from app.services.enhanced_prediction_service import enhanced_prediction_service
+    from app.services.prediction_cache import PredictionCache
+
+    predictor = enhanced_prediction_service.wait_time_predictor
+    predict = predictor.predict
+    seen = []
+
+    def recording_predict(**kwargs):
+        seen.append(kwargs["current_occupancy"])
+        return predict(**kwargs)
+
+    monkeypatch.setattr(predictor, "predict", recording_predict)
+    context = PredictionContext(CountingWeatherService(), CountingEventService())
+    when = datetime.now().replace(hour=15, minute=0, second=0, microsecond=0)
+
+    def wait_at(occupancy):
+        return enhanced_prediction_service.predict_wait_time_enhanced(
+            2, occupancy, when, context=context
+        )
+
+    def is_high(result):
+        return "high current occupancy" in result["explanation"]
+
+    # 79, 81 and 82 share the 80% bucket but not the model's > 80 cut
+    enhanced_prediction_service.prediction_cache.clear("test")
+    below, above, again = wait_at(79), wait_at(81), wait_at(82)
+    assert not is_high(below) and is_high(above) and is_high(again)
+    assert above["factors"]["current_occupancy"] == 81
+    assert again["factors"]["current_occupancy"] == 82
+    assert seen == [79, 81]  # raw occupancy; 82 reused 81's entry
+    enhanced_prediction_service.prediction_cache.clear("test")
+
+    # Cache disabled: computed on the caller's own occupancy
+    monkeypatch.setattr(
+        enhanced_prediction_service, "prediction_cache", PredictionCache(ttl_seconds=0)
+    )
+    seen.clear()
+    result = wait_at(81.5)
+    assert seen == [81.5] and is_high(result)
+    assert result["factors"]["current_occupancy"] == 81.5
+    print(f"✓ {above['explanation']}")
+
+
+def test_slow_key_does_not_block_other_keys():
+    print("\nTesting per-key single-flight resolution...")
+
+    release = threading.Event()
+    calls = []
+
+    class SlowWeatherService(CountingWeatherService):
+        def get_forecast(self, days=7):
+            calls.append("forecast")
+            assert release.wait(5), "forecast never released"
+            return super().get_forecast(days)
+
+    context = PredictionContext(SlowWeatherService(), CountingEventService())
+    now = datetime.now()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        slow = [pool.submit(context.get_forecasts) for _ in range(3)]
+
+        # Other keys resolve while the forecast fetch is still in flight
+        events = pool.submit(context.get_events, now).result(timeout=2)
+        assert events[0]["event_name"] == "Concert"
+        assert context.get_calendar_features(now)["hour"] == now.hour
+        assert not any(f.done() for f in slow)
+
+        release.set()
+        forecasts = [f.result(timeout=5) for f in slow]
+
+    assert calls == ["forecast"]  # one fetch shared by all waiters
+    assert all(f is forecasts[0] for f in forecasts)
+
+    # A failed computation is not cached; the next call retries
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("weather.gov timeout")
+        return "ok"
+
+    try:
+        context.resolve("flaky", flaky)
+        raise AssertionError("expected the first attempt to fail")
+    except RuntimeError:
+        pass
+    assert context.resolve("flaky", flaky) == "ok"
+    print("✓ Other keys resolved during a slow fetch, one fetch per key")
+
+
+if __name__ == "__main__":
+    test_context_resolves_each_input_once()
+    test_calendar_features()
+    test_enhanced_predictions_share_context()
+    test_slow_key_does_not_block_other_keys()
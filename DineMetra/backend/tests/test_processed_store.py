@@ -0,0 +1,97 @@
+"""
+Test the Parquet processed data store (and its CSV fallback)
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from etl import processed_store
+
+
+def make_orders():
+    return pd.DataFrame(
+        {
+            "order_id": [1, 2, 3, 4],
+            "order_timestamp": [
+                "2025-01-31 20:00",
+                "2025-02-01 12:00",
+                "2025-02-28 18:00",
+                "2025-03-01 11:00",
+            ],
+            "party_size": [2, 4, 3, 1],
+            "order_total": [20.0, 40.0, 30.0, 10.0],
+        }
+    )
+
+
+def check_reads(processed_dir):
+    # Selected columns, timestamps already parsed
+    orders = processed_store.read_processed(
+        "orders", columns=["order_id", "order_total"], processed_dir=processed_dir
+    )
+    assert list(orders.columns) == ["order_id", "order_timestamp", "order_total"]
+    assert str(orders["order_timestamp"].dtype) == "datetime64[ns]"
+
+    # Month range (inclusive days)
+    february = processed_store.read_processed(
+        "orders",
+        columns=["order_id"],
+        start="2025-02-01",
+        end="2025-02-28",
+        processed_dir=processed_dir,
+        dtype={"order_id": "int32"},
+    )
+    assert february["order_id"].tolist() == [2, 3]
+    assert str(february["order_id"].dtype) == "int32"
+    return orders
+
+
+def test_csv_fallback_without_pyarrow(tmp_path, monkeypatch):
+    print("Testing processed store CSV fallback...")
+
+    monkeypatch.setattr(processed_store, "parquet_available", lambda: False)
+    written = processed_store.write_processed(make_orders(), "orders", tmp_path)
+    assert written["paths"] == [str(tmp_path / "orders_from_real_data.csv")]
+    assert processed_store.source_path("orders", tmp_path).suffix == ".csv"
+
+    orders = check_reads(tmp_path)
+    assert len(orders) == 4
+    print(f"✓ CSV fallback read {len(orders)} orders")
+
+
+def test_parquet_partitions_by_month(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    print("\nTesting partitioned Parquet store...")
+
+    monkeypatch.delenv("PROCESSED_CSV_EXPORT", raising=False)
+    processed_store.write_processed(make_orders(), "orders", tmp_path)
+    dataset = tmp_path / "orders_from_real_data.parquet"
+    assert sorted(os.listdir(dataset)) == [
+        "month=2025-01",
+        "month=2025-02",
+        "month=2025-03",
+    ]
+    assert not (tmp_path / "orders_from_real_data.csv").exists()
+    assert processed_store.list_columns("orders", tmp_path) == [
+        "order_id",
+        "order_timestamp",
+        "party_size",
+        "order_total",
+    ]
+    orders = check_reads(tmp_path)
+    assert orders["order_id"].tolist() == [1, 2, 3, 4]
+
+    # CSV export on request; a newer CSV wins over the Parquet copy
+    processed_store.write_processed(make_orders(), "orders", tmp_path, csv=True)
+    assert processed_store.source_path("orders", tmp_path) == dataset
+    csv_path = tmp_path / "orders_from_real_data.csv"
+    make_orders().head(1).to_csv(csv_path, index=False)
+    os.utime(csv_path, (dataset.stat().st_mtime + 10,) * 2)
+    assert len(processed_store.read_processed("orders", processed_dir=tmp_path)) == 1
+    print("✓ Month partitions, column and range reads, CSV export")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
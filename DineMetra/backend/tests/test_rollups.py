@@ -0,0 +1,113 @@
+"""
+Test the ETL sales rollup refresh against a scripted psycopg connection
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from etl import rollups
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.executed.append((query, params))
+        if query is rollups.ROLLUP_TABLES_EXIST_SQL:
+            self.result = (self.conn.tables_exist,)
+        elif query is rollups.ORDER_RANGE_SQL:
+            self.result = self.conn.order_range
+
+    def fetchone(self):
+        return self.result
+
+
+class FakeConnection:
+    def __init__(self, tables_exist, order_range=None):
+        self.tables_exist = tables_exist
+        self.order_range = order_range
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def queries(self):
+        return [query for query, _ in self.executed]
+
+
+ORDERS = pd.DataFrame(
+    {"order_timestamp": ["2025-03-02 12:00", "2025-03-03 19:30"], "order_id": [1, 2]}
+)
+
+
+def test_refresh_covers_loaded_days():
+    print("Testing rollup refresh for loaded days...")
+
+    conn = FakeConnection(tables_exist=True)
+    result = rollups.refresh_sales_rollups(ORDERS, conn)
+
+    assert conn.queries() == [
+        rollups.ROLLUP_TABLES_EXIST_SQL,
+        rollups.REFRESH_HOURLY_ROLLUP_SQL,
+        rollups.REFRESH_DAILY_ROLLUP_SQL,
+    ]
+    assert conn.executed[1][1] == {
+        "start": datetime(2025, 3, 2),
+        "end": datetime(2025, 3, 4),
+    }
+    assert result["refreshed"] and not result["created"]
+    assert conn.commits == 1
+    print(f"✓ Refreshed {result['start']:%Y-%m-%d} to {result['end']:%Y-%m-%d}")
+
+
+def test_missing_rollup_tables_are_created_and_backfilled():
+    print("\nTesting rollup refresh on a database without rollup tables...")
+
+    # Database from before the rollup tables: orders go back to January
+    conn = FakeConnection(
+        tables_exist=False,
+        order_range=(datetime(2025, 1, 5, 11), datetime(2025, 3, 3, 19, 30)),
+    )
+    result = rollups.refresh_sales_rollups(ORDERS, conn)
+
+    assert conn.queries() == [
+        rollups.ROLLUP_TABLES_EXIST_SQL,
+        rollups.CREATE_ROLLUP_TABLES_SQL,
+        rollups.ORDER_RANGE_SQL,
+        rollups.REFRESH_HOURLY_ROLLUP_SQL,
+        rollups.REFRESH_DAILY_ROLLUP_SQL,
+    ]
+    assert "IF NOT EXISTS hourly_sales_rollup" in rollups.CREATE_ROLLUP_TABLES_SQL
+    assert "IF NOT EXISTS daily_sales_rollup" in rollups.CREATE_ROLLUP_TABLES_SQL
+    # The whole order history, not just the loaded days
+    assert conn.executed[-1][1] == {
+        "start": datetime(2025, 1, 5),
+        "end": datetime(2025, 3, 4),
+    }
+    assert result["created"] and conn.commits == 1
+
+    # Nothing loaded: nothing touched
+    empty = FakeConnection(tables_exist=False)
+    assert rollups.refresh_sales_rollups(ORDERS.iloc[0:0], empty) == {
+        "refreshed": False
+    }
+    assert empty.executed == []
+    print("✓ Tables created and backfilled from all orders")
+
+
+if __name__ == "__main__":
+    test_refresh_covers_loaded_days()
+    test_missing_rollup_tables_are_created_and_backfilled()
@@ -0,0 +1,121 @@
+"""
+Test the incrementally maintained sales rollup tables
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database_models import (
+    Base,
+    DailySalesRollup,
+    HourlySalesRollup,
+    Order,
+)
+from app.services.sales_rollup_service import SalesRollupService
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollup.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def add_orders(db, orders, prefix):
+    for i, (timestamp, total) in enumerate(orders):
+        db.add(
+            Order(
+                order_number=f"{prefix}_{i}",
+                order_timestamp=timestamp,
+                order_total=total,
+            )
+        )
+    db.flush()
+
+
+def daily_rows(db):
+    return db.execute(
+        select(
+            DailySalesRollup.sales_date,
+            DailySalesRollup.total_sales,
+            DailySalesRollup.order_count,
+        ).order_by(DailySalesRollup.sales_date)
+    ).all()
+
+
+def test_incremental_rollups_match_orders(tmp_path):
+    print("Testing incremental sales rollups...")
+
+    db = make_session(tmp_path)
+    service = SalesRollupService()
+
+    first = [
+        (datetime(2025, 3, 1, 12, 5), 20.0),
+        (datetime(2025, 3, 1, 12, 40), 10.0),
+        (datetime(2025, 3, 1, 18, 0), 15.0),
+    ]
+    add_orders(db, first, "A")
+    assert service.record_orders(db, first) == 3
+    db.commit()
+
+    # A second load adds to existing days instead of replacing them
+    second = [(datetime(2025, 3, 1, 12, 55), 5.0), (datetime(2025, 3, 2, 19, 0), 8.0)]
+    add_orders(db, second, "B")
+    service.record_orders(db, second)
+    db.commit()
+
+    assert daily_rows(db) == [(date(2025, 3, 1), 50.0, 4), (date(2025, 3, 2), 8.0, 1)]
+    noon = db.get(HourlySalesRollup, (date(2025, 3, 1), 12))
+    assert (noon.total_sales, noon.order_count) == (35.0, 3)
+
+    # Rebuilding from orders gives the same totals
+    incremental = daily_rows(db)
+    assert service.rebuild(db) == {"days": 2, "hours": 3}
+    db.commit()
+    assert daily_rows(db) == incremental
+    print(f"✓ Rollups: {incremental}")
+
+
+def test_rebuild_range_after_delete(tmp_path):
+    print("\nTesting rollup rebuild after deleting orders...")
+
+    db = make_session(tmp_path)
+    service = SalesRollupService()
+
+    orders = [
+        (datetime(2025, 3, 1, 12, 0), 10.0),
+        (datetime(2025, 3, 2, 12, 0), 20.0),
+        (datetime(2025, 3, 3, 12, 0), 30.0),
+    ]
+    add_orders(db, orders, "UPLOAD")
+    service.record_orders(db, orders)
+    db.commit()
+
+    db.query(Order).filter(Order.order_number == "UPLOAD_1").delete()
+    service.rebuild(db, date(2025, 3, 2), date(2025, 3, 2))
+    db.commit()
+
+    assert daily_rows(db) == [(date(2025, 3, 1), 10.0, 1), (date(2025, 3, 3), 30.0, 1)]
+    assert db.execute(select(func.count()).select_from(HourlySalesRollup)).scalar() == 2
+    print("✓ Only the rebuilt day changed")
+
+
+def test_ensure_ready_backfills_once(tmp_path):
+    print("\nTesting first-run backfill...")
+
+    db = make_session(tmp_path)
+    service = SalesRollupService()
+    add_orders(db, [(datetime(2025, 3, 1, 9, 0), 12.0)], "OLD")
+    db.commit()
+
+    assert service.ensure_ready(db) is True
+    assert service.ensure_ready(db) is False
+    assert daily_rows(db) == [(date(2025, 3, 1), 12.0, 1)]
+    print("✓ Existing orders backfilled on first run")
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main([__file__, "-s"])
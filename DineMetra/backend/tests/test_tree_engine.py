@@ -0,0 +1,105 @@
+"""
+Parity tests for the compiled tree engine
+Every compiled model must predict exactly what sklearn predicts
+"""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import (
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+
+from app.services.tree_engine import LARGE_BATCH_ROWS, compile_model
+
+PRODUCTION_MODELS = [
+    "models/wait_time_model.pkl",
+    "models/busyness_model.pkl",
+    "data/models/item_sales_model.pkl",
+]
+
+
+def _random_inputs(model, n_rows=2000, seed=7):
+    """Integer-valued inputs spanning (and beyond) each model's split ranges"""
+    rng = np.random.default_rng(seed)
+    columns = list(model.feature_names_in_)
+    data = rng.integers(-5, 130, size=(n_rows, len(columns))).astype(float)
+    return pd.DataFrame(data, columns=columns)
+
+
+def test_production_models_match_sklearn():
+    print("Testing compiled production models...")
+
+    for path in PRODUCTION_MODELS:
+        if not Path(path).exists():
+            print(f"  - {path} not found, skipping")
+            continue
+
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        model = data["model"] if isinstance(data, dict) else data
+        engine = compile_model(model, keep_model=False)
+
+        X = _random_inputs(model)
+        np.testing.assert_array_equal(engine.predict(X), model.predict(X))
+
+        # Single rows take the same path the API uses
+        for i in range(20):
+            row = X.iloc[[i]]
+            assert engine.predict(row)[0] == model.predict(row)[0]
+
+        print(f"  ✓ {path}: {engine.meta['n_trees']} trees match sklearn")
+
+
+def test_synthetic_ensembles_match_sklearn():
+    print("\nTesting compiled synthetic ensembles...")
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 5))
+    y_reg = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=500)
+    y_cls = (X[:, 0] + X[:, 2] > 0).astype(int) + (X[:, 3] > 1).astype(int)
+
+    models = [
+        GradientBoostingRegressor(n_estimators=50, max_depth=3, random_state=0).fit(
+            X, y_reg
+        ),
+        RandomForestRegressor(n_estimators=20, random_state=0).fit(X, y_reg),
+        RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y_cls),
+    ]
+
+    X_test = rng.normal(size=(300, 5))
+    for model in models:
+        engine = compile_model(model, keep_model=False)
+        np.testing.assert_allclose(
+            engine.predict(X_test), model.predict(X_test), rtol=1e-12
+        )
+        if hasattr(model, "predict_proba"):
+            np.testing.assert_allclose(
+                engine.predict_proba(X_test), model.predict_proba(X_test), rtol=1e-12
+            )
+        print(f"  ✓ {type(model).__name__} matches sklearn")
+
+
+def test_large_batches_use_sklearn():
+    print("\nTesting large-batch hand-off...")
+
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(LARGE_BATCH_ROWS, 3))
+    model = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, X[:, 0])
+    engine = compile_model(model)
+
+    assert engine._use_sklearn(X)
+    assert not engine._use_sklearn(X[: LARGE_BATCH_ROWS - 1])
+    np.testing.assert_array_equal(engine.predict(X), model.predict(X))
+    print(f"  ✓ Batches of {LARGE_BATCH_ROWS}+ rows go to sklearn")
+
+
+if __name__ == "__main__":
+    test_production_models_match_sklearn()
+    test_synthetic_ensembles_match_sklearn()
+    test_large_batches_use_sklearn()
+    print("\n🎉 Tree engine parity verified!")
@@ -0,0 +1,468 @@
+"""
+Test the CSV upload pipeline against a scratch SQLite database
+"""
+
+import asyncio
+import os
+import threading
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.api import upload
+from app.models.database_models import (
+    Base,
+    DailySalesRollup,
+    MenuItem,
+    Order,
+    OrderItem,
+    UploadJob,
+)
+from app.services import upload_job_service
+from app.services.upload_job_service import UploadJobService
+
+
+def toast_items_csv(rows):
+    return pd.DataFrame(
+        [
+            {
+                "Item": name,
+                "Sales Category": category,
+                "Qty sold": qty,
+                "Gross sales": gross,
+            }
+            for name, category, qty, gross in rows
+        ]
+    )
+
+
+def make_upload_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'upload.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(upload, "SessionLocal", Session)
+    monkeypatch.setattr(upload, "_menu_items_ready", False)
+    return Session
+
+
+def test_upload_bulk_inserts_items_orders_and_order_items(tmp_path, monkeypatch):
+    print("Testing chunked bulk CSV upload...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload, "UPLOAD_BATCH_SIZE", 2)
+    monkeypatch.setattr(upload, "UPLOAD_CHUNK_ROWS", 2)
+
+    db = Session()
+    db.add(MenuItem(item_name="Soda", category="Drinks", price=2.0))
+    db.commit()
+    soda_id = db.query(MenuItem.id).scalar()
+
+    path = tmp_path / "03_items.csv"
+    toast_items_csv(
+        [
+            ("Soda", "Drinks", 4, 8.0),
+            ("The Pao", "Food", 2, 24.0),
+            ("", "Summary", 10, 100.0),  # summary row, skipped
+            ("Pork Banh Mi", "Food", 1, 11.5),
+            ("The Pao", "Food", 1, 12.0),
+            ("Tea", "Drinks", 0, 0.0),  # nothing sold, skipped
+        ]
+    ).to_csv(path, index=False)
+
+    messages = []
+    result = upload.load_toast_items_csv(str(path), "03_items.csv", messages.append)
+    assert result == {
+        "rows": 6,
+        "chunks": 3,
+        "orders": 4,
+        "order_items": 4,
+        "new_menu_items": 2,
+    }
+
+    items = dict(db.execute(select(MenuItem.item_name, MenuItem.id)).all())
+    assert set(items) == {"Soda", "The Pao", "Pork Banh Mi"}
+    assert items["Soda"] == soda_id  # existing item reused
+
+    orders = db.execute(
+        select(Order.id, Order.order_number, Order.order_total).order_by(Order.id)
+    ).all()
+    assert [o.order_number for o in orders] == [
+        "UPLOAD_000001",
+        "UPLOAD_000002",
+        "UPLOAD_000003",
+        "UPLOAD_000004",
+    ]
+    assert sum(o.order_total for o in orders) == 8.0 + 24.0 + 11.5 + 12.0
+
+    # Each order item points at the order created for its CSV row
+    order_items = db.execute(
+        select(OrderItem.order_id, OrderItem.menu_item_id, OrderItem.quantity).order_by(
+            OrderItem.order_id
+        )
+    ).all()
+    assert [tuple(r) for r in order_items] == [
+        (orders[0].id, items["Soda"], 4),
+        (orders[1].id, items["The Pao"], 2),
+        (orders[2].id, items["Pork Banh Mi"], 1),
+        (orders[3].id, items["The Pao"], 1),
+    ]
+
+    rollup_total = db.execute(select(func.sum(DailySalesRollup.total_sales))).scalar()
+    assert rollup_total == 55.5
+
+    # One progress event per committed chunk, driven by rows and bytes read
+    assert [m["rows_processed"] for m in messages] == [2, 4, 6]
+    assert messages[-1]["bytes_processed"] == messages[-1]["total_bytes"]
+    assert messages[-1]["progress"] == 95
+    db.close()
+    print(f"✓ {len(orders)} orders, {len(order_items)} order items in 3 chunks")
+
+
+def write_csv(tmp_path, name, rows):
+    path = tmp_path / name
+    toast_items_csv(rows).to_csv(path, index=False)
+    return path
+
+
+def spool(path, filename):
+    """Spool a file; returns submit() arguments"""
+    with open(path, "rb") as f:
+        spool_path, content_hash, size = upload.spool_upload(f, filename)
+    return spool_path, filename, content_hash, size
+
+
+def test_upload_jobs_run_dedupe_and_report(tmp_path, monkeypatch):
+    print("\nTesting upload job queue...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload_job_service, "SessionLocal", Session)
+    monkeypatch.setattr(upload, "UPLOAD_SPOOL_DIR", str(tmp_path / "spool"))
+
+    messages = []
+
+    async def broadcast(message):
+        messages.append(message)
+
+    async def refresh_dashboard(message):
+        messages.append({"type": "refresh_dashboard"})
+
+    monkeypatch.setattr(upload.manager, "broadcast", broadcast)
+    monkeypatch.setattr(upload, "refresh_dashboard", refresh_dashboard)
+
+    service = UploadJobService(max_workers=2)
+    march = write_csv(tmp_path, "03_items.csv", [("Soda", "Drinks", 3, 6.0)])
+    april = write_csv(tmp_path, "04_items.csv", [("The Pao", "Food", 2, 24.0)])
+
+    async def scenario():
+        # Submitted from worker threads like the endpoint does
+        service.attach_loop()
+        jobs = [
+            await asyncio.to_thread(service.submit, *spool(f, f.name))
+            for f in (march, april)
+        ]
+        while any(
+            service.get_job(j["job_id"])["status"] in ("queued", "running")
+            for j in jobs
+        ):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)  # let the last broadcasts run
+        duplicate = service.submit(*spool(march, "03_items_again.csv"))
+        return jobs, duplicate
+
+    jobs, duplicate = asyncio.run(scenario())
+    for job in jobs:
+        done = service.get_job(job["job_id"])
+        assert done["status"] == "completed", done
+        assert done["orders_created"] == 1 and done["progress"] == 100
+
+    # Same bytes as the March file: existing job returned, nothing loaded
+    assert duplicate["duplicate"] and duplicate["job_id"] == jobs[0]["job_id"]
+    assert len(os.listdir(tmp_path / "spool")) == 0
+
+    db = Session()
+    numbers = sorted(n for (n,) in db.execute(select(Order.order_number)).all())
+    assert len(numbers) == 2
+    assert {n.rsplit("_", 1)[0] for n in numbers} == {
+        f"UPLOAD_{job['job_id'][:8]}" for job in jobs
+    }
+    db.close()
+
+    march_events = [m["type"] for m in messages if m.get("job_id") == jobs[0]["job_id"]]
+    assert march_events == ["upload_started", "upload_progress", "upload_complete"]
+    assert messages.count({"type": "refresh_dashboard"}) == 2
+    print(f"✓ Jobs completed, duplicate detected, events: {march_events}")
+
+
+def test_upload_job_cancel_and_recover(tmp_path, monkeypatch):
+    print("\nTesting upload job cancellation and recovery...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload_job_service, "SessionLocal", Session)
+    monkeypatch.setattr(upload, "UPLOAD_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(upload, "UPLOAD_CHUNK_ROWS", 1)
+
+    service = UploadJobService(max_workers=1)
+    queued = []
+    monkeypatch.setattr(
+        service._executor, "submit", lambda fn, job_id: queued.append(job_id)
+    )
+
+    rows = [("Soda", "Drinks", 1, 2.0), ("Tea", "Drinks", 1, 3.0)]
+    first = service.submit(*spool(write_csv(tmp_path, "a.csv", rows), "a.csv"))
+    second = service.submit(*spool(write_csv(tmp_path, "b.csv", rows[::-1]), "b.csv"))
+
+    # Queued job: cancelled before it starts
+    assert service.cancel(first["job_id"])["status"] == "cancelled"
+    service._run(first["job_id"])
+    assert service.get_job(first["job_id"])["status"] == "cancelled"
+
+    # Running job: stops after the first committed chunk
+    monkeypatch.setattr(service, "is_cancel_requested", lambda job_id: True)
+    service._run(second["job_id"])
+    assert service.get_job(second["job_id"])["status"] == "cancelled"
+    db = Session()
+    assert db.query(Order).count() == 1
+    db.close()
+    assert service.cancel("missing") is None
+
+    # Restart: queued jobs go back on the pool, running ones are failed
+    third = service.submit(*spool(write_csv(tmp_path, "c.csv", rows[:1]), "c.csv"))
+    db = Session()
+    db.add(
+        UploadJob(
+            id="interrupted", filename="d.csv", content_hash="x", status="running"
+        )
+    )
+    db.commit()
+    db.close()
+    queued.clear()
+
+    assert service.recover() == {"requeued": 1, "failed": 1}
+    assert queued == [third["job_id"]]
+    assert service.get_job("interrupted")["status"] == "failed"
+    print("✓ Cancelled queued and running jobs, recovered after restart")
+
+
+def test_upload_job_resume_clear_and_unique_hash(tmp_path, monkeypatch):
+    print("\nTesting upload job resume, reset and hash uniqueness...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload_job_service, "SessionLocal", Session)
+    monkeypatch.setattr(upload, "UPLOAD_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(upload, "UPLOAD_CHUNK_ROWS", 1)
+
+    service = UploadJobService(max_workers=1)
+    monkeypatch.setattr(service._executor, "submit", lambda fn, job_id: None)
+    rows = [
+        ("Soda", "Drinks", 1, 2.0),
+        ("Tea", "Drinks", 1, 3.0),
+        ("Pho", "Food", 1, 14.0),
+    ]
+    path = write_csv(tmp_path, "03_items.csv", rows)
+
+    # Cancelled after its first committed chunk, which is recorded
+    first = service.submit(*spool(path, path.name))
+    monkeypatch.setattr(service, "is_cancel_requested", lambda job_id: True)
+    service._run(first["job_id"])
+    cancelled = service.get_job(first["job_id"])
+    assert (cancelled["status"], cancelled["rows_processed"]) == ("cancelled", 1)
+
+    # Same file again: the job resumes after the committed row
+    monkeypatch.setattr(service, "is_cancel_requested", lambda job_id: False)
+    again = service.submit(*spool(path, path.name))
+    assert again["resumed"] and again["job_id"] == first["job_id"]
+    service._run(first["job_id"])
+    done = service.get_job(first["job_id"])
+    assert (done["status"], done["rows_processed"], done["orders_created"]) == (
+        "completed",
+        3,
+        3,
+    )
+    db = Session()
+    totals = sorted(t for (t,) in db.execute(select(Order.order_total)).all())
+    numbers = {n for (n,) in db.execute(select(Order.order_number)).all()}
+    assert totals == [2.0, 3.0, 14.0] and len(numbers) == 3
+    db.close()
+
+    # Two live jobs for one hash are refused by the unique partial index
+    db = Session()
+    db.add(UploadJob(id="dup", filename="x.csv", content_hash=done["content_hash"]))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.close()
+
+    # A racing submit that missed the lookup gets the existing job back
+    find_job = service._find_job
+    misses = [None, None]  # dedupe and resume lookups see nothing
+
+    def racing_find_job(db, content_hash, statuses):
+        return misses.pop() if misses else find_job(db, content_hash, statuses)
+
+    monkeypatch.setattr(service, "_find_job", racing_find_job)
+    raced = service.submit(*spool(path, path.name))
+    assert raced["duplicate"] and raced["job_id"] == first["job_id"]
+    monkeypatch.setattr(service, "_find_job", find_job)
+
+    # Demo reset: cleared job records no longer block a re-upload
+    assert service.clear_finished() == 1
+    fresh = service.submit(*spool(path, path.name))
+    assert not fresh["duplicate"] and not fresh["resumed"]
+    assert fresh["job_id"] != first["job_id"]
+    print("✓ Resumed after 1 committed row, reset allows re-upload")
+
+
+def test_upload_job_failure_reports_committed_rows(tmp_path, monkeypatch):
+    print("\nTesting upload failure after committed chunks...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload_job_service, "SessionLocal", Session)
+    monkeypatch.setattr(upload, "UPLOAD_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(upload, "UPLOAD_CHUNK_ROWS", 1)
+
+    service = UploadJobService(max_workers=1)
+    monkeypatch.setattr(service._executor, "submit", lambda fn, job_id: None)
+    messages = []
+    monkeypatch.setattr(
+        service, "_broadcast", lambda kind, job: messages.append((kind, job))
+    )
+
+    load_chunk = upload.load_toast_items_chunk
+    calls = []
+
+    def failing_third_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise ValueError("bad row")
+        return load_chunk(*args, **kwargs)
+
+    monkeypatch.setattr(upload, "load_toast_items_chunk", failing_third_chunk)
+    rows = [
+        ("Soda", "Drinks", 1, 2.0),
+        ("Tea", "Drinks", 1, 3.0),
+        ("Pho", "Food", 1, 14.0),
+    ]
+    path = write_csv(tmp_path, "03_items.csv", rows)
+    job = service.submit(*spool(path, path.name))
+    service._run(job["job_id"])
+
+    failed = service.get_job(job["job_id"])
+    assert (failed["status"], failed["rows_processed"]) == ("failed", 2)
+    assert "2 rows were already committed, 2 chunks" in failed["message"]
+    assert messages[-1][0] == "upload_error"
+    assert messages[-1][1]["message"] == failed["message"]
+    db = Session()
+    assert db.query(Order).count() == 2
+    db.close()
+    print(f"✓ {failed['message']}")
+
+
+def test_concurrent_uploads_share_new_menu_items(tmp_path, monkeypatch):
+    print("\nTesting overlapping uploads that add the same menu items...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload_job_service, "SessionLocal", Session)
+    monkeypatch.setattr(upload, "UPLOAD_SPOOL_DIR", str(tmp_path / "spool"))
+
+    service = UploadJobService(max_workers=2)
+    monkeypatch.setattr(service._executor, "submit", lambda fn, job_id: None)
+
+    # Both jobs reach their first chunk before either has written anything
+    barrier = threading.Barrier(2, timeout=5)
+    load_chunk = upload.load_toast_items_chunk
+
+    def overlapping_chunk(*args, **kwargs):
+        barrier.wait()
+        return load_chunk(*args, **kwargs)
+
+    monkeypatch.setattr(upload, "load_toast_items_chunk", overlapping_chunk)
+    shared = [("Pho", "Food", 1, 14.0), ("Thai Tea", "Drinks", 1, 5.0)]
+    march = write_csv(tmp_path, "03_items.csv", shared + [("Soda", "Drinks", 1, 2.0)])
+    april = write_csv(tmp_path, "04_items.csv", shared[::-1])
+    jobs = [service.submit(*spool(f, f.name)) for f in (march, april)]
+
+    threads = [
+        threading.Thread(target=service._run, args=(job["job_id"],)) for job in jobs
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for job in jobs:
+        assert service.get_job(job["job_id"])["status"] == "completed"
+
+    db = Session()
+    names = [n for (n,) in db.execute(select(MenuItem.item_name)).all()]
+    assert sorted(names) == ["Pho", "Soda", "Thai Tea"]
+    # Every order item for a shared item points at its single row
+    per_item = db.execute(
+        select(MenuItem.item_name, func.count(OrderItem.id))
+        .join(OrderItem, OrderItem.menu_item_id == MenuItem.id)
+        .group_by(MenuItem.item_name)
+    ).all()
+    assert dict(per_item) == {"Pho": 2, "Thai Tea": 2, "Soda": 1}
+    db.close()
+    print(f"✓ One row per menu item: {sorted(names)}")
+
+
+def test_existing_duplicate_menu_items_are_merged(tmp_path, monkeypatch):
+    print("\nTesting cleanup of duplicate menu items...")
+
+    Session = make_upload_db(tmp_path, monkeypatch)
+    db = Session()
+    # A database from before the unique index, with a duplicate already in it
+    db.execute(text("DROP INDEX uq_menu_items_item_name"))
+    db.add_all(
+        [
+            MenuItem(id=1, item_name="Pho", price=14.0),
+            MenuItem(id=2, item_name="Pho", price=14.0),
+            MenuItem(id=3, item_name="Soda", price=2.0),
+            Order(id=1, order_timestamp=pd.Timestamp("2025-03-01"), order_total=16.0),
+        ]
+    )
+    db.flush()
+    db.add_all(
+        [
+            OrderItem(
+                order_id=1,
+                menu_item_id=2,
+                quantity=1,
+                unit_price=14.0,
+                total_price=14.0,
+            ),
+            OrderItem(
+                order_id=1,
+                menu_item_id=3,
+                quantity=1,
+                unit_price=2.0,
+                total_price=2.0,
+            ),
+        ]
+    )
+    db.commit()
+
+    assert upload.ensure_unique_menu_items(db) == 1
+    assert upload.ensure_unique_menu_items(db) == 0  # once per process
+    assert db.execute(select(MenuItem.id).order_by(MenuItem.id)).scalars().all() == [
+        1,
+        3,
+    ]
+    assert sorted(db.execute(select(OrderItem.menu_item_id)).scalars().all()) == [
+        1,
+        3,
+    ]
+
+    db.add(MenuItem(item_name="Soda", price=2.0))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.close()
+    print("✓ Duplicates merged into the oldest row, unique index created")
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main([__file__, "-s"])
@@ -47,5 +47,154 @@ def test_weather():
     
     print("✅ Weather service test complete!")
 
+
+def _reset_weather_cache():
+    WeatherService._grid_cache.clear()
+    WeatherService._forecast_cache.clear()
+    WeatherService._failed_at.clear()
+    WeatherService._inflight.clear()
+    WeatherService._disk_checked = False
+
+
+def test_forecast_cache_single_flight(tmp_path, monkeypatch):
+    """Concurrent callers share one fetch; stale data is served while refreshing"""
+    import threading
+    import time
+    from app.services import weather_service
+
+    print("🧪 Testing forecast cache\n")
+    monkeypatch.chdir(tmp_path)
+    _reset_weather_cache()
+
+    calls = {"forecast": 0}
+
+    class FakeResponse:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.data
+
+    def fake_get(url, headers=None, timeout=None):
+        if "/points/" in url:
+            return FakeResponse({"properties": {"forecast": "https://example/forecast"}})
+        calls["forecast"] += 1
+        time.sleep(0.2)
+        return FakeResponse({"properties": {"periods": [
+            {"startTime": "2025-06-01T06:00:00-05:00", "isDaytime": True,
+             "temperature": 80 + calls["forecast"], "shortForecast": "Sunny"},
+            {"startTime": "2025-06-01T18:00:00-05:00", "isDaytime": False,
+             "temperature": 65, "shortForecast": "Clear"},
+        ]}})
+
+    monkeypatch.setattr(weather_service.requests, "get", fake_get)
+
+    service = WeatherService()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.get_forecast(days=1)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"   8 concurrent callers -> {calls['forecast']} fetch")
+    assert calls["forecast"] == 1
+    assert all(r == results[0] and r for r in results)
+    assert results[0][0]["temperature_high_f"] == 81
+
+    # Fresh: served from memory
+    service.get_forecast(days=1)
+    assert calls["forecast"] == 1
+
+    # Stale: old data returned immediately, one refresh in the background
+    service.cache_ttl = 0
+    stale = service.get_forecast(days=1)
+    assert stale[0]["temperature_high_f"] == 81
+    for _ in range(50):
+        if calls["forecast"] == 2 and not WeatherService._inflight:
+            break
+        time.sleep(0.05)
+    assert calls["forecast"] == 2
+    service.cache_ttl = 3600
+    assert service.get_forecast(days=1)[0]["temperature_high_f"] == 82
+
+    # Restart: a new process seeds from the on-disk copy without fetching
+    _reset_weather_cache()
+    service = WeatherService()
+    service.cache_ttl = 3600
+    assert service.get_forecast(days=1)[0]["temperature_high_f"] == 82
+    assert calls["forecast"] == 2
+
+    _reset_weather_cache()
+    print("✅ Forecast cache test complete!")
+
+
+def test_forecast_cache_max_stale(tmp_path, monkeypatch):
+    """Old disk copies are ignored and ended periods are dropped"""
+    import json
+    from datetime import datetime, timedelta, timezone
+    from app.services import weather_service
+
+    print("🧪 Testing forecast staleness bounds\n")
+    monkeypatch.chdir(tmp_path)
+    _reset_weather_cache()
+
+    url = "https://example/forecast"
+    now = datetime.now(timezone.utc)
+    ended = {"startTime": (now - timedelta(hours=13)).isoformat(),
+             "endTime": (now - timedelta(hours=1)).isoformat(),
+             "isDaytime": True, "temperature": 70, "shortForecast": "Rain"}
+    upcoming = {"startTime": (now + timedelta(hours=1)).isoformat(),
+                "endTime": (now + timedelta(hours=13)).isoformat(),
+                "isDaytime": True, "temperature": 90, "shortForecast": "Sunny"}
+    calls = {"forecast": 0}
+
+    def fake_get(url_, headers=None, timeout=None):
+        if "/points/" in url_:
+            response = type("R", (), {})()
+            response.raise_for_status = lambda: None
+            response.json = lambda: {"properties": {"forecast": url}}
+            return response
+        calls["forecast"] += 1
+        raise weather_service.requests.ConnectionError("weather.gov down")
+
+    monkeypatch.setattr(weather_service.requests, "get", fake_get)
+    service = WeatherService()
+    service.max_stale = 3600
+
+    # A disk copy older than max_stale is not served, even with the API down
+    cache_file = service.cache_dir / "forecast_20250101.json"
+    cache_file.write_text(json.dumps({
+        "fetched_at": (datetime.now() - timedelta(hours=2)).isoformat(),
+        "forecast_url": url,
+        "periods": [upcoming],
+    }))
+    assert service._get_periods(url, persist=True) == []
+    assert calls["forecast"] == 1
+
+    # A recent copy is served, minus the periods that have already ended
+    _reset_weather_cache()
+    cache_file.write_text(json.dumps({
+        "fetched_at": datetime.now().isoformat(),
+        "forecast_url": url,
+        "periods": [ended, upcoming],
+    }))
+    assert service._get_periods(url, persist=True) == [upcoming]
+
+    # Once the entry ages past max_stale a failed refetch serves nothing
+    WeatherService._forecast_cache[url]["fetched_at"] -= 7200
+    assert service._get_periods(url, persist=True) == []
+    assert calls["forecast"] == 2
+
+    _reset_weather_cache()
+    print("✅ Forecast staleness test complete!")
+
+
 if __name__ == "__main__":
     test_weather()
\ No newline at end of file